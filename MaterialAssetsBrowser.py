@@ -12,7 +12,7 @@ if script_dir in sys.path:
 sys.path.insert(0, script_dir)
 
 
-modules_to_clear = ["style", "logic", "ui", "loader_utils", "constants", "settings_dialog", "TagManagerDialog"]
+modules_to_clear = ["style", "logic", "ui", "constants", "settings_dialog", "TagManagerDialog", "material_index", "material_scanner", "mat_reader", "engine_lookup", "material_model", "thumbnail_store", "thumbnail_cache", "thumbnail_renderer", "thumbnail_scheduler", "render_farm", "material_search", "search_pipeline", "library_watcher", "bulk_ops", "material_library_cache", "drop_targets", "drag_platform", "folder_summary", "pbr_sets"]
 for mod in modules_to_clear:
     if mod in sys.modules:
         del sys.modules[mod]
@@ -21,7 +21,25 @@ try:
     import constants
     import style
     import logic
-    import loader_utils
+    import material_index
+    import material_scanner
+    import mat_reader
+    import engine_lookup
+    import thumbnail_store
+    import thumbnail_cache
+    import thumbnail_renderer
+    import thumbnail_scheduler
+    import render_farm
+    import material_search
+    import search_pipeline
+    import library_watcher
+    import bulk_ops
+    import material_library_cache
+    import drop_targets
+    import drag_platform
+    import folder_summary
+    import pbr_sets
+    import material_model
     import ui
     import settings_dialog
     import TagManagerDialog
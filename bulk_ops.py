@@ -0,0 +1,511 @@
+import os
+import re
+import shutil
+
+from mat_reader import get_mat_header
+
+
+def _norm(path):
+    return (path or "").replace("\\", "/")
+
+
+def ms_string(text):
+    """Python str -> MaxScript string literal."""
+    return '"' + str(text).replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def _ms_array(values):
+    return "#(" + ", ".join(values) + ")"
+
+
+# ==========================
+# Bulk Result
+# ==========================
+class BulkResult:
+    """
+    Per-item outcome of one bulk operation. Each item is a dict:
+    mat_path, name, new_mat_path, new_name, thumb (new thumbnail path or
+    None) and error (None = done).
+    """
+
+    def __init__(self, operation):
+        self.operation = operation
+        self.items = []
+        self.removed_files = []         # libraries left empty and deleted
+
+    def add(self, mat_path, name, new_mat_path=None, new_name=None):
+        item = {"mat_path": _norm(mat_path), "name": name,
+                "new_mat_path": _norm(new_mat_path or mat_path), "new_name": new_name or name,
+                "thumb": None, "error": None}
+        self.items.append(item)
+        return item
+
+    @property
+    def done(self):
+        return [item for item in self.items if item["error"] is None]
+
+    @property
+    def failed(self):
+        return [item for item in self.items if item["error"] is not None]
+
+    def summary(self):
+        text = f"{self.operation}: {len(self.done)} of {len(self.items)} done"
+        return text + (f", {len(self.failed)} failed" if self.failed else "")
+
+    def __repr__(self):
+        return f"BulkResult({self.summary()})"
+
+
+def _run_script(rt, script, result, items_of_lib):
+    """
+    Run one generated MaxScript and apply its report lines:
+    "<lib>\\t<name>\\t<status>", name "*" = the whole library.
+    """
+    try:
+        report = rt.execute(script)
+    except Exception as e:
+        report = None
+        for items in items_of_lib.values():
+            for item in items:
+                item["error"] = f"MaxScript failed: {e}"
+        return set()
+    empty = set()
+    for line in str(report or "").splitlines():
+        parts = line.split("\t", 2)
+        if len(parts) != 3:
+            continue
+        lib, name, status = _norm(parts[0]), parts[1], parts[2].strip()
+        if status == "OK":
+            continue
+        if status == "EMPTY":
+            empty.add(lib)
+            continue
+        for item in items_of_lib.get(lib, ()):
+            if name == "*" or item["name"] == name:
+                item["error"] = item["error"] or status.replace("_", " ").lower()
+    return empty
+
+
+# ==========================
+# Filesystem pass helpers
+# ==========================
+class _FolderListing:
+    """One os.scandir per folder, shared by every item of the batch."""
+
+    def __init__(self):
+        self._names = {}
+
+    def files(self, folder):
+        folder = _norm(folder)
+        names = self._names.get(folder)
+        if names is None:
+            names = {}
+            try:
+                with os.scandir(folder) as it:
+                    for entry in it:
+                        names[entry.name.lower()] = entry.name
+            except OSError as e:
+                print(f"[WARNING] Could not list {folder}: {e}")
+            self._names[folder] = names
+        return names
+
+    def find(self, folder, file_name):
+        real = self.files(folder).get(file_name.lower())
+        return _norm(os.path.join(folder, real)) if real else None
+
+    def forget(self, folder):
+        self._names.pop(_norm(folder), None)
+
+
+def _move_file(src, dst):
+    if os.path.exists(dst):
+        os.remove(dst)
+    shutil.move(src, dst)
+
+
+def library_counts(paths, index=None, libraries=None):
+    """
+    {mat_path: materials in the library, None = unknown} from the .mat
+    headers (cached in the index). The material index cannot answer this:
+    it holds one row per file. Headers without a count are asked of
+    libraries (a MaterialLibraryCache) when one is given, which loads them.
+    """
+    counts = {}
+    for path in {_norm(p) for p in paths}:
+        header = get_mat_header(path, index)
+        count = header.count if header is not None else None
+        if count is None and libraries is not None:
+            materials = libraries.library(path)
+            count = len(materials) if materials is not None else None
+        counts[path] = count
+    return counts
+
+
+def _owns_file(mat_path, name, counts):
+    """
+    Library file holds just this material and is named after it (the usual
+    one-material .mat). An unknown count is never taken as one.
+    """
+    stem = os.path.splitext(os.path.basename(mat_path))[0]
+    return counts.get(_norm(mat_path)) == 1 and stem.lower() == name.lower()
+
+
+# ==========================
+# Bulk move
+# ==========================
+def move_materials(rt, items, destination, counts=None):
+    """
+    Move [(mat_path, name)] into destination/<name>.mat.
+
+    Libraries that hold only that material are moved as files. The rest go
+    through one MaxScript run: each source library is loaded once, every
+    destination library is loaded / created once. Destinations are saved
+    first; a material is then removed from its source only if its
+    destination was saved, so a failure leaves a copy, never a loss.
+    Thumbnails move in the same filesystem pass. counts: {mat_path:
+    materials in it} from library_counts.
+    """
+    counts = counts or {}
+    destination = _norm(destination).rstrip("/")
+    result = BulkResult("Move")
+    listing = _FolderListing()
+    by_source = {}
+    file_moves = []
+    for mat_path, name in items:
+        item = result.add(mat_path, name, os.path.join(destination, f"{name}.mat"))
+        if os.path.dirname(item["mat_path"]) == destination:
+            item["error"] = "already in this folder"
+        elif _owns_file(item["mat_path"], name, counts) and not os.path.exists(item["new_mat_path"]):
+            file_moves.append(item)
+        else:
+            by_source.setdefault(item["mat_path"], []).append(item)
+
+    if by_source:
+        blocks = []
+        for lib, lib_items in by_source.items():
+            pairs = _ms_array(_ms_array([ms_string(i["name"]), ms_string(i["new_mat_path"])]) for i in lib_items)
+            blocks.append(f'''
+    try (
+        local src = loadTempMaterialLibrary {ms_string(lib)}
+        local names = for i = 1 to src.count collect src[i].name
+        local moves = #()
+        for it in {pairs} do (
+            local k = findItem names it[1]
+            if k == 0 then format "%\\t%\\tNOT_FOUND\\n" {ms_string(lib)} it[1] to:out
+            else (
+                local d = findItem dstPaths it[2]
+                if d == 0 do (
+                    append dstPaths it[2]
+                    append dstLibs (if doesFileExist it[2] then loadTempMaterialLibrary it[2] else MaterialLibrary())
+                    d = dstPaths.count
+                )
+                append dstLibs[d] src[k]
+                append moves #(it[1], d)
+            )
+        )
+        append srcPaths {ms_string(lib)}
+        append srcLibs src
+        append srcMoves moves
+    ) catch (
+        format "%\\t*\\tERROR %\\n" {ms_string(lib)} (getCurrentException()) to:out
+    )''')
+        script = f'''(
+    local out = stringStream ""
+    local dstPaths = #()
+    local dstLibs = #()
+    local srcPaths = #()
+    local srcLibs = #()
+    local srcMoves = #()
+{"".join(blocks)}
+    -- destinations first, then each source loses only what reached a saved destination
+    local dstSaved = for d = 1 to dstPaths.count collect (
+        try ( saveTempMaterialLibrary dstLibs[d] dstPaths[d]; true )
+        catch ( format "%\\t*\\tSAVE_ERROR\\n" dstPaths[d] to:out; false )
+    )
+    for s = 1 to srcPaths.count do (
+        local gone = for m in srcMoves[s] where dstSaved[m[2]] collect m[1]
+        if gone.count > 0 do (
+            try (
+                for i = srcLibs[s].count to 1 by -1 do if findItem gone srcLibs[s][i].name > 0 do deleteItem srcLibs[s] i
+                saveTempMaterialLibrary srcLibs[s] srcPaths[s]
+                if srcLibs[s].count == 0 do format "%\\t*\\tEMPTY\\n" srcPaths[s] to:out
+            ) catch (
+                for n in gone do format "%\\t%\\tCOPIED_BUT_SOURCE_NOT_SAVED\\n" srcPaths[s] n to:out
+            )
+        )
+    )
+    out as string
+)'''
+        items_of_lib = dict(by_source)
+        for lib_items in by_source.values():
+            for item in lib_items:
+                items_of_lib.setdefault(item["new_mat_path"], []).append(item)
+        empty = _run_script(rt, script, result, items_of_lib)
+        for lib in empty:
+            try:
+                os.remove(lib)
+                result.removed_files.append(lib)
+            except OSError as e:
+                print(f"[WARNING] Could not delete empty library {lib}: {e}")
+
+    # --- one filesystem pass ---
+    for item in file_moves:
+        try:
+            _move_file(item["mat_path"], item["new_mat_path"])
+        except Exception as e:
+            item["error"] = f"move failed: {e}"
+    for item in result.done:
+        src_dir = os.path.dirname(item["mat_path"])
+        thumb = listing.find(src_dir, f"{item['name']}.jpg")
+        if not thumb:
+            continue
+        new_thumb = _norm(os.path.join(destination, os.path.basename(thumb)))
+        try:
+            _move_file(thumb, new_thumb)
+            item["thumb"] = new_thumb
+        except Exception as e:
+            print(f"[THUMB ERROR] Could not move thumbnail for {item['name']}: {e}")
+    return result
+
+
+# ==========================
+# Bulk delete
+# ==========================
+def delete_materials(rt, items, counts=None):
+    """
+    Delete [(mat_path, name)]. One-material libraries are deleted as files;
+    the rest are edited in one MaxScript run (each library loaded and saved
+    once). Thumbnails and libraries left empty go in the filesystem pass.
+    """
+    counts = counts or {}
+    result = BulkResult("Delete")
+    listing = _FolderListing()
+    by_lib = {}
+    file_deletes = []
+    for mat_path, name in items:
+        item = result.add(mat_path, name)
+        if _owns_file(item["mat_path"], name, counts):
+            file_deletes.append(item)
+        else:
+            by_lib.setdefault(item["mat_path"], []).append(item)
+
+    if by_lib:
+        blocks = []
+        for lib, lib_items in by_lib.items():
+            names = _ms_array(ms_string(i["name"]) for i in lib_items)
+            blocks.append(f'''
+    try (
+        local lib = loadTempMaterialLibrary {ms_string(lib)}
+        local names = {names}
+        local found = #()
+        for i = lib.count to 1 by -1 do if findItem names lib[i].name > 0 do ( append found lib[i].name; deleteItem lib i )
+        saveTempMaterialLibrary lib {ms_string(lib)}
+        for n in names where findItem found n == 0 do format "%\\t%\\tNOT_FOUND\\n" {ms_string(lib)} n to:out
+        if lib.count == 0 do format "%\\t*\\tEMPTY\\n" {ms_string(lib)} to:out
+    ) catch (
+        format "%\\t*\\tERROR %\\n" {ms_string(lib)} (getCurrentException()) to:out
+    )''')
+        script = '(\n    local out = stringStream ""' + "".join(blocks) + "\n    out as string\n)"
+        for lib in _run_script(rt, script, result, by_lib):
+            file_deletes.extend(i for i in by_lib[lib] if i not in file_deletes and i["error"] is None)
+            result.removed_files.append(lib)
+
+    # --- one filesystem pass ---
+    for item in file_deletes:
+        try:
+            if os.path.exists(item["mat_path"]):
+                os.remove(item["mat_path"])
+            if item["mat_path"] not in result.removed_files:
+                result.removed_files.append(item["mat_path"])
+        except Exception as e:
+            item["error"] = f"delete failed: {e}"
+    for item in result.done:
+        thumb = listing.find(os.path.dirname(item["mat_path"]), f"{item['name']}.jpg")
+        if thumb:
+            try:
+                os.remove(thumb)
+            except OSError as e:
+                print(f"[WARNING] Failed to delete thumbnail {thumb}: {e}")
+    return result
+
+
+# ==========================
+# Bulk rename (pattern)
+# ==========================
+_INVALID_NAME = re.compile(r'[<>:"/\\|?*]')
+
+
+def expand_pattern(pattern, name, number, folder=""):
+    """
+    New name for one material. Pattern fields: {name}, {n} (with format
+    spec, e.g. {n:03}), {folder}; a run of '#' is the zero-padded counter,
+    so "Wood_###" -> Wood_001, Wood_002 ... Plain text without fields
+    gets the counter appended.
+    """
+    text = re.sub(r"#+", lambda m: "{n:0%d}" % len(m.group(0)), pattern)
+    if "{" not in text:
+        text += "_{n:02}"
+    return text.format(name=name, n=number, folder=os.path.basename(folder.rstrip("/"))).strip()
+
+
+def plan_renames(items, pattern, start=1):
+    """[(mat_path, name, new_name)] for items in order, or raises ValueError on bad / clashing names."""
+    plan, taken = [], set()
+    for offset, (mat_path, name) in enumerate(items):
+        try:
+            new_name = expand_pattern(pattern, name, start + offset, os.path.dirname(_norm(mat_path)))
+        except (KeyError, ValueError, IndexError) as e:
+            raise ValueError(f"Invalid pattern '{pattern}': {e}")
+        if not new_name or _INVALID_NAME.search(new_name):
+            raise ValueError(f"'{new_name}' is not a valid material name")
+        key = (os.path.dirname(_norm(mat_path)).lower(), new_name.lower())
+        if key in taken:
+            raise ValueError(f"Pattern gives '{new_name}' twice in the same folder")
+        taken.add(key)
+        plan.append((mat_path, name, new_name))
+    return plan
+
+
+def rename_materials(rt, plan, counts=None):
+    """
+    Apply plan_renames output. One MaxScript run renames inside every
+    touched library (each loaded and saved once); the filesystem pass then
+    renames one-material libraries named after their material, and the
+    thumbnails.
+    """
+    counts = counts or {}
+    result = BulkResult("Rename")
+    listing = _FolderListing()
+    by_lib = {}
+    for mat_path, name, new_name in plan:
+        item = result.add(mat_path, name, new_name=new_name)
+        if new_name == name:
+            continue
+        by_lib.setdefault(item["mat_path"], []).append(item)
+
+    if by_lib:
+        blocks = []
+        for lib, lib_items in by_lib.items():
+            pairs = _ms_array(_ms_array([ms_string(i["name"]), ms_string(i["new_name"])]) for i in lib_items)
+            blocks.append(f'''
+    try (
+        local lib = loadTempMaterialLibrary {ms_string(lib)}
+        local mats = for i = 1 to lib.count collect lib[i]
+        local names = for m in mats collect m.name
+        for it in {pairs} do (
+            local k = findItem names it[1]
+            if k == 0 then format "%\\t%\\tNOT_FOUND\\n" {ms_string(lib)} it[1] to:out
+            else mats[k].name = it[2]
+        )
+        saveTempMaterialLibrary lib {ms_string(lib)}
+    ) catch (
+        format "%\\t*\\tERROR %\\n" {ms_string(lib)} (getCurrentException()) to:out
+    )''')
+        script = '(\n    local out = stringStream ""' + "".join(blocks) + "\n    out as string\n)"
+        _run_script(rt, script, result, by_lib)
+
+    # --- one filesystem pass ---
+    for item in result.done:
+        if item["new_name"] == item["name"]:
+            continue
+        folder = os.path.dirname(item["mat_path"])
+        if _owns_file(item["mat_path"], item["name"], counts):
+            new_mat_path = _norm(os.path.join(folder, f"{item['new_name']}.mat"))
+            if not os.path.exists(new_mat_path):
+                try:
+                    os.rename(item["mat_path"], new_mat_path)
+                    item["new_mat_path"] = new_mat_path
+                except OSError as e:
+                    print(f"[WARNING] Could not rename {item['mat_path']}: {e}")
+        thumb = listing.find(folder, f"{item['name']}.jpg")
+        if thumb:
+            new_thumb = _norm(os.path.join(folder, f"{item['new_name']}.jpg"))
+            try:
+                _move_file(thumb, new_thumb)
+                item["thumb"] = new_thumb
+            except Exception as e:
+                print(f"[WARNING] Could not rename thumbnail {thumb}: {e}")
+    return result
+
+
+# ==========================
+# Batch OpenPBR materials (see pbr_sets)
+# ==========================
+PBR_BATCH_SIZE = 200        # materials per generated script
+
+# plan slot -> (OpenPBR map property, extra properties set with the map)
+OPENPBR_SLOTS = {
+    "albedo":       ("base_color_map", {"base_weight": "1.0"}),
+    "roughness":    ("specular_roughness_map", {}),
+    "metalness":    ("base_metalness_map", {}),
+    "normal":       ("geometry_normal_map", {}),
+    "opacity":      ("geometry_opacity_map", {"geometry_thin_walled": "true"}),
+    "displacement": ("displacement_map", {}),
+    "emission":     ("emission_color_map", {"emission_weight": "1.0"}),
+}
+
+
+def build_pbr_materials(rt, entries, progress=None, to_medit=False):
+    """
+    Write one OpenPBR_Material .mat per pbr_sets plan entry. The entries go
+    through a few generated scripts of PBR_BATCH_SIZE materials each, with
+    the map helper defined once per script, instead of one rt.execute per
+    folder. progress(done, total) runs between scripts. to_medit puts the
+    material into the first Material Editor slot, as the folder action did.
+    """
+    result = BulkResult("Build PBR")
+    items = [(entry, result.add(entry["lib_path"], entry["name"])) for entry in entries]
+    for start in range(0, len(items), PBR_BATCH_SIZE):
+        chunk = items[start:start + PBR_BATCH_SIZE]
+        blocks = []
+        by_lib = {}
+        for entry, item in chunk:
+            lib = item["mat_path"]
+            by_lib.setdefault(lib, []).append(item)
+            lines = [f"local mtl = OpenPBR_Material name:{ms_string(entry['name'])}"]
+            for slot, (prop, extras) in OPENPBR_SLOTS.items():
+                tex = entry["maps"].get(slot)
+                if not tex:
+                    continue
+                call = f'setMap mtl "{prop}" {ms_string(_norm(tex))} {"true" if slot == "normal" else "false"}'
+                if extras:
+                    lines.append(f"if {call} do (")
+                    lines.extend(f"    mtl.{name} = {value}" for name, value in extras.items())
+                    lines.append(")")
+                else:
+                    lines.append(call)
+            if to_medit:
+                lines.append("meditMaterials[1] = mtl")
+            lines.append("local lib = MaterialLibrary()")
+            lines.append("append lib mtl")
+            lines.append(f"saveTempMaterialLibrary lib {ms_string(lib)}")
+            body = "\n        ".join(lines)
+            blocks.append(f'''
+    try (
+        {body}
+    ) catch (
+        format "%\\t%\\tERROR %\\n" {ms_string(lib)} {ms_string(entry["name"])} (getCurrentException()) to:out
+    )''')
+        script = '''(
+    local out = stringStream ""
+    fn setMap mtl prop texPath isNormal = (
+        if doesFileExist texPath then (
+            local bmpTex = Bitmaptexture filename:texPath
+            if isNormal then (
+                local normNode = Normal_Bump()
+                normNode.normal_map = bmpTex
+                setProperty mtl prop normNode
+            ) else (
+                setProperty mtl prop bmpTex
+            )
+            setProperty mtl (prop + "_on") true
+            true
+        ) else false
+    )''' + "".join(blocks) + "\n    out as string\n)"
+        _run_script(rt, script, result, by_lib)
+        if progress:
+            progress(min(start + PBR_BATCH_SIZE, len(items)), len(items))
+    for item in result.done:
+        if not os.path.exists(item["mat_path"]):
+            item["error"] = "library was not written"
+    return result
@@ -0,0 +1,358 @@
+MAX_PARENT_DEPTH = 25                               # parent hops before a window counts as foreign
+VIEWPORT_CLASS_HINTS = ("ViewExWnd", "AfxFrameOrView")  # fallback when the Max main window is unknown
+
+
+# ==========================
+# Window platform (drag hit-testing)
+# ==========================
+class WindowPlatform:
+    """
+    What the drag code needs from the windowing system. Coordinates are
+    physical pixels; window handles are plain ints (0 = none).
+    Win32Platform is the real one, FakeWindowPlatform stands in on other
+    systems.
+    """
+
+    def cursor_pos(self):
+        raise NotImplementedError
+
+    def button_down(self):
+        """True while the left mouse button is held (even outside Qt)."""
+        raise NotImplementedError
+
+    def window_at(self, x, y):
+        raise NotImplementedError
+
+    def parent(self, hwnd):
+        raise NotImplementedError
+
+    def class_name(self, hwnd):
+        raise NotImplementedError
+
+    def screen_to_client(self, hwnd, x, y):
+        raise NotImplementedError
+
+    def main_window(self):
+        """Handle of the 3ds Max main window, or None if it cannot be found."""
+        raise NotImplementedError
+
+
+class Win32Platform(WindowPlatform):
+    """
+    user32 calls. All of them work in PHYSICAL pixels, so they are
+    DPI-transparent; mapScreenToWorldRay expects the same.
+    """
+
+    VK_LBUTTON = 0x01
+
+    def __init__(self):
+        import ctypes
+        from ctypes import wintypes
+        self._ctypes = ctypes
+        self._wintypes = wintypes
+        self._user32 = None
+
+    @property
+    def user32(self):
+        if self._user32 is None:
+            self._user32 = self._ctypes.windll.user32
+        return self._user32
+
+    def cursor_pos(self):
+        pt = self._wintypes.POINT()
+        self.user32.GetCursorPos(self._ctypes.byref(pt))
+        return pt.x, pt.y
+
+    def button_down(self):
+        return bool(self.user32.GetAsyncKeyState(self.VK_LBUTTON) & 0x8000)
+
+    def window_at(self, x, y):
+        return self.user32.WindowFromPoint(self._wintypes.POINT(x, y)) or 0
+
+    def parent(self, hwnd):
+        return self.user32.GetParent(hwnd) or 0
+
+    def class_name(self, hwnd):
+        buf = self._ctypes.create_unicode_buffer(256)
+        self.user32.GetClassNameW(hwnd, buf, 256)
+        return buf.value
+
+    def screen_to_client(self, hwnd, x, y):
+        pt = self._wintypes.POINT(x, y)
+        self.user32.ScreenToClient(hwnd, self._ctypes.byref(pt))
+        return pt.x, pt.y
+
+    def main_window(self):
+        try:
+            from qtmax import GetQMaxMainWindow
+            return int(GetQMaxMainWindow().winId())
+        except Exception:
+            return None
+
+
+class FakeWindowPlatform(WindowPlatform):
+    """
+    In-memory window tree for exercising the drag code off Windows.
+    windows: {hwnd: (parent hwnd or 0, class name, (left, top, right, bottom))};
+    window_at() returns the deepest window containing the point. Calls are
+    counted in .calls to compare hit-test strategies.
+    """
+
+    def __init__(self, windows, main=None):
+        self.windows = dict(windows)
+        self.main = main
+        self.cursor = (0, 0)
+        self.pressed = False
+        self.calls = {}
+
+    def _count(self, name):
+        self.calls[name] = self.calls.get(name, 0) + 1
+
+    def _depth(self, hwnd):
+        depth = 0
+        while hwnd:
+            hwnd = self.windows[hwnd][0] if hwnd in self.windows else 0
+            depth += 1
+        return depth
+
+    def cursor_pos(self):
+        self._count("cursor_pos")
+        return self.cursor
+
+    def button_down(self):
+        self._count("button_down")
+        return self.pressed
+
+    def window_at(self, x, y):
+        self._count("window_at")
+        best, best_depth = 0, -1
+        for hwnd, (_parent, _cls, (left, top, right, bottom)) in self.windows.items():
+            if left <= x < right and top <= y < bottom:
+                depth = self._depth(hwnd)
+                if depth > best_depth:
+                    best, best_depth = hwnd, depth
+        return best
+
+    def parent(self, hwnd):
+        self._count("parent")
+        return self.windows[hwnd][0] if hwnd in self.windows else 0
+
+    def class_name(self, hwnd):
+        self._count("class_name")
+        return self.windows[hwnd][1] if hwnd in self.windows else ""
+
+    def screen_to_client(self, hwnd, x, y):
+        self._count("screen_to_client")
+        left, top = self.windows[hwnd][2][:2] if hwnd in self.windows else (0, 0)
+        return x - left, y - top
+
+    def main_window(self):
+        self._count("main_window")
+        return self.main
+
+
+def default_platform():
+    return Win32Platform()
+
+
+# ==========================
+# Viewport hit tester
+# ==========================
+class ViewportHitTester:
+    """
+    Per-drag answer to "is the cursor over 3ds Max?".
+
+    The Max main window handle is looked up once in begin(). Each window's
+    answer is memoised, along with every ancestor seen on the way up, so
+    a parent walk happens once per window per drag. sample() re-checks
+    only when WindowFromPoint returns a handle different from the last
+    one. end() drops the memo, because handles can be reused after a
+    window closes.
+    """
+
+    def __init__(self, platform=None):
+        self.platform = platform or default_platform()
+        self._main = None
+        self._memo = {}
+        self._last = (None, False)
+
+    def begin(self):
+        self._main = self.platform.main_window()
+        self._memo = {}
+        self._last = (None, False)
+
+    def end(self):
+        self._main = None
+        self._memo = {}
+        self._last = (None, False)
+
+    def is_viewport(self, hwnd):
+        """True if hwnd is anywhere inside the 3ds Max main window."""
+        if not hwnd:
+            return False
+        known = self._memo.get(hwnd)
+        if known is not None:
+            return known
+        if self._main is None:
+            name = self.platform.class_name(hwnd)
+            inside = any(hint in name for hint in VIEWPORT_CLASS_HINTS)
+            self._memo[hwnd] = inside
+            return inside
+
+        chain = []
+        check = hwnd
+        inside = False
+        for _ in range(MAX_PARENT_DEPTH):
+            known = self._memo.get(check)
+            if known is not None:
+                inside = known
+                break
+            chain.append(check)
+            if check == self._main:
+                inside = True
+                break
+            check = self.platform.parent(check)
+            if not check:
+                break
+        else:
+            # too deep to tell for the windows below; ancestors stay unknown
+            self._memo[hwnd] = False
+            return False
+        for window in chain:
+            self._memo[window] = inside
+        return inside
+
+    def sample(self, x, y):
+        """(hwnd, over Max) at physical (x, y); cached while the cursor stays on one window."""
+        hwnd = self.platform.window_at(x, y)
+        if hwnd != self._last[0]:
+            self._last = (hwnd, self.is_viewport(hwnd))
+        return self._last
+
+    def to_local(self, hwnd, x, y):
+        """Physical screen coords -> client-area coords of hwnd (what mapScreenToWorldRay expects)."""
+        return self.platform.screen_to_client(hwnd, x, y)
+
+
+# ==========================
+# Drag session (state machine)
+# ==========================
+DRAG_MOVE = "move"
+DRAG_DROP = "drop"
+
+
+class DragSession:
+    """
+    What one drag does between mouse-down and mouse-up, without Qt: the
+    list view only starts it, calls tick() from its poll timer and draws
+    the overlay / cursor from the answers.
+
+    tick() -> (DRAG_MOVE, over Max) while the button is held, or
+    (DRAG_DROP, (node, status)) once it is released; status is "" for a
+    hit, else "NO_HIT", "NO_RAY" or "NOT_OVER_MAX". The object under the
+    cursor is picked while hovering, at most every hover_ticks ticks and
+    once per cursor position, so the drop itself only assigns.
+    resolver: DropTargetResolver (pick(x, y) / node_key(node) / highlight(node)).
+    on_hover(node) runs when the hovered object changes; objects are told
+    apart by node_key, since each pick returns a new pymxs wrapper.
+    """
+
+    HOVER_TICKS = 3
+
+    def __init__(self, platform=None, resolver=None, on_hover=None, hover_ticks=HOVER_TICKS):
+        self.hits = ViewportHitTester(platform)
+        self.platform = self.hits.platform
+        self.resolver = resolver
+        self.on_hover = on_hover
+        self.hover_ticks = max(1, int(hover_ticks))
+        self.active = False
+        self.material = None            # material handle, prefetched by the caller
+        self._reset_hover()
+
+    def _reset_hover(self):
+        self._hover_key = None          # (hwnd, vp_x, vp_y) the hover target was picked at
+        self._hover = (None, "NO_HIT")
+        self._hover_node = None         # node_key of the hovered object
+        self._hover_wait = 0
+
+    @property
+    def hover(self):
+        """(node, status) currently under the cursor."""
+        return self._hover
+
+    def begin(self, resolver=None):
+        if resolver is not None:
+            self.resolver = resolver
+        self.active = True
+        self.material = None
+        self._reset_hover()
+        self.hits.begin()
+
+    def tick(self):
+        if not self.platform.button_down():
+            x, y = self.platform.cursor_pos()
+            return DRAG_DROP, self.drop_at(x, y)
+
+        x, y = self.platform.cursor_pos()
+        hwnd, over_max = self.hits.sample(x, y)
+        if not over_max:
+            self._set_hover(None, None, "NO_HIT")
+        elif self._hover_wait > 0:
+            self._hover_wait -= 1
+        else:
+            vp_x, vp_y = self.hits.to_local(hwnd, x, y)
+            self.target_at(hwnd, int(vp_x), int(vp_y))
+            self._hover_wait = self.hover_ticks - 1
+        return DRAG_MOVE, over_max
+
+    def drop_at(self, x, y):
+        """(node, status) for a drop at physical screen (x, y)."""
+        hwnd, over_max = self.hits.sample(x, y)
+        if not over_max:
+            return None, "NOT_OVER_MAX"
+        # physical viewport-local coords: what mapScreenToWorldRay expects
+        vp_x, vp_y = self.hits.to_local(hwnd, x, y)
+        return self.target_at(hwnd, int(vp_x), int(vp_y))
+
+    def target_at(self, hwnd, vp_x, vp_y):
+        """(node, status) under a viewport pixel; picked once per cursor position."""
+        key = (hwnd, vp_x, vp_y)
+        if key != self._hover_key:
+            try:
+                node, status = self.resolver.pick(vp_x, vp_y)
+            except Exception as e:
+                print(f"[WARNING] Drop target pick failed: {e}")
+                node, status = None, "NO_HIT"
+            self._set_hover(key, node, status)
+        return self._hover
+
+    def _node_key(self, node):
+        if node is None:
+            return None
+        try:
+            return self.resolver.node_key(node)
+        except Exception as e:
+            print(f"[WARNING] Drop target key failed: {e}")
+            return id(node)
+
+    def _set_hover(self, key, node, status):
+        node_key = self._node_key(node)
+        self._hover_key = key
+        self._hover = (node, status)
+        if node_key == self._hover_node:
+            return
+        self._hover_node = node_key
+        try:
+            self.resolver.highlight(node)
+        except Exception as e:
+            print(f"[WARNING] Drop target highlight failed: {e}")
+        if self.on_hover:
+            self.on_hover(node)
+
+    def end(self):
+        if self._hover[0] is not None:
+            self._set_hover(None, None, "NO_HIT")
+        self._reset_hover()
+        self.material = None
+        self.hits.end()
+        self.active = False
@@ -0,0 +1,401 @@
+REBUILD_FRACTION = 0.25      # more changed nodes than this share of the scene: rebuild instead of refit
+BOX_PADDING = 1e-3           # relative slack on each box (MaxScript formats floats with ~6 digits)
+_FAR = 1e30
+
+
+# ==========================
+# Bounding volume hierarchy (pure Python)
+# ==========================
+class BoundsBVH:
+    """
+    Binary BVH over world-space AABBs, keyed by anything hashable (the
+    scene nodes' anim handles here).
+
+    Built once by median split on the widest centroid axis; nodes are
+    stored flat in pre-order, so refit() is one reverse pass. update() /
+    remove() change single boxes and mark the tree for a refit, which runs
+    lazily on the next raycast(). A key the tree does not hold cannot be
+    inserted: update() returns False and the caller rebuilds.
+    """
+
+    LEAF_SIZE = 4
+
+    def __init__(self, items=()):
+        self.build(items)
+
+    def build(self, items):
+        """items: iterable of (key, (min_x, min_y, min_z, max_x, max_y, max_z))."""
+        self.keys = []
+        self.boxes = []
+        for key, box in items:
+            self.keys.append(key)
+            self.boxes.append(tuple(box))
+        self._slot = {key: i for i, key in enumerate(self.keys)}
+        self._order = list(range(len(self.keys)))
+        self._centers = [(b[0] + b[3], b[1] + b[4], b[2] + b[5]) for b in self.boxes]
+        self._node_box = []
+        self._node_first = []       # leaf: first position in _order
+        self._node_count = []       # leaf: item count, 0 = inner node
+        self._node_right = []       # inner: index of the right child (left child is node + 1)
+        self._stale = False
+        if self._order:
+            self._build(0, len(self._order))
+        self._centers = None
+
+    def _bounds(self, start, end):
+        boxes = self.boxes
+        order = self._order
+        lo = [_FAR, _FAR, _FAR]
+        hi = [-_FAR, -_FAR, -_FAR]
+        for i in range(start, end):
+            box = boxes[order[i]]
+            if box is None:
+                continue
+            for axis in range(3):
+                if box[axis] < lo[axis]:
+                    lo[axis] = box[axis]
+                if box[axis + 3] > hi[axis]:
+                    hi[axis] = box[axis + 3]
+        return (lo[0], lo[1], lo[2], hi[0], hi[1], hi[2])
+
+    def _build(self, start, end):
+        node = len(self._node_box)
+        self._node_box.append(self._bounds(start, end))
+        self._node_first.append(start)
+        self._node_count.append(end - start)
+        self._node_right.append(-1)
+        if end - start <= self.LEAF_SIZE:
+            return node
+
+        centers = self._centers
+        segment = self._order[start:end]
+        extents = []
+        for axis in range(3):
+            values = [centers[i][axis] for i in segment]
+            extents.append(max(values) - min(values))
+        axis = extents.index(max(extents))
+        if extents[axis] <= 0.0:
+            return node         # all centred on one point: keep as one leaf
+
+        segment.sort(key=lambda i: centers[i][axis])
+        self._order[start:end] = segment
+        mid = (start + end) // 2
+        self._node_count[node] = 0
+        self._build(start, mid)
+        self._node_right[node] = self._build(mid, end)
+        return node
+
+    def __len__(self):
+        return len(self._slot)
+
+    def __contains__(self, key):
+        return key in self._slot
+
+    def update(self, key, box):
+        slot = self._slot.get(key)
+        if slot is None:
+            return False
+        self.boxes[slot] = tuple(box)
+        self._stale = True
+        return True
+
+    def remove(self, key):
+        slot = self._slot.pop(key, None)
+        if slot is not None:
+            self.boxes[slot] = None
+            self._stale = True
+
+    def refit(self):
+        boxes = self.boxes
+        order = self._order
+        node_box = self._node_box
+        for node in range(len(node_box) - 1, -1, -1):
+            count = self._node_count[node]
+            if count:
+                first = self._node_first[node]
+                node_box[node] = self._bounds(first, first + count)
+            else:
+                a = node_box[node + 1]
+                b = node_box[self._node_right[node]]
+                node_box[node] = (min(a[0], b[0]), min(a[1], b[1]), min(a[2], b[2]),
+                                  max(a[3], b[3]), max(a[4], b[4]), max(a[5], b[5]))
+        self._stale = False
+
+    def raycast(self, origin, direction):
+        """
+        [(entry distance, key)] of every box the ray passes through, nearest
+        entry first. direction should be normalised for the distances to be
+        comparable with hit distances.
+        """
+        if not self._node_box:
+            return []
+        if self._stale:
+            self.refit()
+        ox, oy, oz = origin
+        ix, iy, iz = (1.0 / d if d else _FAR for d in direction)
+
+        def entry(box):
+            t1 = (box[0] - ox) * ix
+            t2 = (box[3] - ox) * ix
+            tmin, tmax = (t1, t2) if t1 < t2 else (t2, t1)
+            t1 = (box[1] - oy) * iy
+            t2 = (box[4] - oy) * iy
+            if t1 > t2:
+                t1, t2 = t2, t1
+            tmin, tmax = max(tmin, t1), min(tmax, t2)
+            t1 = (box[2] - oz) * iz
+            t2 = (box[5] - oz) * iz
+            if t1 > t2:
+                t1, t2 = t2, t1
+            tmin, tmax = max(tmin, t1), min(tmax, t2)
+            if tmax < tmin or tmax < 0.0:
+                return None
+            return max(tmin, 0.0)
+
+        hits = []
+        stack = [0]
+        boxes = self.boxes
+        order = self._order
+        while stack:
+            node = stack.pop()
+            if entry(self._node_box[node]) is None:
+                continue
+            count = self._node_count[node]
+            if not count:
+                stack.append(self._node_right[node])
+                stack.append(node + 1)
+                continue
+            first = self._node_first[node]
+            for i in order[first:first + count]:
+                box = boxes[i]
+                if box is None:
+                    continue
+                t = entry(box)
+                if t is not None:
+                    hits.append((t, self.keys[i]))
+        hits.sort(key=lambda hit: hit[0])
+        return hits
+
+
+def parse_bounds(text):
+    """'handle minx miny minz maxx maxy maxz' lines (from MaxScript) -> [(handle, padded box)]."""
+    items = []
+    for line in (text or "").splitlines():
+        parts = line.split()
+        if len(parts) != 7:
+            continue
+        try:
+            values = [float(v) for v in parts[1:]]
+            handle = int(parts[0])
+        except ValueError:
+            continue
+        pad = [BOX_PADDING * max(1.0, abs(values[a + 3] - values[a])) for a in range(3)]
+        items.append((handle, (values[0] - pad[0], values[1] - pad[1], values[2] - pad[2],
+                               values[3] + pad[0], values[4] + pad[1], values[5] + pad[2])))
+    return items
+
+
+# ==========================
+# Drop target resolver (pymxs)
+# ==========================
+# Global scope on purpose: the NodeEventCallback has to outlive this call.
+# Bounds are reported as text, one marshalled string instead of 30k arrays.
+_SCENE_SCRIPT = r'''
+global mabDropTargetsDirty = true
+global mabDropTargetsChanged = #()
+global mabDropTargetsEvents
+global mabDropTargetsHover = undefined
+callbacks.removeScripts id:#mabDropTargets
+try (unregisterRedrawViewsCallback mabDropTargetsDrawHover) catch ()
+mabDropTargetsEvents = undefined
+gc light:true
+
+fn mabDropTargetsRebuild ev handles = ( mabDropTargetsDirty = true )
+fn mabDropTargetsMoved ev handles = ( join mabDropTargetsChanged handles )
+
+fn mabDropTargetsTake = (
+    local result = #(mabDropTargetsDirty, makeUniqueArray mabDropTargetsChanged)
+    mabDropTargetsDirty = false
+    mabDropTargetsChanged = #()
+    result
+)
+
+fn mabDropTargetsTree obj out = (
+    append out obj
+    for child in obj.children do mabDropTargetsTree child out
+)
+
+fn mabDropTargetsBounds handles = (
+    local objs = #()
+    if handles == undefined then (
+        objs = geometry as array
+    ) else (
+        for h in handles do (
+            local obj = getAnimByHandle h
+            if isValidNode obj do mabDropTargetsTree obj objs
+        )
+        objs = makeUniqueArray objs
+    )
+    local ss = stringStream ""
+    for obj in objs where superClassOf obj == GeometryClass and not obj.isHiddenInVpt do (
+        local a = obj.min
+        local b = obj.max
+        format "% % % % % % %\n" (getHandleByAnim obj) a.x a.y a.z b.x b.y b.z to:ss
+    )
+    ss as string
+)
+
+fn mabDropTargetsPick theRay handles entries = (
+    local closest = undefined
+    local closestDist = 1e30
+    for i = 1 to handles.count while entries[i] < closestDist do (
+        local obj = getAnimByHandle handles[i]
+        if isValidNode obj do (
+            try (
+                local h = intersectRay obj theRay
+                if h != undefined do (
+                    local d = distance theRay.pos h.pos
+                    if d < closestDist do (
+                        closestDist = d
+                        closest = obj
+                    )
+                )
+            ) catch ()
+        )
+    )
+    closest
+)
+
+-- drag hover highlight: the target's world box, drawn over the viewports
+fn mabDropTargetsDrawHover = (
+    if isValidNode mabDropTargetsHover do (
+        local a = mabDropTargetsHover.min
+        local b = mabDropTargetsHover.max
+        local p = for i = 0 to 7 collect \
+            [if bit.get i 1 then b.x else a.x, if bit.get i 2 then b.y else a.y, if bit.get i 3 then b.z else a.z]
+        gw.setTransform (matrix3 1)
+        gw.setColor #line (color 0 178 255)
+        for e in #(#(1,2), #(3,4), #(5,6), #(7,8), #(1,3), #(2,4), #(5,7), #(6,8), #(1,5), #(2,6), #(3,7), #(4,8)) do
+            gw.polyline #(p[e[1]], p[e[2]]) false
+        gw.enlargeUpdateRect #whole
+        gw.updateScreen()
+    )
+)
+
+fn mabDropTargetsSetHover obj = (
+    if obj != mabDropTargetsHover do (
+        mabDropTargetsHover = obj
+        unregisterRedrawViewsCallback mabDropTargetsDrawHover
+        if obj != undefined do registerRedrawViewsCallback mabDropTargetsDrawHover
+        redrawViews()
+    )
+    true
+)
+
+mabDropTargetsEvents = NodeEventCallback mouseUp:true \
+    added:mabDropTargetsRebuild deleted:mabDropTargetsRebuild hideChanged:mabDropTargetsRebuild \
+    layerChanged:mabDropTargetsRebuild displayPropertiesChanged:mabDropTargetsRebuild \
+    geometryChanged:mabDropTargetsMoved topologyChanged:mabDropTargetsMoved \
+    controllerOtherEvent:mabDropTargetsMoved linkChanged:mabDropTargetsMoved
+callbacks.addScript #systemPostReset "mabDropTargetsDirty = true" id:#mabDropTargets
+callbacks.addScript #systemPostNew "mabDropTargetsDirty = true" id:#mabDropTargets
+callbacks.addScript #filePostOpen "mabDropTargetsDirty = true" id:#mabDropTargets
+callbacks.addScript #filePostMerge "mabDropTargetsDirty = true" id:#mabDropTargets
+callbacks.addScript #sceneUndo "mabDropTargetsDirty = true" id:#mabDropTargets
+callbacks.addScript #sceneRedo "mabDropTargetsDirty = true" id:#mabDropTargets
+true
+'''
+
+
+class DropTargetResolver:
+    """
+    Finds the scene object under a viewport pixel for drag-and-drop.
+
+    World bounds of the visible geometry are pulled once into a BoundsBVH;
+    scene callbacks (node added / deleted / hidden, file open, reset, undo)
+    flag a rebuild and a NodeEventCallback collects nodes whose geometry
+    or transform changed, which are refit on the next pick. A pick casts
+    the viewport ray through the BVH in Python and runs intersectRay only
+    on the candidate boxes, nearest first, stopping once a hit is closer
+    than the next box.
+    """
+
+    def __init__(self, rt=None):
+        self._rt = rt
+        self._installed = False
+        self.bvh = BoundsBVH()
+
+    @property
+    def rt(self):
+        if self._rt is None:
+            from pymxs import runtime as rt
+            self._rt = rt
+        return self._rt
+
+    def install(self):
+        if not self._installed:
+            self.rt.execute(_SCENE_SCRIPT)
+            self._installed = True
+
+    def uninstall(self):
+        if self._installed:
+            self.highlight(None)
+            self.rt.execute("callbacks.removeScripts id:#mabDropTargets; mabDropTargetsEvents = undefined; gc light:true")
+            self._installed = False
+
+    def sync(self):
+        """Apply scene changes since the last pick: full rebuild or refit of the changed nodes."""
+        self.install()
+        rt = self.rt
+        rebuild, changed = rt.mabDropTargetsTake()
+        changed = [int(h) for h in changed]
+        if not rebuild and changed and len(changed) > REBUILD_FRACTION * max(1, len(self.bvh)):
+            rebuild = True
+        if rebuild:
+            self.bvh.build(parse_bounds(str(rt.mabDropTargetsBounds(None))))
+            return
+        if not changed:
+            return
+        fresh = dict(parse_bounds(str(rt.mabDropTargetsBounds(changed))))
+        for handle in changed:
+            if handle not in fresh:
+                self.bvh.remove(handle)    # hidden, deleted or no longer geometry
+        for handle, box in fresh.items():
+            if not self.bvh.update(handle, box):
+                # a child that was not geometry before: only a rebuild can add it
+                self.bvh.build(parse_bounds(str(rt.mabDropTargetsBounds(None))))
+                return
+
+    def pick(self, vp_x, vp_y):
+        """(node, "") for the object under viewport pixel (vp_x, vp_y), or (None, "NO_RAY" / "NO_HIT")."""
+        rt = self.rt
+        self.sync()
+        ray = rt.mapScreenToWorldRay(rt.Point2(vp_x, vp_y))
+        if ray is None:
+            return None, "NO_RAY"
+        origin = (ray.pos.x, ray.pos.y, ray.pos.z)
+        direction = (ray.dir.x, ray.dir.y, ray.dir.z)
+        length = sum(d * d for d in direction) ** 0.5
+        if not length:
+            return None, "NO_RAY"
+        direction = tuple(d / length for d in direction)
+
+        candidates = self.bvh.raycast(origin, direction)
+        if not candidates:
+            return None, "NO_HIT"
+        node = rt.mabDropTargetsPick(ray, [key for _t, key in candidates], [t for t, _key in candidates])
+        if node is None:
+            return None, "NO_HIT"
+        return node, ""
+
+    def node_key(self, node):
+        """Stable id of a picked node (its anim handle); pymxs wraps the same node anew on every call."""
+        if node is None:
+            return None
+        return int(self.rt.getHandleByAnim(node))
+
+    def highlight(self, node):
+        """Outline node's bounding box in the viewports (None clears it)."""
+        if self._installed or node is not None:
+            self.install()
+            self.rt.mabDropTargetsSetHover(node)
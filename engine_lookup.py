@@ -0,0 +1,87 @@
+import json
+import hashlib
+
+from mat_reader import class_key, class_id_key
+
+
+# engines whose listed names also match longer class names ("ai_standard_surface" in
+# "ai_standard_surface_v2"), as the browser's Arnold filter always did
+SUBSTRING_ENGINES = ("arnold",)
+
+
+# ==========================
+# Engine Lookup (class -> engines)
+# ==========================
+class EngineLookup:
+    """
+    Precompiled answer to "which render engines accept this material class,
+    and which engine scene renders its thumbnail", built once from
+    AssetBrowserWidget.allowed_classes.
+
+    Engines are bits of an int mask so the material index can store the
+    result per row (engine_mask / thumb_engine) and filter with one bit test.
+    A class nobody lists (or an unreadable header) gets every bit: unknown
+    materials stay visible, as they always have. For SUBSTRING_ENGINES a
+    class also counts when a listed name is part of it; those answers are
+    memoised per class key.
+    """
+
+    def __init__(self, allowed_classes, scene_engines=(), generic_classes=(),
+                 substring_engines=SUBSTRING_ENGINES):
+        self.engines = list(allowed_classes)
+        self.bits = {engine: 1 << i for i, engine in enumerate(self.engines)}
+        self.all_mask = (1 << len(self.engines)) - 1
+        generic = {class_key(cls) for cls in generic_classes}
+
+        self._mask_of = {}          # class key -> engine mask
+        self._thumb_of = {}         # class key -> engine with a thumbnail scene
+        for engine, classes in allowed_classes.items():
+            for cls in classes:
+                key = class_key(cls)
+                self._mask_of[key] = self._mask_of.get(key, 0) | self.bits[engine]
+        self._parts = [(class_key(cls), self.bits[engine])
+                       for engine in substring_engines if engine in self.bits
+                       for cls in allowed_classes[engine] if class_key(cls)]
+        for key in list(self._mask_of):
+            self._mask_of[key] |= self._part_mask(key)
+        for engine in scene_engines:
+            for cls in allowed_classes.get(engine, ()):
+                key = class_key(cls)
+                if key not in generic:
+                    self._thumb_of.setdefault(key, engine)
+
+        self.signature = hashlib.sha1(json.dumps(
+            [allowed_classes, list(scene_engines), sorted(generic), sorted(substring_engines)],
+            sort_keys=True).encode("utf-8")).hexdigest()
+
+    def _part_mask(self, key):
+        mask = 0
+        for part, bit in self._parts:
+            if part in key:
+                mask |= bit
+        return mask
+
+    def _mask(self, key):
+        if not key:
+            return 0
+        mask = self._mask_of.get(key)
+        if mask is None:
+            mask = self._mask_of[key] = self._part_mask(key)
+        return mask
+
+    def classify_keys(self, name_key, id_key=""):
+        """(engine mask, thumbnail engine or "") for stored class keys."""
+        mask = self._mask(name_key) | self._mask(id_key)
+        if not mask:
+            return self.all_mask, ""
+        return mask, self._thumb_of.get(name_key) or self._thumb_of.get(id_key) or ""
+
+    def classify(self, mat_class, class_id=None):
+        """Same for a class name ("VRayMtl", "Diffuse material") and optional ClassID tuple."""
+        return self.classify_keys(class_key(mat_class), class_key(class_id_key(class_id)))
+
+    def allows(self, mask, engine):
+        return bool(mask & self.bits.get(engine, 0))
+
+    def allows_class(self, mat_class, engine, class_id=None):
+        return self.allows(self.classify(mat_class, class_id)[0], engine)
@@ -0,0 +1,113 @@
+import os
+
+
+# any file name containing one of these marks a texture-set (PBR) folder
+PBR_KEYWORDS = ("albedo", "basecolor", "diffuse", "roughness", "normal", "metal", "ao")
+
+# stands in for a folder get_many could not read: default icon, no flags, no second probe
+UNKNOWN_SUMMARY = {
+    "path": "", "mtime": None, "has_pbr": False, "has_mtlx": False, "icon": "",
+    "subdirs": 0, "mat_files": 0, "mtlx_files": 0,
+}
+
+
+def _norm(path):
+    return (path or "").replace("\\", "/").rstrip("/")
+
+
+def summarize_folder(path, mtime=None):
+    """
+    One os.scandir of path -> summary dict (has_pbr, has_mtlx, icon, child
+    counts) stamped with the directory mtime. None if it cannot be listed.
+    """
+    path = _norm(path)
+    try:
+        if mtime is None:
+            mtime = os.stat(path).st_mtime
+        with os.scandir(path) as it:
+            entries = [(entry.name, entry.is_dir()) for entry in it]
+    except OSError as e:
+        print(f"[WARNING] Could not read directory {path}: {e}")
+        return None
+
+    lower = {name.lower(): name for name, _is_dir in entries}
+    folder_name = os.path.basename(path)
+    icon = ""
+    # same precedence as before: icon.png, then a thumbnail named after the folder
+    for candidate in ("icon.png", f"{folder_name}.jpg"):
+        if candidate.lower() in lower:
+            icon = f"{path}/{lower[candidate.lower()]}"
+            break
+
+    return {
+        "path": path,
+        "mtime": mtime,
+        "has_pbr": any(k in name for name in lower for k in PBR_KEYWORDS),
+        "has_mtlx": any(name.endswith(".mtlx") for name in lower),
+        "icon": icon,
+        "subdirs": sum(1 for _name, is_dir in entries if is_dir),
+        "mat_files": sum(1 for name, is_dir in entries if not is_dir and name.lower().endswith(".mat")),
+        "mtlx_files": sum(1 for name, is_dir in entries if not is_dir and name.lower().endswith(".mtlx")),
+    }
+
+
+# ==========================
+# Folder Summaries
+# ==========================
+class FolderSummaries:
+    """
+    Per-directory summaries stored in the material index and checked
+    against the directory mtime, which changes whenever an entry is added,
+    removed or renamed. A folder card then costs one stat (free from
+    os.scandir on Windows) plus a shared index read, not a full listdir and
+    several exists() probes. Stale or missing summaries are rebuilt and
+    written back in one transaction.
+    """
+
+    def __init__(self, index):
+        self.index = index
+
+    def set_index(self, index):
+        self.index = index
+
+    def get(self, path):
+        """Summary of one folder (None if it is not a readable directory)."""
+        path = _norm(path)
+        try:
+            mtime = os.stat(path).st_mtime
+        except OSError:
+            return None
+        return self.get_many({path: mtime}).get(path)
+
+    def refresh(self, path):
+        """Rebuild one folder's summary now (the browser itself just changed it)."""
+        summary = summarize_folder(path)
+        if summary is not None and self.index is not None:
+            self.index.put_folder_summaries([summary])
+        return summary
+
+    def get_many(self, mtimes):
+        """{folder: summary} for {folder: current directory mtime}, e.g. from a parent's scandir."""
+        mtimes = {_norm(p): m for p, m in mtimes.items()}
+        try:
+            stored = self.index.folder_summaries(mtimes) if self.index is not None else {}
+        except Exception as e:
+            print(f"[WARNING] Folder summary read failed: {e}")
+            stored = {}
+
+        result, fresh = {}, []
+        for path, mtime in mtimes.items():
+            summary = stored.get(path)
+            if summary is None or summary["mtime"] != mtime:
+                summary = summarize_folder(path, mtime)
+                if summary is None:
+                    continue
+                fresh.append(summary)
+            result[path] = summary
+
+        if fresh and self.index is not None:
+            try:
+                self.index.put_folder_summaries(fresh)
+            except Exception as e:
+                print(f"[WARNING] Folder summary write failed: {e}")
+        return result
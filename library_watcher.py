@@ -0,0 +1,209 @@
+import os
+
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, QTimer, QFileSystemWatcher, Signal
+
+from material_scanner import IncrementalScanner
+
+
+DEFAULT_POLL_SECONDS = 60      # journal pass over the whole root
+FOLDER_SETTLE_MS = 400         # let a copy of many files finish before listing
+
+
+def _norm(path):
+    return (path or "").replace("\\", "/").rstrip("/")
+
+
+def delta_to_change(delta, subdirs=None):
+    """One scanner delta as the dict sent to the UI (paths only, no headers)."""
+    folder, _mtime, added, removed, modified, removed_dirs, _parent = delta
+    return {
+        "folder": _norm(folder),
+        "added": [_norm(item[0]) for item in added],
+        "removed": [_norm(path) for path in removed],
+        "modified": [_norm(item[0]) for item in modified],
+        "removed_dirs": [_norm(path) for path in removed_dirs],
+        "subdirs": None if subdirs is None else [_norm(path) for path in subdirs],
+    }
+
+
+# ==========================
+# Watch jobs (worker thread)
+# ==========================
+class _WatchSignals(QObject):
+    changes = Signal(int, list)         # generation, change dicts
+    finished = Signal(int)              # generation
+
+
+class _WatchJob(QRunnable):
+    """
+    folder=None: incremental scan of the whole root (only directories whose
+    mtime moved are listed, see IncrementalScanner). Otherwise a listing of
+    that one folder. Deltas are written to the index by the scanner and
+    forwarded to the GUI thread as change dicts, tagged with the watcher
+    generation the job was started in.
+    """
+
+    def __init__(self, index, root_path, signals, folder=None, generation=0):
+        super().__init__()
+        self.index = index
+        self.root_path = root_path
+        self.signals = signals
+        self.folder = folder
+        self.generation = generation
+        self.scanner = IncrementalScanner(index, root_path)
+
+    def run(self):
+        changes = []
+
+        def collect(deltas):
+            changes.extend(delta_to_change(d) for d in deltas if d[2] or d[3] or d[4] or d[5])
+
+        try:
+            scanner = self.scanner
+            scanner.delta_callback = collect
+            if self.folder is None:
+                scanner.scan()
+            else:
+                subdirs = scanner.scan_folder(self.folder)
+                if subdirs is not None:
+                    # the folder on screen always reports its listing, to patch folder cards
+                    current = [c for c in changes if c["folder"] == _norm(self.folder)]
+                    if current:
+                        current[0]["subdirs"] = [_norm(p) for p in subdirs]
+                    else:
+                        changes.append({"folder": _norm(self.folder), "added": [], "removed": [],
+                                        "modified": [], "removed_dirs": [],
+                                        "subdirs": [_norm(p) for p in subdirs]})
+        except Exception as e:
+            print(f"[WARNING] Library watch pass failed: {e}")
+        if changes:
+            self.signals.changes.emit(self.generation, changes)
+        self.signals.finished.emit(self.generation)
+
+
+# ==========================
+# Library Watcher
+# ==========================
+class LibraryWatcher(QObject):
+    """
+    Keeps the material index in step with the share while the browser is open.
+
+    - The folder on screen is watched with QFileSystemWatcher; a change
+      there is listed (after a short settle delay) on its own.
+    - The rest of the root is covered by a periodic incremental scan: the
+      folder mtimes stored in the index act as the change journal, so an
+      idle pass only stats directories.
+
+    Both run one at a time on a private worker. changesReady(changes) hands
+    the resulting deltas (see delta_to_change) to the GUI, which patches
+    the search index and the grid instead of reloading. stop() cancels and
+    waits for the running job, so the index can be closed after it; results
+    of jobs from before a stop / set_root are dropped by generation.
+    """
+
+    changesReady = Signal(list)
+
+    def __init__(self, index, root_path, poll_seconds=DEFAULT_POLL_SECONDS, parent=None):
+        super().__init__(parent)
+        self.index = index
+        self.root_path = _norm(root_path)
+        self.folder = None
+        self._busy = False
+        self._queued = []               # None = root pass, str = one folder
+        self._generation = 0
+        self._scanner = None            # scanner of the running job, to cancel it
+        self._poll_ms = 0
+
+        self._fs = QFileSystemWatcher(self)
+        self._fs.directoryChanged.connect(self._on_directory_changed)
+        self._settle = QTimer(self)
+        self._settle.setSingleShot(True)
+        self._settle.setInterval(FOLDER_SETTLE_MS)
+        self._settle.timeout.connect(lambda: self._queue(self.folder))
+        self._poll = QTimer(self)
+        self._poll.timeout.connect(lambda: self._queue(None))
+        self.set_poll_interval(poll_seconds)
+
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(1)
+        self._signals = _WatchSignals()
+        self._signals.changes.connect(self._on_changes)
+        self._signals.finished.connect(self._on_finished)
+
+    def set_poll_interval(self, seconds):
+        """0 disables the root pass (the watched folder still updates)."""
+        self._poll.stop()
+        self._poll_ms = int(seconds * 1000) if seconds and seconds > 0 else 0
+        if self._poll_ms:
+            self._poll.start(self._poll_ms)
+
+    def set_root(self, index, root_path):
+        self.stop()
+        self.index = index
+        self.root_path = _norm(root_path)
+        if self._poll_ms:
+            self._poll.start(self._poll_ms)
+
+    def watch_folder(self, folder):
+        """Follow the folder the grid shows (None = stop)."""
+        folder = _norm(folder) or None
+        if folder == self.folder:
+            return
+        watched = self._fs.directories()
+        if watched:
+            self._fs.removePaths(watched)
+        self.folder = folder
+        if folder and os.path.isdir(folder):
+            self._fs.addPath(folder)
+
+    def check_now(self):
+        """Queue a root pass right away (e.g. after the window regains focus)."""
+        self._queue(None)
+
+    def stop(self):
+        """Stop watching and wait for the running job; nothing of it reaches the GUI afterwards."""
+        self._generation += 1
+        self._poll.stop()
+        self._settle.stop()
+        self._queued = []
+        self.watch_folder(None)
+        self._pool.clear()
+        if self._scanner is not None:
+            self._scanner.cancel()
+        self._pool.waitForDone()
+        self._scanner = None
+        self._busy = False
+
+    # --- internals ---
+
+    def _on_directory_changed(self, path):
+        if _norm(path) == self.folder:
+            self._settle.start()
+
+    def _queue(self, folder):
+        if folder not in self._queued:
+            self._queued.append(folder)
+        self._start_next()
+
+    def _start_next(self):
+        if self._busy or not self._queued or self.index is None:
+            return
+        folder = self._queued.pop(0)
+        self._busy = True
+        job = _WatchJob(self.index, self.root_path, self._signals, folder, self._generation)
+        self._scanner = job.scanner
+        self._pool.start(job)
+
+    def _on_changes(self, generation, changes):
+        if generation == self._generation:
+            self.changesReady.emit(changes)
+
+    def _on_finished(self, generation):
+        if generation != self._generation:
+            return
+        self._scanner = None
+        self._busy = False
+        # a watched folder that was deleted and re-created has to be re-added
+        if self.folder and self.folder not in [_norm(p) for p in self._fs.directories()] and os.path.isdir(self.folder):
+            self._fs.addPath(self.folder)
+        self._start_next()
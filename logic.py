@@ -111,3 +111,45 @@ class ThumbnailProgressDialog(QDialog):
         layout.addWidget(self.progress)
         self.setLayout(layout)
 
+
+# ==========================
+# ScanProgressDialog 
+# ==========================
+class ScanProgressDialog(QDialog):
+    """Progress + Cancel for the material root crawler (build_cache)."""
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowFlags(Qt.Window | Qt.CustomizeWindowHint | Qt.WindowTitleHint | Qt.WindowStaysOnTopHint)
+        self.setWindowTitle("Scanning Materials")
+        self.setModal(True)
+        self.setFixedSize(320, 140)
+        self.cancel_requested = False
+
+        layout = QVBoxLayout()
+
+        self.label = QLabel("Scanning material folders...")
+        self.label.setAlignment(Qt.AlignCenter)
+
+        self.progress = QProgressBar()
+        self.progress.setRange(0, 0)  # total folder count is unknown while crawling
+        self.progress.setTextVisible(False)
+        self.progress.setStyleSheet("QProgressBar { height: 10px; } QProgressBar::chunk { background-color: #4CAF50; }")
+
+        self.btn_cancel = QPushButton("Cancel")
+        self.btn_cancel.clicked.connect(self.request_cancel)
+
+        layout.addWidget(self.label)
+        layout.addWidget(self.progress)
+        layout.addWidget(self.btn_cancel)
+        self.setLayout(layout)
+
+    def update_progress(self, result):
+        self.label.setText(
+            f"Scanning material folders...\n"
+            f"{result.dirs_done} folders  |  +{result.added}  -{result.removed}"
+        )
+
+    def request_cancel(self):
+        self.cancel_requested = True
+        self.btn_cancel.setEnabled(False)
+        self.label.setText("Cancelling...")
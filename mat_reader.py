@@ -0,0 +1,316 @@
+import os
+import struct
+import zlib
+
+
+# ==========================
+# .mat header reader (no pymxs)
+# ==========================
+# A .mat library is a 3ds Max OLE compound document (same container as .max).
+# We only need two streams:
+#   ClassDirectory3 - every plugin class used in the file (name, ClassID, SuperClassID)
+#   Scene           - the chunk tree of the saved objects (names live in here)
+# Everything is best-effort: callers fall back to the file name / pymxs when a
+# field comes back empty.
+
+OLE_SIGNATURE = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"
+MATERIAL_SUPERCLASS_ID = 0x0C00
+
+CLASS_ENTRY_CHUNK = 0x2040
+CLASS_HEADER_CHUNK = 0x2060
+CLASS_NAME_CHUNK = 0x2042
+NAME_CHUNKS = (0x4001, 0x0962)   # MtlBase name / generic node name
+
+_FREE_SECT = 0xFFFFFFFF
+_END_OF_CHAIN = 0xFFFFFFFE
+_MAX_CHUNK_DEPTH = 64
+
+
+class MatFormatError(Exception):
+    pass
+
+
+class MatHeader:
+    """What the browser needs from a .mat without loading it in Max."""
+
+    def __init__(self, names=None, material_class="", class_id=None, classes=None, count=None):
+        self.names = names or []             # material names found in the Scene stream
+        self.count = count                    # top-level materials in the library, None = unknown
+        self.material_class = material_class  # class of the top-level material ("VRayMtl", ...)
+        self.class_id = class_id              # (part_a, part_b) ClassID of that class
+        self.classes = classes or []          # [(name, (a, b), superclass_id)] from ClassDirectory3
+
+    @property
+    def name(self):
+        return self.names[0] if self.names else ""
+
+    def to_dict(self):
+        return {
+            "names": self.names,
+            "material_class": self.material_class,
+            "class_id": list(self.class_id) if self.class_id else None,
+            "count": self.count,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        class_id = data.get("class_id")
+        return cls(
+            names=list(data.get("names") or []),
+            material_class=data.get("material_class") or "",
+            class_id=tuple(class_id) if class_id else None,
+            count=data.get("count"),
+        )
+
+    def __repr__(self):
+        return f"MatHeader(names={self.names}, material_class={self.material_class!r})"
+
+
+# ==========================
+# OLE compound document
+# ==========================
+class OleFile:
+    """Minimal read-only compound file reader (v3 / v4), whole file in memory."""
+
+    def __init__(self, data):
+        if data[:8] != OLE_SIGNATURE:
+            raise MatFormatError("not an OLE compound document")
+        self.data = data
+        self.sector_size = 1 << struct.unpack_from("<H", data, 0x1E)[0]
+        self.mini_sector_size = 1 << struct.unpack_from("<H", data, 0x20)[0]
+        (num_fat, first_dir, _txn, self.mini_cutoff, first_minifat, num_minifat,
+         first_difat, num_difat) = struct.unpack_from("<IIIIIIII", data, 0x2C)
+
+        difat = list(struct.unpack_from("<109I", data, 0x4C))
+        sect = first_difat
+        per_sector = self.sector_size // 4 - 1
+        for _ in range(num_difat):
+            if sect in (_FREE_SECT, _END_OF_CHAIN):
+                break
+            entries = struct.unpack_from(f"<{per_sector + 1}I", self._sector(sect))
+            difat.extend(entries[:-1])
+            sect = entries[-1]
+
+        fat = []
+        for s in difat[:num_fat]:
+            if s == _FREE_SECT:
+                continue
+            fat.extend(struct.unpack_from(f"<{self.sector_size // 4}I", self._sector(s)))
+        self.fat = fat
+
+        self.entries = self._read_directory(first_dir)
+        root = self.entries[0] if self.entries else None
+        self.mini_stream = self._chain_bytes(root[1], root[2]) if root else b""
+        minifat_bytes = self._chain_bytes(first_minifat, None) if num_minifat else b""
+        self.minifat = list(struct.unpack_from(f"<{len(minifat_bytes) // 4}I", minifat_bytes))
+
+    def _sector(self, index):
+        start = (index + 1) * self.sector_size
+        return self.data[start:start + self.sector_size]
+
+    def _chain(self, start, table):
+        seen = set()
+        sect = start
+        while sect not in (_END_OF_CHAIN, _FREE_SECT) and sect < len(table):
+            if sect in seen:
+                raise MatFormatError("cyclic sector chain")
+            seen.add(sect)
+            yield sect
+            sect = table[sect]
+
+    def _chain_bytes(self, start, size):
+        out = b"".join(self._sector(s) for s in self._chain(start, self.fat))
+        return out if size is None else out[:size]
+
+    def _read_directory(self, first_dir):
+        raw = self._chain_bytes(first_dir, None)
+        entries = []
+        for off in range(0, len(raw) - 127, 128):
+            name_len = struct.unpack_from("<H", raw, off + 64)[0]
+            entry_type = raw[off + 66]
+            name = raw[off:off + max(0, name_len - 2)].decode("utf-16-le", "ignore")
+            start, size = struct.unpack_from("<IQ", raw, off + 116)
+            if self.sector_size == 512:
+                size &= 0xFFFFFFFF
+            entries.append((name, start, size, entry_type))
+        return entries
+
+    def open_stream(self, name):
+        for entry_name, start, size, entry_type in self.entries:
+            if entry_type == 2 and entry_name == name:
+                if size < self.mini_cutoff:
+                    parts = []
+                    for s in self._chain(start, self.minifat):
+                        off = s * self.mini_sector_size
+                        parts.append(self.mini_stream[off:off + self.mini_sector_size])
+                    return b"".join(parts)[:size]
+                return self._chain_bytes(start, size)
+        return None
+
+
+# ==========================
+# Max chunk tree
+# ==========================
+def iter_chunks(data, offset=0, end=None):
+    """Yield (chunk_id, is_container, payload_start, payload_end) for one level."""
+    end = len(data) if end is None else end
+    while offset + 6 <= end:
+        chunk_id, length = struct.unpack_from("<HI", data, offset)
+        header = 6
+        if length == 0:
+            if offset + 14 > end:
+                return
+            length = struct.unpack_from("<Q", data, offset + 6)[0]
+            header = 14
+            container = bool(length & 0x8000000000000000)
+            length &= 0x7FFFFFFFFFFFFFFF
+        else:
+            container = bool(length & 0x80000000)
+            length &= 0x7FFFFFFF
+        if length < header or offset + length > end:
+            return
+        yield chunk_id, container, offset + header, offset + length
+        offset += length
+
+
+def _utf16(data, start, end):
+    return data[start:end].decode("utf-16-le", "ignore").rstrip("\x00").strip()
+
+
+def _maybe_decompress(stream):
+    if stream and stream[:1] == b"\x78":
+        try:
+            return zlib.decompress(stream)
+        except zlib.error:
+            pass
+    return stream
+
+
+def read_class_directory(stream):
+    """[(class_name, (class_id_a, class_id_b), superclass_id)] in directory order."""
+    classes = []
+    if not stream:
+        return classes
+    stream = _maybe_decompress(stream)
+    for chunk_id, container, start, end in iter_chunks(stream):
+        if chunk_id != CLASS_ENTRY_CHUNK or not container:
+            continue
+        name, class_id, superclass = "", None, None
+        for sub_id, _c, s, e in iter_chunks(stream, start, end):
+            if sub_id == CLASS_HEADER_CHUNK and e - s >= 16:
+                _dll, part_a, part_b, superclass = struct.unpack_from("<iIII", stream, s)
+                class_id = (part_a, part_b)
+            elif sub_id == CLASS_NAME_CHUNK:
+                name = _utf16(stream, s, e)
+        classes.append((name, class_id, superclass))
+    return classes
+
+
+def _collect_names(stream, start, end, depth, out):
+    if depth > _MAX_CHUNK_DEPTH:
+        return
+    for chunk_id, container, s, e in iter_chunks(stream, start, end):
+        if container:
+            _collect_names(stream, s, e, depth + 1, out)
+        elif chunk_id in NAME_CHUNKS:
+            name = _utf16(stream, s, e)
+            if name and name not in out:
+                out.append(name)
+
+
+def read_scene(stream, classes):
+    """(top-level material class index or None, [names], top-level material count) from the Scene stream."""
+    names = []
+    first_material = None
+    count = 0
+    if not stream:
+        return first_material, names, None
+    stream = _maybe_decompress(stream)
+    top = list(iter_chunks(stream))
+    # Scene is usually one container holding the saved objects; their chunk ids
+    # are indices into ClassDirectory3.
+    if len(top) == 1 and top[0][1]:
+        top = list(iter_chunks(stream, top[0][2], top[0][3]))
+    for chunk_id, container, s, e in top:
+        is_material = chunk_id < len(classes) and classes[chunk_id][2] == MATERIAL_SUPERCLASS_ID
+        if is_material and first_material is None:
+            first_material = chunk_id
+        if is_material:
+            count += 1
+        if is_material and container:
+            _collect_names(stream, s, e, 1, names)
+    return first_material, names, count
+
+
+def read_mat_header(mat_path):
+    """Parse a .mat file. Raises MatFormatError / OSError on unreadable files."""
+    with open(mat_path, "rb") as f:
+        data = f.read()
+    ole = OleFile(data)
+    classes = read_class_directory(ole.open_stream("ClassDirectory3"))
+    first_material, names, count = read_scene(ole.open_stream("Scene"), classes)
+
+    header = MatHeader(names=names, classes=classes, count=count)
+    if first_material is not None:
+        header.material_class, header.class_id, _super = classes[first_material]
+    else:
+        material_classes = [c for c in classes if c[2] == MATERIAL_SUPERCLASS_ID]
+        if material_classes:
+            header.material_class, header.class_id, _super = material_classes[0]
+
+    # Files written by split_material_library are named after their material.
+    stem = os.path.splitext(os.path.basename(mat_path))[0]
+    if stem in header.names:
+        header.names.remove(stem)
+        header.names.insert(0, stem)
+    return header
+
+
+# ==========================
+# Class name keys
+# ==========================
+def class_key(class_name):
+    """
+    Comparable form of a class name. ClassDirectory3 stores display names
+    ("Diffuse material", "Physical Material") while MaxScript reports
+    "Diffuse_material" / "PhysicalMaterial"; both map to the same key.
+    """
+    return "".join(ch for ch in (class_name or "").lower() if ch.isalnum())
+
+
+def class_id_key(class_id):
+    """ClassID as written in allowed_classes, e.g. "0x3c35fce_0x20870143"."""
+    if not class_id:
+        return ""
+    return f"0x{class_id[0]:x}_0x{class_id[1]:x}"
+
+
+# ==========================
+# Cached lookup (index keyed by path, size, mtime)
+# ==========================
+def get_mat_header(mat_path, index=None):
+    """
+    Header for mat_path, served from the material index when (size, mtime)
+    still match; parsed and stored otherwise. Never touches pymxs.
+    Returns a MatHeader (possibly empty) or None if the file is missing.
+    """
+    mat_path = mat_path.replace("\\", "/")
+    try:
+        st = os.stat(mat_path)
+    except OSError:
+        return None
+
+    if index is not None:
+        cached = index.get_header(mat_path, st.st_size, st.st_mtime)
+        if cached is not None:
+            return MatHeader.from_dict(cached)
+
+    try:
+        header = read_mat_header(mat_path)
+    except Exception as e:
+        print(f"[WARNING] Could not read .mat header {mat_path}: {e}")
+        header = MatHeader()
+
+    if index is not None:
+        index.put_header(mat_path, st.st_size, st.st_mtime, header.to_dict())
+    return header
@@ -0,0 +1,755 @@
+import os
+import json
+import sqlite3
+import threading
+
+from mat_reader import class_key, class_id_key
+
+
+INDEX_FILE_NAME = "material_index.db"
+LEGACY_DB_FILE_NAME = "material_db.json"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+
+CREATE TABLE IF NOT EXISTS folders (
+    path   TEXT PRIMARY KEY,
+    parent TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_folders_parent ON folders (parent);
+
+CREATE TABLE IF NOT EXISTS files (
+    path   TEXT PRIMARY KEY,
+    folder TEXT NOT NULL,
+    size   INTEGER,
+    mtime  REAL
+);
+CREATE INDEX IF NOT EXISTS idx_files_folder ON files (folder);
+
+CREATE TABLE IF NOT EXISTS materials (
+    id         INTEGER PRIMARY KEY AUTOINCREMENT,
+    mat_path   TEXT NOT NULL,
+    name       TEXT NOT NULL,
+    lower_name TEXT NOT NULL,
+    folder     TEXT NOT NULL,
+    UNIQUE (mat_path, name)
+);
+CREATE INDEX IF NOT EXISTS idx_materials_folder ON materials (folder);
+CREATE INDEX IF NOT EXISTS idx_materials_lower_name ON materials (lower_name);
+
+CREATE TABLE IF NOT EXISTS tags (
+    material_id INTEGER NOT NULL REFERENCES materials (id) ON DELETE CASCADE,
+    tag         TEXT NOT NULL,
+    PRIMARY KEY (material_id, tag)
+);
+CREATE INDEX IF NOT EXISTS idx_tags_tag ON tags (tag);
+
+CREATE TABLE IF NOT EXISTS mat_headers (
+    path   TEXT PRIMARY KEY,
+    size   INTEGER NOT NULL,
+    mtime  REAL NOT NULL,
+    header TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS thumbnails (
+    material_id    INTEGER PRIMARY KEY REFERENCES materials (id) ON DELETE CASCADE,
+    thumbnail_path TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS folder_summaries (
+    path       TEXT PRIMARY KEY,
+    mtime      REAL NOT NULL,
+    has_pbr    INTEGER NOT NULL,
+    has_mtlx   INTEGER NOT NULL,
+    icon       TEXT NOT NULL,          -- icon.png / <folder>.jpg inside the folder, '' = none
+    subdirs    INTEGER NOT NULL,
+    mat_files  INTEGER NOT NULL,
+    mtlx_files INTEGER NOT NULL
+);
+"""
+
+
+# Columns added after the first schema; applied with ALTER TABLE on open.
+SCHEMA_COLUMNS = [
+    ("folders", "mtime", "REAL"),
+    ("materials", "mat_class", "TEXT"),      # NULL = not classified yet, '' = unknown
+    ("materials", "class_key", "TEXT"),
+    ("materials", "class_id_key", "TEXT"),
+    ("materials", "engine_mask", "INTEGER"),  # EngineLookup bits; NULL = not resolved yet
+    ("materials", "thumb_engine", "TEXT"),    # engine scene for thumbnails, '' = generic
+]
+
+SCHEMA_INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_materials_class_key ON materials (class_key);
+CREATE INDEX IF NOT EXISTS idx_materials_class_id_key ON materials (class_id_key);
+"""
+
+
+def _norm(path):
+    return path.replace("\\", "/") if path else path
+
+
+# ==========================
+# Material Index (SQLite)
+# ==========================
+class MaterialIndex:
+    """
+    SQLite index of every material under the library root.
+
+    Replaces the old material_db.json: each tag edit / rename / scan delta is
+    written as its own small transaction instead of rewriting the whole file.
+    Rows are returned as dicts shaped like the old JSON entries
+    (name, lower_name, mat_path, thumbnail_path, tags).
+    """
+
+    def __init__(self, root_path, db_path=None):
+        self.root_path = _norm(root_path)
+        self.db_path = _norm(db_path or os.path.join(root_path, INDEX_FILE_NAME))
+        self._lock = threading.RLock()
+        self.conn = None
+        self.engine_lookup = None
+        self.open()
+
+    # --- Connection ---
+
+    def open(self):
+        with self._lock:
+            if self.conn is not None:
+                return
+            # Rollback journal (not WAL): WAL is unsafe on SMB/network shares.
+            self.conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+            self.conn.row_factory = sqlite3.Row
+            self.conn.execute("PRAGMA foreign_keys = ON")
+            self.conn.execute("PRAGMA synchronous = NORMAL")
+            self.conn.executescript(SCHEMA)
+            for table, column, decl in SCHEMA_COLUMNS:
+                existing = [r["name"] for r in self.conn.execute(f"PRAGMA table_info({table})")]
+                if column not in existing:
+                    self.conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {decl}")
+            self.conn.executescript(SCHEMA_INDEXES)
+
+    def close(self):
+        with self._lock:
+            if self.conn is not None:
+                self.conn.close()
+                self.conn = None
+
+    def transaction(self):
+        """Context manager: one atomic transaction, serialized across threads."""
+        return _Transaction(self)
+
+    # --- Meta ---
+
+    def get_meta(self, key, default=None):
+        with self._lock:
+            row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row["value"] if row else default
+
+    def set_meta(self, key, value):
+        with self.transaction() as cur:
+            cur.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, str(value)))
+
+    # --- Read ---
+
+    def count(self):
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM materials").fetchone()[0]
+
+    def _rows_to_entries(self, rows):
+        """Rows of _SELECT -> entry dicts; tags come from one IN query per 500 rows."""
+        tags = {}
+        ids = [row["id"] for row in rows]
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            for r in self.conn.execute(
+                    "SELECT material_id, tag FROM tags WHERE material_id IN (%s) ORDER BY rowid"
+                    % ",".join("?" * len(chunk)), chunk):
+                tags.setdefault(r["material_id"], []).append(r["tag"])
+        return [{
+            "id": row["id"],
+            "name": row["name"],
+            "lower_name": row["lower_name"],
+            "mat_path": row["mat_path"],
+            "thumbnail_path": row["thumbnail_path"],
+            "mat_class": row["mat_class"] or "",
+            "tags": tags.get(row["id"], []),
+        } for row in rows]
+
+    _SELECT = """
+        SELECT m.id, m.name, m.lower_name, m.mat_path, m.folder, m.mat_class,
+               COALESCE(t.thumbnail_path, '') AS thumbnail_path
+        FROM materials m LEFT JOIN thumbnails t ON t.material_id = m.id
+    """
+
+    def get_material(self, mat_path, name):
+        with self._lock:
+            row = self.conn.execute(
+                self._SELECT + " WHERE m.mat_path = ? AND m.name = ?", (_norm(mat_path), name)).fetchone()
+            return self._rows_to_entries([row])[0] if row else None
+
+    def materials_in_folder(self, folder):
+        with self._lock:
+            rows = self.conn.execute(
+                self._SELECT + " WHERE m.folder = ? ORDER BY m.mat_path", (_norm(folder),)).fetchall()
+            return self._rows_to_entries(rows)
+
+    def iter_materials(self):
+        with self._lock:
+            rows = self.conn.execute(self._SELECT + " ORDER BY m.mat_path").fetchall()
+            return self._rows_to_entries(rows)
+
+    def search(self, query, limit=None, engine=None):
+        """
+        Substring match over material name and tags (same semantics as the old JSON scan).
+        engine: optional engine filter through the stored engine_mask; materials whose
+        class is still unknown are kept, like before.
+        """
+        query = (query or "").strip().lower()
+        if not query:
+            return []
+        pattern = "%" + query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        sql = self._SELECT + """
+            WHERE (m.lower_name LIKE ? ESCAPE '\\'
+               OR (m.lower_name || ' ' || COALESCE(
+                      (SELECT group_concat(tag, ' ') FROM tags WHERE material_id = m.id), '')) LIKE ? ESCAPE '\\')
+        """
+        params = [pattern, pattern]
+        if engine is not None:
+            sql += self._engine_filter_sql(engine, params)
+        sql += " ORDER BY m.lower_name"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+        with self._lock:
+            rows = self.conn.execute(sql, params).fetchall()
+            return self._rows_to_entries(rows)
+
+    def search_documents(self, mat_path=None, name=None, under=None, paths=None):
+        """
+        Every material with its tags in one query, for building the in-memory
+        material_search.SearchIndex (or just those in mat_path, optionally
+        only `name`, those under the folder `under`, or those in any of
+        `paths`, to refresh them). folder is relative to the library root.
+        """
+        if paths is not None:
+            paths = sorted({_norm(p) for p in paths})
+            docs = []
+            for start in range(0, len(paths), 500):
+                chunk = paths[start:start + 500]
+                docs.extend(self._search_documents(
+                    " WHERE m.mat_path IN (%s)" % ",".join("?" * len(chunk)), chunk))
+            return docs
+        where, params = "", []
+        if mat_path is not None:
+            where = " WHERE m.mat_path = ?"
+            params = [_norm(mat_path)]
+            if name is not None:
+                where += " AND m.name = ?"
+                params.append(name)
+        elif under is not None:
+            under = _norm(under).rstrip("/")
+            where = " WHERE m.folder = ? OR substr(m.folder, 1, ?) = ?"
+            params = [under, len(under) + 1, under + "/"]
+        return self._search_documents(where, params)
+
+    def _search_documents(self, where, params):
+        root = self.root_path.rstrip("/") + "/"
+        sql = """
+            SELECT m.id, m.name, m.mat_path, m.folder, m.mat_class, m.engine_mask,
+                   COALESCE(t.thumbnail_path, '') AS thumbnail_path,
+                   (SELECT group_concat(tag, char(31)) FROM tags WHERE material_id = m.id) AS tags
+            FROM materials m LEFT JOIN thumbnails t ON t.material_id = m.id
+        """ + where
+        with self._lock:
+            rows = self.conn.execute(sql, params).fetchall()
+        docs = []
+        for row in rows:
+            folder = row["folder"]
+            docs.append({
+                "id": row["id"],
+                "name": row["name"],
+                "mat_path": row["mat_path"],
+                "folder": folder[len(root):] if folder.startswith(root) else folder,
+                "mat_class": row["mat_class"] or "",
+                "engine_mask": row["engine_mask"],
+                "thumbnail_path": row["thumbnail_path"],
+                "tags": row["tags"].split("\x1f") if row["tags"] else [],
+            })
+        return docs
+
+    def _engine_filter_sql(self, engine, params):
+        if self.engine_lookup is None:
+            return ""
+        params.append(self.engine_lookup.bits.get(engine, 0))
+        return " AND (COALESCE(m.engine_mask, -1) & ?) != 0"
+
+    # --- Material classes ---
+
+    def get_material_class(self, mat_path):
+        """Stored class name of the .mat, '' if unknown, None if not classified yet."""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT mat_class FROM materials WHERE mat_path = ? LIMIT 1", (_norm(mat_path),)).fetchone()
+        return row["mat_class"] if row else None
+
+    def engine_info(self, mat_path):
+        """Stored (engine_mask, thumb_engine) of the .mat, or None if not resolved yet."""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT engine_mask, thumb_engine FROM materials WHERE mat_path = ? LIMIT 1",
+                (_norm(mat_path),)).fetchone()
+        if not row or row["engine_mask"] is None:
+            return None
+        return row["engine_mask"], row["thumb_engine"] or ""
+
+    def is_class_allowed(self, mat_path, engine):
+        """Indexed engine check for one .mat; unknown classes pass (same as filter_items)."""
+        info = self.engine_info(mat_path)
+        if info is None or self.engine_lookup is None:
+            return True
+        return self.engine_lookup.allows(info[0], engine)
+
+    def set_engine_lookup(self, lookup):
+        """
+        Attach the browser's EngineLookup. Rows classified without one (headless
+        scan) or under a different allowed_classes table are resolved here, once
+        per distinct class, not once per material.
+        """
+        self.engine_lookup = lookup
+        stale = self.get_meta("engine_signature") != lookup.signature
+        where = "mat_class IS NOT NULL" if stale else "mat_class IS NOT NULL AND engine_mask IS NULL"
+        with self.transaction() as cur:
+            pairs = cur.execute(
+                f"SELECT DISTINCT COALESCE(class_key, ''), COALESCE(class_id_key, '') FROM materials WHERE {where}"
+            ).fetchall()
+            for name_key, id_key in pairs:
+                mask, thumb = lookup.classify_keys(name_key, id_key)
+                cur.execute(
+                    f"UPDATE materials SET engine_mask = ?, thumb_engine = ? WHERE {where}"
+                    " AND COALESCE(class_key, '') = ? AND COALESCE(class_id_key, '') = ?",
+                    (mask, thumb, name_key, id_key))
+            cur.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('engine_signature', ?)",
+                        (lookup.signature,))
+        if pairs:
+            print(f"[INDEX] Resolved render engines for {len(pairs)} material class(es)")
+
+    def unclassified_paths(self, limit=None):
+        sql = "SELECT DISTINCT mat_path FROM materials WHERE mat_class IS NULL"
+        params = []
+        if limit:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+        with self._lock:
+            return [r["mat_path"] for r in self.conn.execute(sql, params)]
+
+    def _set_class(self, cur, mat_path, header):
+        mat_class = (header or {}).get("material_class") or ""
+        class_id = (header or {}).get("class_id")
+        name_key, id_key = class_key(mat_class), class_key(class_id_key(class_id))
+        mask, thumb = self.engine_lookup.classify_keys(name_key, id_key) if self.engine_lookup else (None, None)
+        cur.execute(
+            "UPDATE materials SET mat_class = ?, class_key = ?, class_id_key = ?, engine_mask = ?, thumb_engine = ?"
+            " WHERE mat_path = ?",
+            (mat_class, name_key, id_key, mask, thumb, _norm(mat_path)))
+
+    # --- Write (one transaction per call) ---
+
+    def _upsert(self, cur, mat_path, name, thumbnail_path=None):
+        mat_path = _norm(mat_path)
+        folder = _norm(os.path.dirname(mat_path))
+        cur.execute(
+            "INSERT OR IGNORE INTO folders (path, parent) VALUES (?, ?)",
+            (folder, _norm(os.path.dirname(folder))))
+        cur.execute(
+            """INSERT INTO materials (mat_path, name, lower_name, folder) VALUES (?, ?, ?, ?)
+               ON CONFLICT (mat_path, name) DO UPDATE SET lower_name = excluded.lower_name,
+                                                          folder = excluded.folder""",
+            (mat_path, name, name.lower(), folder))
+        mat_id = cur.execute(
+            "SELECT id FROM materials WHERE mat_path = ? AND name = ?", (mat_path, name)).fetchone()[0]
+        if thumbnail_path:
+            cur.execute(
+                "INSERT OR REPLACE INTO thumbnails (material_id, thumbnail_path) VALUES (?, ?)",
+                (mat_id, _norm(thumbnail_path)))
+        return mat_id
+
+    def _set_tags(self, cur, mat_id, tags):
+        cur.execute("DELETE FROM tags WHERE material_id = ?", (mat_id,))
+        seen = set()
+        for tag in tags or []:
+            tag = str(tag).strip().lower()
+            if tag and tag not in seen:
+                seen.add(tag)
+                cur.execute("INSERT INTO tags (material_id, tag) VALUES (?, ?)", (mat_id, tag))
+
+    def upsert_material(self, mat_path, name, thumbnail_path=None, tags=None):
+        with self.transaction() as cur:
+            mat_id = self._upsert(cur, mat_path, name, thumbnail_path)
+            if tags is not None:
+                self._set_tags(cur, mat_id, tags)
+            return mat_id
+
+    def remove_material(self, mat_path, name=None):
+        with self.transaction() as cur:
+            if name is None:
+                cur.execute("DELETE FROM materials WHERE mat_path = ?", (_norm(mat_path),))
+            else:
+                cur.execute("DELETE FROM materials WHERE mat_path = ? AND name = ?", (_norm(mat_path), name))
+            return cur.rowcount
+
+    def remove_materials(self, items):
+        """Batch remove_material: items = [(mat_path, name)], one transaction."""
+        with self.transaction() as cur:
+            for mat_path, name in items:
+                cur.execute("DELETE FROM materials WHERE mat_path = ? AND name = ?", (_norm(mat_path), name))
+
+    def update_tags(self, items, add=(), remove=()):
+        """
+        Bulk retag: add / remove tags on every (mat_path, name) in items,
+        keeping each material's other tags. One transaction. Returns the
+        number of materials found.
+        """
+        add = [str(t).strip().lower() for t in add if str(t).strip()]
+        remove = {str(t).strip().lower() for t in remove}
+        found = 0
+        with self.transaction() as cur:
+            for mat_path, name in items:
+                row = cur.execute(
+                    "SELECT id FROM materials WHERE mat_path = ? AND name = ?", (_norm(mat_path), name)).fetchone()
+                if not row:
+                    continue
+                found += 1
+                current = [r[0] for r in cur.execute(
+                    "SELECT tag FROM tags WHERE material_id = ? ORDER BY rowid", (row[0],))]
+                self._set_tags(cur, row[0], [t for t in current if t not in remove] + add)
+        return found
+
+    def set_tags(self, mat_path, name, tags):
+        with self.transaction() as cur:
+            row = cur.execute(
+                "SELECT id FROM materials WHERE mat_path = ? AND name = ?", (_norm(mat_path), name)).fetchone()
+            if not row:
+                return False
+            self._set_tags(cur, row[0], tags)
+            return True
+
+    def rename_material(self, mat_path, old_name, new_name, new_mat_path=None, new_thumbnail_path=None):
+        """Rename / move one row in place; tags follow the material id."""
+        with self.transaction() as cur:
+            return self._rename(cur, mat_path, old_name, new_name, new_mat_path, new_thumbnail_path)
+
+    def rename_materials(self, renames):
+        """
+        Batch form for bulk moves / renames, one transaction:
+        renames = [(mat_path, old_name, new_name, new_mat_path, new_thumbnail_path)].
+        Rows not in the index yet are inserted. Returns how many were found.
+        """
+        found = 0
+        with self.transaction() as cur:
+            for mat_path, old_name, new_name, new_mat_path, new_thumbnail_path in renames:
+                if self._rename(cur, mat_path, old_name, new_name, new_mat_path, new_thumbnail_path):
+                    found += 1
+                else:
+                    self._upsert(cur, new_mat_path or mat_path, new_name, new_thumbnail_path)
+        return found
+
+    def _rename(self, cur, mat_path, old_name, new_name, new_mat_path, new_thumbnail_path):
+        new_mat_path = _norm(new_mat_path or mat_path)
+        new_folder = _norm(os.path.dirname(new_mat_path))
+        row = cur.execute(
+            "SELECT id FROM materials WHERE mat_path = ? AND name = ?", (_norm(mat_path), old_name)).fetchone()
+        if not row:
+            return False
+        mat_id = row[0]
+        # Drop a stale row already sitting at the destination key.
+        cur.execute(
+            "DELETE FROM materials WHERE mat_path = ? AND name = ? AND id != ?",
+            (new_mat_path, new_name, mat_id))
+        cur.execute(
+            "INSERT OR IGNORE INTO folders (path, parent) VALUES (?, ?)",
+            (new_folder, _norm(os.path.dirname(new_folder))))
+        cur.execute(
+            "UPDATE materials SET mat_path = ?, name = ?, lower_name = ?, folder = ? WHERE id = ?",
+            (new_mat_path, new_name, new_name.lower(), new_folder, mat_id))
+        if new_thumbnail_path:
+            cur.execute(
+                "INSERT OR REPLACE INTO thumbnails (material_id, thumbnail_path) VALUES (?, ?)",
+                (mat_id, _norm(new_thumbnail_path)))
+        return True
+
+    def replace_materials(self, entries):
+        """
+        Full rebuild from a scan: upsert every entry and drop rows that are no
+        longer on disk. Existing tags are kept because rows keep their id.
+        """
+        with self.transaction() as cur:
+            cur.execute("CREATE TEMP TABLE IF NOT EXISTS _seen (id INTEGER PRIMARY KEY)")
+            cur.execute("DELETE FROM _seen")
+            for entry in entries:
+                mat_id = self._upsert(cur, entry["mat_path"], entry["name"], entry.get("thumbnail_path"))
+                if entry.get("tags"):
+                    self._set_tags(cur, mat_id, entry["tags"])
+                cur.execute("INSERT OR IGNORE INTO _seen (id) VALUES (?)", (mat_id,))
+            cur.execute("DELETE FROM materials WHERE id NOT IN (SELECT id FROM _seen)")
+            cur.execute("DROP TABLE _seen")
+
+    # --- Scan state (dir mtimes, file size/mtime) ---
+
+    def folder_state(self, folder):
+        """(known mtime or None, [child folder paths]) for one directory."""
+        folder = _norm(folder)
+        with self._lock:
+            row = self.conn.execute("SELECT mtime FROM folders WHERE path = ?", (folder,)).fetchone()
+            children = [r["path"] for r in self.conn.execute(
+                "SELECT path FROM folders WHERE parent = ? AND path != ?", (folder, folder))]
+        return (row["mtime"] if row else None), children
+
+    def files_in_folder(self, folder):
+        """{path: (size, mtime)} of the indexed .mat files directly in folder."""
+        with self._lock:
+            return {r["path"]: (r["size"], r["mtime"]) for r in self.conn.execute(
+                "SELECT path, size, mtime FROM files WHERE folder = ?", (_norm(folder),))}
+
+    def apply_folder_delta(self, folder, mtime, added=(), removed=(), modified=(), removed_dirs=(), parent=None):
+        """
+        Write one directory's scan delta in a single transaction.
+        added / modified: iterables of (path, size, mtime); removed: paths;
+        removed_dirs: sub-directories that vanished (their whole subtree is dropped).
+        """
+        self.apply_folder_deltas([(folder, mtime, added, removed, modified, removed_dirs, parent)])
+
+    def apply_folder_deltas(self, deltas, subdirs=()):
+        """
+        Batch form of apply_folder_delta: many directories, one transaction.
+        subdirs: (path, parent) of sub-directories found by these listings; new
+        ones are stored without an mtime, so a scan cancelled before reaching
+        them still lists them next time.
+        """
+        with self.transaction() as cur:
+            for folder, mtime, added, removed, modified, removed_dirs, parent in deltas:
+                self._apply_folder_delta(cur, folder, mtime, added, removed, modified, removed_dirs, parent)
+            cur.executemany("INSERT OR IGNORE INTO folders (path, parent) VALUES (?, ?)",
+                            [(_norm(path), _norm(parent)) for path, parent in subdirs])
+
+    def _apply_folder_delta(self, cur, folder, mtime, added, removed, modified, removed_dirs, parent):
+        folder = _norm(folder)
+        if parent is None:
+            parent = _norm(os.path.dirname(folder))
+        cur.execute(
+            """INSERT INTO folders (path, parent, mtime) VALUES (?, ?, ?)
+               ON CONFLICT (path) DO UPDATE SET mtime = excluded.mtime, parent = excluded.parent""",
+            (folder, parent, mtime))
+        for path in removed:
+            path = _norm(path)
+            cur.execute("DELETE FROM files WHERE path = ?", (path,))
+            cur.execute("DELETE FROM materials WHERE mat_path = ?", (path,))
+            cur.execute("DELETE FROM mat_headers WHERE path = ?", (path,))
+        # added / modified: (path, size, mtime[, header dict from mat_reader])
+        for path, size, file_mtime, *header in added:
+            path = _norm(path)
+            cur.execute(
+                "INSERT OR REPLACE INTO files (path, folder, size, mtime) VALUES (?, ?, ?, ?)",
+                (path, folder, size, file_mtime))
+            name = os.path.splitext(os.path.basename(path))[0]
+            thumb = _norm(os.path.join(folder, f"{name}.jpg"))
+            self._upsert(cur, path, name, thumb)
+            if header and header[0] is not None:
+                self._put_header(cur, path, size, file_mtime, header[0])
+        for path, size, file_mtime, *header in modified:
+            path = _norm(path)
+            cur.execute(
+                "UPDATE files SET size = ?, mtime = ? WHERE path = ?", (size, file_mtime, path))
+            if header and header[0] is not None:
+                self._put_header(cur, path, size, file_mtime, header[0])
+        for sub in removed_dirs:
+            self._remove_tree(cur, _norm(sub))
+
+    def _remove_tree(self, cur, folder):
+        # substr, not LIKE: LIKE is case-insensitive and would also match "Wood_A" against "WoodXA"
+        folder = folder.rstrip("/")
+        prefix = folder + "/"
+        cur.execute("DELETE FROM mat_headers WHERE substr(path, 1, ?) = ?", (len(prefix), prefix))
+        for table, col in (("materials", "folder"), ("files", "folder"), ("folders", "path"),
+                           ("folder_summaries", "path")):
+            cur.execute(f"DELETE FROM {table} WHERE {col} = ? OR substr({col}, 1, ?) = ?",
+                        (folder, len(prefix), prefix))
+
+    def remove_folder_tree(self, folder):
+        with self.transaction() as cur:
+            self._remove_tree(cur, _norm(folder))
+
+    def move_folder_tree(self, old_folder, new_folder):
+        """Re-point every row under old_folder to new_folder (folder rename / move); ids and tags stay."""
+        old_folder, new_folder = _norm(old_folder).rstrip("/"), _norm(new_folder).rstrip("/")
+        start = len(old_folder) + 1
+        with self.transaction() as cur:
+            self._remove_tree(cur, new_folder)
+            for table, col in (("folders", "path"), ("folders", "parent"), ("files", "path"), ("files", "folder"),
+                               ("materials", "mat_path"), ("materials", "folder"), ("mat_headers", "path"),
+                               ("thumbnails", "thumbnail_path"), ("folder_summaries", "path"),
+                               ("folder_summaries", "icon")):
+                cur.execute(
+                    f"UPDATE {table} SET {col} = ? || substr({col}, ?) WHERE {col} = ? OR substr({col}, 1, ?) = ?",
+                    (new_folder, start, old_folder, start, old_folder + "/"))
+            cur.execute("UPDATE folders SET parent = ? WHERE path = ?", (_norm(os.path.dirname(new_folder)), new_folder))
+
+    def sync_files(self, paths):
+        """
+        Record the current (size, mtime) of .mat files the browser itself just
+        wrote, moved or deleted, so the next scan / watcher pass does not see
+        them as outside changes. Missing files are dropped with their materials.
+        """
+        with self.transaction() as cur:
+            for path in paths:
+                path = _norm(path)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    cur.execute("DELETE FROM files WHERE path = ?", (path,))
+                    cur.execute("DELETE FROM materials WHERE mat_path = ?", (path,))
+                    cur.execute("DELETE FROM mat_headers WHERE path = ?", (path,))
+                    continue
+                folder = _norm(os.path.dirname(path))
+                cur.execute(
+                    "INSERT OR IGNORE INTO folders (path, parent) VALUES (?, ?)",
+                    (folder, _norm(os.path.dirname(folder))))
+                cur.execute(
+                    "INSERT OR REPLACE INTO files (path, folder, size, mtime) VALUES (?, ?, ?, ?)",
+                    (path, folder, st.st_size, st.st_mtime))
+
+    # --- Folder summaries (see folder_summary) ---
+
+    def folder_summaries(self, paths):
+        """{folder: summary dict} for the given folders that have a stored summary (any mtime)."""
+        paths = sorted({_norm(p).rstrip("/") for p in paths})
+        found = {}
+        with self._lock:
+            for start in range(0, len(paths), 500):
+                chunk = paths[start:start + 500]
+                for row in self.conn.execute(
+                        "SELECT * FROM folder_summaries WHERE path IN (%s)" % ",".join("?" * len(chunk)), chunk):
+                    summary = dict(row)
+                    summary["has_pbr"] = bool(summary["has_pbr"])
+                    summary["has_mtlx"] = bool(summary["has_mtlx"])
+                    found[summary["path"]] = summary
+        return found
+
+    def put_folder_summaries(self, summaries):
+        with self.transaction() as cur:
+            cur.executemany(
+                """INSERT OR REPLACE INTO folder_summaries
+                   (path, mtime, has_pbr, has_mtlx, icon, subdirs, mat_files, mtlx_files)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+                [(_norm(s["path"]), s["mtime"], int(s["has_pbr"]), int(s["has_mtlx"]), s["icon"],
+                  s["subdirs"], s["mat_files"], s["mtlx_files"]) for s in summaries])
+
+    # --- .mat header cache (see mat_reader) ---
+
+    def get_header(self, path, size, mtime):
+        """Cached header dict, or None if missing / stale for this (size, mtime)."""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT size, mtime, header FROM mat_headers WHERE path = ?", (_norm(path),)).fetchone()
+        if not row or row["size"] != size or row["mtime"] != mtime:
+            return None
+        try:
+            return json.loads(row["header"])
+        except ValueError:
+            return None
+
+    def put_header(self, path, size, mtime, header):
+        with self.transaction() as cur:
+            self._put_header(cur, _norm(path), size, mtime, header)
+
+    def _put_header(self, cur, path, size, mtime, header):
+        cur.execute(
+            "INSERT OR REPLACE INTO mat_headers (path, size, mtime, header) VALUES (?, ?, ?, ?)",
+            (path, size, mtime, json.dumps(header)))
+        # the header is also where the material class comes from
+        self._set_class(cur, path, header)
+
+    # --- Migration ---
+
+    def migrate_from_json(self, json_path=None):
+        """
+        One-time import of the legacy material_db.json so existing tags survive.
+        Returns the number of migrated rows (0 if nothing to do).
+        """
+        if self.get_meta("json_migrated") == "1":
+            return 0
+        json_path = json_path or os.path.join(self.root_path, LEGACY_DB_FILE_NAME)
+        if not os.path.exists(json_path):
+            self.set_meta("json_migrated", "1")
+            return 0
+
+        try:
+            with open(json_path, 'r', encoding='utf-8') as f:
+                legacy = json.load(f)
+        except Exception as e:
+            print(f"[ERROR] Could not read legacy material DB: {e}")
+            return 0
+
+        migrated = 0
+        with self.transaction() as cur:
+            for item in legacy or []:
+                try:
+                    mat_id = self._upsert(cur, item["mat_path"], item["name"], item.get("thumbnail_path"))
+                    self._set_tags(cur, mat_id, item.get("tags", []))
+                    migrated += 1
+                except (KeyError, TypeError) as e:
+                    print(f"[WARNING] Skipping malformed legacy DB entry: {e}")
+            cur.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('json_migrated', '1')")
+
+        print(f"[SUCCESS] Migrated {migrated} materials from {json_path}")
+        return migrated
+
+
+class _Transaction:
+    def __init__(self, index):
+        self.index = index
+        self.cur = None
+
+    def __enter__(self):
+        self.index._lock.acquire()
+        conn = self.index.conn
+        began = False
+        try:
+            if conn is None:
+                raise sqlite3.ProgrammingError("Material index is closed")
+            conn.execute("BEGIN")
+            began = True
+            self.cur = conn.cursor()
+        except Exception:
+            # __exit__ does not run when __enter__ raises: undo and release here
+            if began:
+                try:
+                    conn.rollback()
+                except Exception:
+                    pass
+            self.index._lock.release()
+            raise
+        return self.cur
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None:
+                self.index.conn.commit()
+            else:
+                self.index.conn.rollback()
+        finally:
+            self.cur.close()
+            self.index._lock.release()
+        return False
+
+
+# ==========================
+# Open helper
+# ==========================
+def open_material_index(root_path):
+    """Open (or create) the index in root_path and run the JSON migrator once."""
+    index = MaterialIndex(root_path)
+    index.migrate_from_json()
+    return index
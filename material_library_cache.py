@@ -0,0 +1,133 @@
+import os
+import threading
+from collections import OrderedDict
+
+
+DEFAULT_MAX_LIBRARIES = 32      # loaded .mat libraries kept resolved in this Max session
+
+
+def _norm(path):
+    return (path or "").replace("\\", "/")
+
+
+def _file_key(path):
+    """(mtime, size) of a library file, None when it is gone."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime, st.st_size)
+
+
+# ==========================
+# Material Library Cache
+# ==========================
+class MaterialLibraryCache:
+    """
+    Loaded .mat libraries, resolved to {material name: material}.
+
+    loadTempMaterialLibrary plus a linear name search ran on every assign,
+    drop and thumbnail render; with this cache a library is loaded once and
+    later lookups are a dict hit after one os.stat. Entries are keyed by
+    path and remember the file's (mtime, size): a library changed on disk
+    (by the browser, the watcher or another artist) is reloaded on its next
+    use. At most max_libraries are kept, least recently used first out.
+
+    The handles are the library's own material instances, so repeated
+    assigns of a material share one instance in the scene, the way
+    dragging from the Material/Map Browser library does.
+    """
+
+    def __init__(self, rt=None, max_libraries=DEFAULT_MAX_LIBRARIES):
+        self._rt = rt
+        self.max_libraries = max(1, int(max_libraries))
+        self._entries = OrderedDict()       # path -> (file key, {name: material})
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.loads = 0
+
+    @property
+    def rt(self):
+        if self._rt is None:
+            from pymxs import runtime as rt
+            self._rt = rt
+        return self._rt
+
+    def get(self, mat_path, mat_name):
+        """The material mat_name from mat_path, or None (missing file / name)."""
+        materials = self.library(mat_path)
+        if materials is None:
+            return None
+        return materials.get(mat_name)
+
+    def library(self, mat_path):
+        """{name: material} for mat_path, loading it only if new or changed on disk."""
+        path = _norm(mat_path)
+        key = _file_key(path)
+        with self._lock:
+            if key is None:
+                self._entries.pop(path, None)
+                return None
+            entry = self._entries.get(path)
+            if entry is not None and entry[0] == key:
+                self._entries.move_to_end(path)
+                self.hits += 1
+                return entry[1]
+
+            materials = self._load(path)
+            if materials is None:
+                self._entries.pop(path, None)
+                return None
+            self._entries[path] = (key, materials)
+            self._entries.move_to_end(path)
+            while len(self._entries) > self.max_libraries:
+                self._entries.popitem(last=False)
+            return materials
+
+    def names(self, mat_path):
+        materials = self.library(mat_path)
+        return list(materials) if materials is not None else []
+
+    def _load(self, path):
+        try:
+            lib = self.rt.loadTempMaterialLibrary(path)
+        except Exception as e:
+            print(f"[ERROR] Cannot load material library {path}: {e}")
+            return None
+        if lib is None:
+            print(f"[ERROR] Cannot load material library: {path}")
+            return None
+        self.loads += 1
+        materials = {}
+        for i in range(lib.count):
+            mat = lib[i]
+            # first one wins, like the old linear search
+            materials.setdefault(str(mat.name), mat)
+        return materials
+
+    def invalidate(self, mat_path):
+        """Forget one library (the browser just rewrote, moved or deleted it)."""
+        with self._lock:
+            self._entries.pop(_norm(mat_path), None)
+
+    def invalidate_paths(self, paths):
+        with self._lock:
+            for path in paths:
+                self._entries.pop(_norm(path), None)
+
+    def invalidate_under(self, folder):
+        """Forget every library below folder (folder renamed / moved / deleted)."""
+        prefix = _norm(folder).rstrip("/") + "/"
+        with self._lock:
+            for path in [p for p in self._entries if p.startswith(prefix)]:
+                del self._entries[path]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, mat_path):
+        return _norm(mat_path) in self._entries
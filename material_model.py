@@ -0,0 +1,431 @@
+import time
+
+from PySide6.QtCore import Qt, QSize, QRect, QAbstractListModel, QModelIndex, Signal
+from PySide6.QtGui import QColor, QPen, QFont, QPainter, QFontMetrics
+from PySide6.QtWidgets import QStyledItemDelegate, QStyle
+
+import style
+
+
+# ==========================
+# Roles & card geometry
+# ==========================
+PathRole = Qt.UserRole          # same payload the old QListWidgetItems carried: "path" or "mat_path::name"
+NameRole = Qt.UserRole + 1      # plain name (no [PBR] / tags decoration)
+KindRole = Qt.UserRole + 2      # "folder" | "material" | "mtlx"
+TagsRole = Qt.UserRole + 3
+
+CARD_SIZE = QSize(160, 240)
+ICON_SIZE = QSize(150, 140)
+
+FETCH_BUDGET = 0.03             # seconds one fetchMore may spend past the visible page
+MAX_FETCH = 2000                # upper bound on rows resolved per fetchMore
+
+
+def make_row(kind, path, name, icon_path="", display=None, tags=None, pending=False):
+    """
+    One card. Plain dict so building 50k rows costs no Qt objects.
+    pending=True marks a placeholder whose real data comes from the
+    model's resolver on fetchMore (see MaterialCardModel.set_resolver).
+    """
+    return {
+        "kind": kind,
+        "path": path,
+        "name": name,
+        "display": display if display is not None else name,
+        "icon": icon_path,
+        "tags": tags or [],
+        "pending": pending,
+    }
+
+
+# ==========================
+# Card Model
+# ==========================
+class MaterialCardModel(QAbstractListModel):
+    """
+    Flat list model behind DraggableMaterialList.
+
+    Rows are plain dicts (see make_row). Pixmaps come from the shared
+    ThumbnailService: DecorationRole only asks for visible cards, a miss
+    queues an off-thread decode and the row is repainted when it lands.
+
+    Lazy loading: a folder is added as pending placeholder rows up front, so
+    rowCount (and the scrollbar) covers the whole folder immediately. The
+    expensive part (header read, split, thumbnail check) runs in fetchMore,
+    starting at the visible range the view reports via set_visible_range.
+    Batch size = the visible page, extended while the measured per-item
+    cost fits in FETCH_BUDGET.
+    """
+
+    rowsResolved = Signal(int, int)     # (resolved rows, total rows)
+
+    def __init__(self, thumbnails, parent=None):
+        super().__init__(parent)
+        self._rows = []
+        self._row_of_path = {}
+        self._paths_of_file = {}        # file path -> row paths ("path" / "path::name")
+        self._paths_by_kind = {}        # kind -> row paths
+        self.thumbnails = thumbnails
+        self._waiting = {}              # icon path -> row paths painted without it
+        thumbnails.thumbnailReady.connect(self._on_thumbnail_ready)
+        self._resolver = None
+        self._pending = 0
+        self._visible_first = 0
+        self._visible_count = 1
+        self._item_cost = None          # moving average, seconds per resolved row
+
+    # --- Qt model API ---
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= len(self._rows):
+            return None
+        row = self._rows[index.row()]
+        if role == Qt.DisplayRole:
+            return row["display"]
+        if role == PathRole:
+            return row["path"]
+        if role == NameRole:
+            return row["name"]
+        if role == KindRole:
+            return row["kind"]
+        if role == TagsRole:
+            return row["tags"]
+        if role == Qt.DecorationRole:
+            pix = self.thumbnails.pixmap(row["icon"])
+            if pix is None and row["icon"]:
+                self._waiting.setdefault(row["icon"], set()).add(row["path"])
+            return pix
+        if role == Qt.ToolTipRole:
+            return row["path"].split("::")[0]
+        return None
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable
+
+    # --- Rows ---
+
+    def clear(self):
+        self.beginResetModel()
+        self._rows = []
+        self._row_of_path = {}
+        self._paths_of_file = {}
+        self._paths_by_kind = {}
+        self._pending = 0
+        self._forget_waiting()
+        self.endResetModel()
+
+    def set_rows(self, rows):
+        self.beginResetModel()
+        self._forget_waiting()
+        self._rows = list(rows)
+        self._row_of_path = {}
+        self._paths_of_file = {}
+        self._paths_by_kind = {}
+        for row in self._rows:
+            self._track(row)
+        self._reindex(0)
+        self._pending = sum(1 for r in self._rows if r.get("pending"))
+        self.endResetModel()
+
+    def append_rows(self, rows):
+        rows = list(rows)
+        if not rows:
+            return
+        first = len(self._rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+        self._rows.extend(rows)
+        for row in rows:
+            self._track(row)
+        self._reindex(first)
+        self._pending += sum(1 for r in rows if r.get("pending"))
+        self.endInsertRows()
+
+    def remove_row(self, row_number):
+        self.remove_rows([row_number])
+
+    def row(self, row_number):
+        return self._rows[row_number]
+
+    def set_icon(self, path, icon_path):
+        """Point one card at a new image (e.g. a freshly rendered thumbnail)."""
+        row_number = self._row_of_path.get(path, -1)
+        if row_number < 0:
+            return
+        self._rows[row_number]["icon"] = icon_path
+        index = self.index(row_number)
+        self.dataChanged.emit(index, index, [Qt.DecorationRole])
+
+    def find_row(self, path):
+        """Row number for a PathRole payload, or -1."""
+        return self._row_of_path.get(path, -1)
+
+    def update_row(self, key, **changes):
+        """
+        Change one card in place (rename / move): fields as in make_row,
+        a new "path" re-keys it. Returns False if no card has the path key.
+        """
+        path = key
+        row_number = self._row_of_path.get(path, -1)
+        if row_number < 0:
+            return False
+        row = self._rows[row_number]
+        new_path = changes.get("path", path)
+        if new_path != path:
+            old = self._row_of_path.get(new_path, -1)
+            if old >= 0 and old != row_number:
+                self.remove_row(old)
+                row_number = self._row_of_path[path]
+            del self._row_of_path[path]
+            self._row_of_path[new_path] = row_number
+        self._untrack(row)
+        row.update(changes)
+        self._track(row)
+        index = self.index(row_number)
+        self.dataChanged.emit(index, index)
+        return True
+
+    def file_rows(self, file_path):
+        """Row numbers of every card of one file ("path" or "path::name" payloads)."""
+        return sorted(self._row_of_path[p] for p in self._paths_of_file.get(file_path, ()))
+
+    def paths_of_kind(self, kind):
+        return list(self._paths_by_kind.get(kind, ()))
+
+    def remove_rows(self, row_numbers):
+        """
+        Remove many cards: one beginRemoveRows per contiguous run (last run
+        first, so row numbers stay valid) and a single reindex at the end.
+        """
+        numbers = sorted(set(row_numbers))
+        if not numbers:
+            return
+        runs = []
+        for n in numbers:
+            if runs and runs[-1][1] == n - 1:
+                runs[-1][1] = n
+            else:
+                runs.append([n, n])
+        for first, last in reversed(runs):
+            self.beginRemoveRows(QModelIndex(), first, last)
+            for row in self._rows[first:last + 1]:
+                self._row_of_path.pop(row["path"], None)
+                self._untrack(row)
+                if row.get("pending"):
+                    self._pending -= 1
+            del self._rows[first:last + 1]
+            self.endRemoveRows()
+        self._reindex(numbers[0])
+
+    def _reindex(self, start):
+        for i in range(start, len(self._rows)):
+            self._row_of_path[self._rows[i]["path"]] = i
+
+    def _track(self, row):
+        path = row["path"]
+        self._paths_of_file.setdefault(path.split("::")[0], set()).add(path)
+        self._paths_by_kind.setdefault(row["kind"], set()).add(path)
+
+    def _untrack(self, row):
+        path = row["path"]
+        for table, key in ((self._paths_of_file, path.split("::")[0]), (self._paths_by_kind, row["kind"])):
+            paths = table.get(key)
+            if paths is not None:
+                paths.discard(path)
+                if not paths:
+                    del table[key]
+
+    # --- Lazy loading (canFetchMore / fetchMore) ---
+
+    def set_resolver(self, resolver):
+        """
+        resolver(row) -> finished row dict, or None to drop the card
+        (file vanished / was split). Called on the GUI thread.
+        """
+        self._resolver = resolver
+
+    def set_visible_range(self, first, count):
+        self._visible_first = max(0, first)
+        self._visible_count = max(1, count)
+
+    @property
+    def pending_count(self):
+        return self._pending
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self._pending > 0 and self._resolver is not None
+
+    def fetchMore(self, parent=QModelIndex()):
+        if not self.canFetchMore(parent):
+            return
+        page = self._visible_count
+        limit = page
+        if self._item_cost:
+            limit = max(page, int(FETCH_BUDGET / self._item_cost))
+        limit = min(limit, MAX_FETCH)
+
+        resolved = 0
+        row_number = self._visible_first
+        start = time.perf_counter()
+        while resolved < limit:
+            if resolved >= page and time.perf_counter() - start > FETCH_BUDGET:
+                break
+            row_number = self._next_pending(row_number)
+            if row_number < 0:
+                break
+            kept = self.resolve_row(row_number)
+            resolved += 1
+            if kept:
+                row_number += 1         # else the card was dropped and the slot holds the next row
+
+        if resolved:
+            cost = (time.perf_counter() - start) / resolved
+            self._item_cost = cost if self._item_cost is None else 0.7 * self._item_cost + 0.3 * cost
+            self.rowsResolved.emit(len(self._rows) - self._pending, len(self._rows))
+
+    def _next_pending(self, start):
+        """First pending row at or after start, wrapping to the top; -1 if none."""
+        if not self._pending:
+            return -1
+        count = len(self._rows)
+        for offset in range(count):
+            row_number = (start + offset) % count
+            if self._rows[row_number].get("pending"):
+                return row_number
+        return -1
+
+    def resolve_row(self, row_number):
+        """Replace one placeholder with the resolver's row (or drop it). False if dropped."""
+        row = self._rows[row_number]
+        if not row.get("pending") or self._resolver is None:
+            return True
+        try:
+            new_row = self._resolver(row)
+        except Exception as e:
+            print(f"[ERROR] Failed to resolve {row['path']}: {e}")
+            new_row = dict(row, pending=False)
+        if new_row is None:
+            self.remove_row(row_number)
+            return False
+        new_row["pending"] = False
+        self._pending -= 1
+        self._rows[row_number] = new_row
+        self._untrack(row)
+        self._track(new_row)
+        if new_row["path"] != row["path"]:
+            self._row_of_path.pop(row["path"], None)
+            self._row_of_path[new_row["path"]] = row_number
+        index = self.index(row_number)
+        self.dataChanged.emit(index, index)
+        return True
+
+    # --- Pixmaps ---
+
+    def _on_thumbnail_ready(self, icon_path):
+        for path in self._waiting.pop(icon_path, ()):
+            row_number = self._row_of_path.get(path, -1)
+            if row_number >= 0:
+                index = self.index(row_number)
+                self.dataChanged.emit(index, index, [Qt.DecorationRole])
+
+    def _forget_waiting(self):
+        self._waiting = {}
+        self.thumbnails.cancel_pending()
+
+    def forget_pixmap(self, icon_path):
+        """Drop a cached icon (e.g. a thumbnail was just re-rendered)."""
+        self.thumbnails.invalidate(icon_path)
+
+
+# ==========================
+# Card Delegate
+# ==========================
+class MaterialCardDelegate(QStyledItemDelegate):
+    """
+    Paints the cards that used to be QLabel item widgets
+    (style.HTML_CARD_STYLE / HTML_FOLDER_STYLE) straight onto the viewport.
+    """
+
+    MARGIN = 4
+    RADIUS = 8
+    PILL_HEIGHT = 28
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.name_font = QFont("Segoe UI")
+        self.name_font.setPixelSize(11)
+        self.name_font.setBold(True)
+        self.pill_font = QFont("Segoe UI")
+        self.pill_font.setPixelSize(12)
+        self.pill_font.setBold(True)
+        self.tag_font = QFont("Segoe UI")
+        self.tag_font.setPixelSize(10)
+
+    def sizeHint(self, option, index):
+        return CARD_SIZE
+
+    def paint(self, painter, option, index):
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing, True)
+
+        card = option.rect.adjusted(self.MARGIN, self.MARGIN, -self.MARGIN, -self.MARGIN)
+        selected = bool(option.state & QStyle.State_Selected)
+
+        # Card frame
+        if selected:
+            painter.setPen(QPen(QColor(style.C_ACCENT), 2))
+            painter.setBrush(QColor(style.C_BG_HEADER))
+        else:
+            painter.setPen(QPen(QColor(style.C_BORDER), 1))
+            painter.setBrush(QColor(style.C_BG_PANEL))
+        painter.drawRoundedRect(card, self.RADIUS, self.RADIUS)
+
+        # Thumbnail
+        icon_rect = QRect(card.left() + (card.width() - ICON_SIZE.width()) // 2,
+                          card.top() + 4, ICON_SIZE.width(), ICON_SIZE.height())
+        pix = index.data(Qt.DecorationRole)
+        if pix is not None and not pix.isNull():
+            x = icon_rect.left() + (icon_rect.width() - pix.width()) // 2
+            y = icon_rect.top() + (icon_rect.height() - pix.height()) // 2
+            painter.drawPixmap(x, y, pix)
+
+        kind = index.data(KindRole)
+        text_top = icon_rect.bottom() + 8
+        text_rect = QRect(card.left() + 5, text_top, card.width() - 10, card.bottom() - text_top - 4)
+
+        if kind == "folder":
+            self._paint_pill(painter, text_rect, index.data(Qt.DisplayRole).upper(),
+                             style.C_FOLDER_BG, style.C_TEXT_MAIN, style.C_FOLDER_BORDER, self.name_font)
+        elif kind == "material":
+            name_rect = QRect(text_rect.left(), text_rect.top(), text_rect.width(), 18)
+            self._paint_text(painter, name_rect, index.data(NameRole).upper(), self.name_font, style.C_TEXT_MAIN)
+            tags = index.data(TagsRole)
+            if tags:
+                tag_rect = QRect(text_rect.left(), name_rect.bottom() + 2, text_rect.width(), 14)
+                self._paint_text(painter, tag_rect, f"[{', '.join(tags)}]", self.tag_font, style.C_TEXT_DIM)
+            pill_rect = QRect(text_rect.left(), text_rect.bottom() - self.PILL_HEIGHT,
+                              text_rect.width(), self.PILL_HEIGHT)
+            self._paint_pill(painter, pill_rect, "Assign", style.C_BTN_BLUE, style.C_WHITE, None, self.pill_font)
+        else:
+            self._paint_text(painter, text_rect, index.data(Qt.DisplayRole), self.name_font,
+                             style.C_TEXT_MAIN, Qt.AlignHCenter | Qt.AlignTop)
+
+        painter.restore()
+
+    def _paint_text(self, painter, rect, text, font, color, align=Qt.AlignCenter):
+        painter.setFont(font)
+        painter.setPen(QColor(color))
+        elided = QFontMetrics(font).elidedText(text or "", Qt.ElideRight, rect.width())
+        painter.drawText(rect, align, elided)
+
+    def _paint_pill(self, painter, rect, text, bg, fg, border, font):
+        rect = QRect(rect.left(), rect.top(), rect.width(), min(rect.height(), self.PILL_HEIGHT))
+        painter.setPen(QPen(QColor(border), 1) if border else Qt.NoPen)
+        painter.setBrush(QColor(bg))
+        painter.drawRoundedRect(rect, 5, 5)
+        self._paint_text(painter, rect.adjusted(6, 0, -6, 0), text, font, fg)
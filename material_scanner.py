@@ -0,0 +1,311 @@
+import os
+import sys
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from mat_reader import read_mat_header, MatHeader
+
+
+DEFAULT_WORKERS = 8     # directory round-trips in flight (SMB is latency bound)
+DEFAULT_BATCH = 64      # directory deltas per index transaction
+
+
+def _norm(path):
+    return path.replace("\\", "/")
+
+
+# ==========================
+# Scan Delta
+# ==========================
+class ScanResult:
+    """Totals of one scan, reported back to the UI / nightly job."""
+
+    def __init__(self):
+        self.added = 0
+        self.removed = 0
+        self.modified = 0
+        self.classified = 0
+        self.dirs_listed = 0
+        self.dirs_skipped = 0
+        self.cancelled = False
+        self.elapsed = 0.0
+
+    @property
+    def changed(self):
+        return bool(self.added or self.removed or self.modified)
+
+    @property
+    def dirs_done(self):
+        return self.dirs_listed + self.dirs_skipped
+
+    def __repr__(self):
+        return (f"ScanResult(added={self.added}, removed={self.removed}, modified={self.modified}, "
+                f"listed={self.dirs_listed}, skipped={self.dirs_skipped}, "
+                f"cancelled={self.cancelled}, {self.elapsed:.3f}s)")
+
+
+# ==========================
+# Incremental Scanner (parallel crawler)
+# ==========================
+class IncrementalScanner:
+    """
+    mtime-aware, parallel rescan of the material root.
+
+    Every directory's mtime and every .mat file's (size, mtime) are stored in
+    the MaterialIndex. A directory whose mtime did not change is not listed
+    again: its known sub-directories are taken from the index and only they
+    are stat'ed. Changed directories are listed with os.scandir and their
+    add / remove / modify deltas are written back in batches.
+    In-place rewrites that leave the directory mtime alone are picked up
+    by scan(full=True).
+
+    New / modified .mat files get their header (name, material class) parsed
+    in the same pool task, so the class is stored with the row; rows indexed
+    before that are classified by a backfill pass at the end of scan().
+
+    One pool task per directory, so up to max_workers directory round-trips
+    are in flight at once. No Qt here: the nightly job runs it headless
+    (see main() below), the browser polls `result` from a progress dialog.
+    """
+
+    def __init__(self, index, root_path, max_workers=DEFAULT_WORKERS, batch_size=DEFAULT_BATCH,
+                 progress_callback=None, read_headers=True, delta_callback=None):
+        self.index = index
+        self.root_path = _norm(root_path).rstrip("/") or "/"
+        self.max_workers = max(1, int(max_workers))
+        self.batch_size = max(1, int(batch_size))
+        self.progress_callback = progress_callback
+        self.read_headers = read_headers
+        # delta_callback(deltas): called (on the scanning thread) after each batch is written
+        self.delta_callback = delta_callback
+        self.result = ScanResult()
+        self._cancel = threading.Event()
+
+    def cancel(self):
+        self._cancel.set()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def scan(self, full=False):
+        """
+        full=True ignores stored directory mtimes and lists everything
+        (still a delta against the index, so tags are never touched).
+        Cancelling keeps every batch already written; the next scan resumes
+        from there because finished directories have their mtime stored.
+        """
+        self.result = result = ScanResult()
+        self._cancel.clear()
+        start = time.perf_counter()
+        pending_deltas, pending_subdirs = [], []
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="mat-crawl") as pool:
+            running = {pool.submit(self._visit, self.root_path, full)}
+            while running:
+                done, running = wait(running, timeout=0.25, return_when=FIRST_COMPLETED)
+                if self._cancel.is_set():
+                    for future in running:
+                        future.cancel()
+                    result.cancelled = True
+                    break
+
+                for future in done:
+                    try:
+                        delta, subdirs = future.result()
+                    except Exception as e:
+                        print(f"[WARNING] Crawl task failed: {e}")
+                        continue
+                    if delta is None:
+                        result.dirs_skipped += 1
+                    else:
+                        result.dirs_listed += 1
+                        pending_deltas.append(delta)
+                        pending_subdirs.extend((sub, delta[0]) for sub in subdirs)
+                    for sub in subdirs:
+                        running.add(pool.submit(self._visit, sub, full))
+                    if len(pending_deltas) >= self.batch_size:
+                        self._flush(pending_deltas, result, pending_subdirs)
+                        pending_deltas, pending_subdirs = [], []
+                        if self.progress_callback:
+                            self.progress_callback(result)
+
+                if not running:
+                    self._flush(pending_deltas, result, pending_subdirs)
+                    pending_deltas, pending_subdirs = [], []
+                    if self.progress_callback:
+                        self.progress_callback(result)
+
+            # Deltas already computed are still valid after a cancel.
+            self._flush(pending_deltas, result, pending_subdirs)
+            if self.read_headers and not result.cancelled:
+                self._backfill_classes(pool, result)
+
+        result.elapsed = time.perf_counter() - start
+        return result
+
+    def scan_folder(self, folder):
+        """
+        List one directory (no recursion, stored mtime ignored) and write its
+        delta. Returns ([sub-directories] or None if unreadable); the delta
+        goes through delta_callback like in scan(). Used by the watcher for
+        the folder on screen.
+        """
+        self.result = result = ScanResult()
+        delta, subdirs = self._visit(_norm(folder), True)
+        if delta is None:
+            return None
+        result.dirs_listed = 1
+        self._flush([delta], result, [(sub, delta[0]) for sub in subdirs])
+        return subdirs
+
+    def _backfill_classes(self, pool, result):
+        """Classify rows that were indexed without a header (older index, JSON migration)."""
+        paths = self.index.unclassified_paths()
+        for start in range(0, len(paths), self.batch_size):
+            if self._cancel.is_set():
+                result.cancelled = True
+                return
+            chunk = paths[start:start + self.batch_size]
+            for path, found in zip(chunk, pool.map(_stat_and_header, chunk)):
+                if found is None:
+                    continue
+                size, mtime, header = found
+                self.index.put_header(path, size, mtime, header)
+                result.classified += 1
+            if self.progress_callback:
+                self.progress_callback(result)
+
+    def _flush(self, deltas, result, subdirs=()):
+        if not deltas:
+            return
+        self.index.apply_folder_deltas(deltas, subdirs)
+        for _folder, _mtime, added, removed, modified, _removed_dirs, _parent in deltas:
+            result.added += len(added)
+            result.removed += len(removed)
+            result.modified += len(modified)
+        if self.delta_callback:
+            self.delta_callback(deltas)
+
+    def _visit(self, folder, full):
+        """
+        Pool task for one directory.
+        Returns (delta or None if unchanged, [sub-directories to visit]).
+        """
+        if self._cancel.is_set():
+            return None, []
+        known_mtime, known_children = self.index.folder_state(folder)
+        try:
+            dir_mtime = os.stat(folder).st_mtime
+        except OSError:
+            # Gone or unreachable: keep the index as is. A folder that was really
+            # deleted is dropped by its parent's listing (removed_dirs) in _flush.
+            return None, known_children
+
+        if not full and known_mtime is not None and known_mtime == dir_mtime:
+            # Listing unchanged: no files added / removed here. Sub-dirs may still change.
+            return None, known_children
+
+        on_disk, subdirs = list_folder(folder)
+        if on_disk is None:
+            # Unreadable right now (share hiccup): keep what the index knows.
+            return None, known_children
+        known_files = self.index.files_in_folder(folder)
+
+        added, modified = [], []
+        for path, (size, mtime) in on_disk.items():
+            old = known_files.get(path)
+            if old is None:
+                added.append((path, size, mtime, self._header(path)))
+            elif old != (size, mtime):
+                modified.append((path, size, mtime, self._header(path)))
+        removed = [p for p in known_files if p not in on_disk]
+        removed_dirs = [d for d in known_children if d not in subdirs]
+
+        return (folder, dir_mtime, added, removed, modified, removed_dirs, None), subdirs
+
+
+    def _header(self, path):
+        if not self.read_headers or self._cancel.is_set():
+            return None
+        return _read_header_dict(path)
+
+
+def _read_header_dict(path):
+    try:
+        return read_mat_header(path).to_dict()
+    except Exception as e:
+        print(f"[WARNING] Could not read .mat header {path}: {e}")
+        return MatHeader().to_dict()
+
+
+def _stat_and_header(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_size, st.st_mtime, _read_header_dict(path)
+
+
+# ==========================
+# Directory listing
+# ==========================
+def list_folder(folder):
+    """
+    One os.scandir pass: ({mat_path: (size, mtime)}, [sub-directory paths]),
+    or (None, []) if the directory could not be listed.
+    On Windows DirEntry.stat() is served from the directory listing itself,
+    so this costs one round-trip per directory even on SMB.
+    """
+    files, subdirs = {}, []
+    try:
+        with os.scandir(folder) as it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(_norm(entry.path))
+                    elif entry.name.lower().endswith(".mat"):
+                        st = entry.stat(follow_symlinks=False)
+                        files[_norm(entry.path)] = (st.st_size, st.st_mtime)
+                except OSError as e:
+                    print(f"[WARNING] Could not stat {entry.path}: {e}")
+    except OSError as e:
+        print(f"[WARNING] Could not list {folder}: {e}")
+        return None, []
+    return files, subdirs
+
+
+# ==========================
+# Headless entry point (nightly pre-index job)
+# ==========================
+def main(argv=None):
+    import argparse
+    from material_index import open_material_index
+
+    parser = argparse.ArgumentParser(description="Pre-index a material root (no 3ds Max needed).")
+    parser.add_argument("root", help="Material root folder (local path or UNC share)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Parallel directory tasks")
+    parser.add_argument("--batch", type=int, default=DEFAULT_BATCH, help="Directories per index transaction")
+    parser.add_argument("--full", action="store_true", help="Ignore stored directory mtimes")
+    args = parser.parse_args(argv)
+
+    def report(result):
+        print(f"[SCAN] {result.dirs_done} dirs, +{result.added} / -{result.removed} / ~{result.modified}")
+
+    index = open_material_index(args.root)
+    scanner = IncrementalScanner(index, args.root, max_workers=args.workers,
+                                 batch_size=args.batch, progress_callback=report)
+    try:
+        result = scanner.scan(full=args.full)
+    except KeyboardInterrupt:
+        scanner.cancel()
+        result = scanner.result
+    finally:
+        index.close()
+    print(f"[SUCCESS] {result}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,481 @@
+import re
+import math
+import bisect
+import heapq
+import threading
+
+
+FIELDS = ("name", "tag", "folder", "class")
+_TOKEN_RE = re.compile(r"[0-9a-z]+")
+
+# ranked mode: how much a hit in each field counts, and how a token matched the term
+FIELD_WEIGHTS = {"name": 3.0, "tag": 2.0, "folder": 1.0, "class": 0.5}
+MATCH_EXACT, MATCH_PREFIX, MATCH_SUBSTRING = 1.0, 0.8, 0.6
+MATCH_TYPO = {1: 0.55, 2: 0.35}         # edit distance -> similarity
+
+
+def tokenize(text):
+    return _TOKEN_RE.findall((text or "").lower())
+
+
+def trigrams(token):
+    return {token[i:i + 3] for i in range(len(token) - 2)}
+
+
+def max_typos(term):
+    """Edit distance tolerated for a query term: none below 4 chars, 1 up to 6, then 2."""
+    if len(term) < 4:
+        return 0
+    return 1 if len(term) <= 6 else 2
+
+
+def edit_distance(a, b, limit):
+    """
+    Edit distance counting a swap of neighbours ("marbel") as one edit,
+    or limit + 1 as soon as it is known to exceed limit.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    before, previous = None, list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            cost = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb))
+            if i > 1 and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                cost = min(cost, before[j - 2] + 1)
+            current.append(cost)
+        if min(current) > limit:
+            return limit + 1
+        before, previous = previous, current
+    return previous[-1]
+
+
+# ==========================
+# Query parsing
+# ==========================
+class Term:
+    """One query word: field (None = any), text, prefix-only, negated."""
+
+    def __init__(self, text, field=None, prefix=False, negated=False):
+        self.text = text
+        self.field = field
+        self.prefix = prefix
+        self.negated = negated
+
+    def __repr__(self):
+        return f"Term({'-' if self.negated else ''}{self.field + ':' if self.field else ''}{self.text}{'*' if self.prefix else ''})"
+
+
+def parse_query(query):
+    """
+    Query -> OR of AND-groups of Terms.
+
+        red metal          both (AND)
+        red OR blue        either (also "|")
+        -rust / NOT rust   exclude
+        wood*              token prefix only (default is substring)
+        tag:wood  folder:archive  class:vray  name:oak
+    """
+    groups, current = [], []
+    negate_next = False
+    for word in (query or "").lower().split():
+        if word in ("or", "|"):
+            if current:
+                groups.append(current)
+            current = []
+            continue
+        if word == "not":
+            negate_next = True
+            continue
+        negated = negate_next or (word.startswith("-") and len(word) > 1)
+        negate_next = False
+        word = word.lstrip("-")
+        field = None
+        if ":" in word:
+            head, rest = word.split(":", 1)
+            if head in FIELDS and rest:
+                field, word = head, rest
+        prefix = word.endswith("*")
+        # a word like "oak-wood" or "rust_01" is several tokens, all required
+        for text in tokenize(word):
+            current.append(Term(text, field, prefix, negated))
+    if current:
+        groups.append(current)
+    return groups
+
+
+# ==========================
+# Search Index (in memory)
+# ==========================
+class SearchIndex:
+    """
+    Token / trigram inverted index over material name, tags, folder path and
+    class, kept in memory next to the SQLite MaterialIndex.
+
+    postings[field][token] -> set of doc ids. Substring terms (3+ chars) go
+    through a trigram index over the *vocabulary*, so only matching tokens
+    are verified, never every material. Shorter terms and "word*" use a
+    sorted vocabulary with bisect. Tags can be changed per document without
+    a rebuild (set_tags).
+
+    Ranked mode (ranked_search / search_pages(ranked=True)) also accepts
+    typos: tokens sharing enough trigrams with a term are checked with a
+    bounded edit distance. Hits are scored per class of equal score (see
+    _ranked_classes), so the top K never needs every hit scored. Queries may run on a worker thread
+    (search_pipeline) while the GUI edits tags: both hold self._lock.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.docs = {}                                   # id -> doc dict
+        self._ids_of_path = {}                           # source file -> doc ids (a .mat can hold several)
+        self.postings = {field: {} for field in FIELDS}
+        self._token_refs = {}                            # token -> number of (field, doc) uses
+        self._trigram_tokens = {}                        # trigram -> set of tokens
+        self._sorted_tokens = []
+        self._sorted_dirty = False
+
+    def __len__(self):
+        return len(self.docs)
+
+    # --- Build / update ---
+
+    def add(self, doc_id, name, tags=(), folder="", mat_class="", payload=None, path=None):
+        """
+        payload: anything the caller wants back with hits (mat_path, thumbnail, engine mask...).
+        path: source file, so remove_path() can drop every doc of a changed / deleted file.
+        """
+        with self._lock:
+            self._add(doc_id, name, tags, folder, mat_class, payload, path)
+
+    def _add(self, doc_id, name, tags, folder, mat_class, payload, path):
+        if doc_id in self.docs:
+            self.remove(doc_id)
+        doc = {"id": doc_id, "name": name, "lower_name": (name or "").lower(), "tags": list(tags or []),
+               "folder": folder or "", "mat_class": mat_class or "", "payload": payload, "path": path}
+        self.docs[doc_id] = doc
+        if path is not None:
+            self._ids_of_path.setdefault(path, set()).add(doc_id)
+        for field, tokens in self._doc_tokens(doc).items():
+            for token in tokens:
+                self._post(field, token, doc_id)
+
+    def remove(self, doc_id):
+        with self._lock:
+            doc = self.docs.pop(doc_id, None)
+            if doc is None:
+                return
+            ids = self._ids_of_path.get(doc["path"])
+            if ids is not None:
+                ids.discard(doc_id)
+                if not ids:
+                    del self._ids_of_path[doc["path"]]
+            for field, tokens in self._doc_tokens(doc).items():
+                for token in tokens:
+                    self._unpost(field, token, doc_id)
+
+    def remove_path(self, path):
+        """Drop every doc added with this source path. Returns how many."""
+        with self._lock:
+            ids = list(self._ids_of_path.get(path, ()))
+            for doc_id in ids:
+                self.remove(doc_id)
+            return len(ids)
+
+    def paths_under(self, folder):
+        """Source paths inside folder (any depth), for folder renames / deletes."""
+        prefix = folder.rstrip("/") + "/"
+        with self._lock:
+            return [path for path in self._ids_of_path if path.startswith(prefix)]
+
+    def set_tags(self, doc_id, tags):
+        with self._lock:
+            doc = self.docs.get(doc_id)
+            if doc is None:
+                return
+            old, new = self._tag_tokens(doc["tags"]), self._tag_tokens(tags)
+            for token in old - new:
+                self._unpost("tag", token, doc_id)
+            for token in new - old:
+                self._post("tag", token, doc_id)
+            doc["tags"] = list(tags or [])
+
+    def _tag_tokens(self, tags):
+        return {token for tag in (tags or []) for token in tokenize(tag)}
+
+    def _doc_tokens(self, doc):
+        return {
+            "name": set(tokenize(doc["name"])),
+            "tag": self._tag_tokens(doc["tags"]),
+            "folder": set(tokenize(doc["folder"])),
+            "class": set(tokenize(doc["mat_class"])),
+        }
+
+    def _post(self, field, token, doc_id):
+        ids = self.postings[field].setdefault(token, set())
+        if doc_id in ids:
+            return
+        ids.add(doc_id)
+        refs = self._token_refs.get(token, 0)
+        self._token_refs[token] = refs + 1
+        if refs == 0:
+            for gram in trigrams(token):
+                self._trigram_tokens.setdefault(gram, set()).add(token)
+            self._sorted_dirty = True
+
+    def _unpost(self, field, token, doc_id):
+        ids = self.postings[field].get(token)
+        if not ids or doc_id not in ids:
+            return
+        ids.discard(doc_id)
+        if not ids:
+            del self.postings[field][token]
+        refs = self._token_refs[token] - 1
+        if refs:
+            self._token_refs[token] = refs
+            return
+        del self._token_refs[token]
+        for gram in trigrams(token):
+            tokens = self._trigram_tokens.get(gram)
+            if tokens is not None:
+                tokens.discard(token)
+                if not tokens:
+                    del self._trigram_tokens[gram]
+        self._sorted_dirty = True
+
+    # --- Query ---
+
+    def _vocabulary(self):
+        if self._sorted_dirty:
+            self._sorted_tokens = sorted(self._token_refs)
+            self._sorted_dirty = False
+        return self._sorted_tokens
+
+    def matching_tokens(self, text, prefix=False):
+        if prefix:
+            vocab = self._vocabulary()
+            start = bisect.bisect_left(vocab, text)
+            end = bisect.bisect_left(vocab, text + "￿")
+            return vocab[start:end]
+        if len(text) < 3:
+            # no trigram to narrow with: scan the vocabulary, still a substring match ("ak" finds "oak")
+            return [token for token in self._vocabulary() if text in token]
+        grams = sorted(trigrams(text), key=lambda g: len(self._trigram_tokens.get(g, ())))
+        candidates = None
+        for gram in grams:
+            tokens = self._trigram_tokens.get(gram)
+            if not tokens:
+                return []
+            candidates = set(tokens) if candidates is None else candidates & tokens
+            if not candidates:
+                return []
+        return [token for token in candidates if text in token]
+
+    def term_ids(self, term):
+        fields = (term.field,) if term.field else FIELDS
+        ids = set()
+        for token in self.matching_tokens(term.text, term.prefix):
+            for field in fields:
+                hit = self.postings[field].get(token)
+                if hit:
+                    ids |= hit
+        return ids
+
+    def search_ids(self, query):
+        """Set of doc ids matching query (see parse_query)."""
+        with self._lock:
+            return self._search_ids(query)
+
+    def _search_ids(self, query):
+        result = set()
+        for group in parse_query(query):
+            positive = [t for t in group if not t.negated]
+            negative = [t for t in group if t.negated]
+            if positive:
+                # most selective term first, stop as soon as nothing is left
+                sets = sorted((self.term_ids(t) for t in positive), key=len)
+                ids = set(sets[0])
+                for other in sets[1:]:
+                    ids &= other
+                    if not ids:
+                        break
+            else:
+                ids = set(self.docs)
+            for term in negative:
+                if not ids:
+                    break
+                ids -= self.term_ids(term)
+            result |= ids
+        return result
+
+    def _hits(self, query, accept):
+        with self._lock:
+            docs = [self.docs[i] for i in self._search_ids(query)]
+        if accept is not None:
+            docs = [d for d in docs if accept(d)]
+        return docs
+
+    @staticmethod
+    def _order(doc):
+        return (doc["lower_name"], doc["id"])
+
+    def search(self, query, limit=None, accept=None):
+        """
+        Matching docs sorted by name. accept(doc) -> bool filters hits
+        (e.g. the engine mask); limit keeps only the first N by name
+        without sorting every hit.
+        """
+        docs = self._hits(query, accept)
+        if limit:
+            return heapq.nsmallest(int(limit), docs, key=self._order)
+        return sorted(docs, key=self._order)
+
+    def search_pages(self, query, page_size, accept=None, ranked=False):
+        """
+        Same hits as search() (or ranked order), yielded as lists of
+        page_size docs. The first page is picked with a partial selection,
+        so it is ready before the rest of the hits have been sorted.
+        """
+        if ranked:
+            yield from self._ranked_pages(query, page_size, accept)
+            return
+        docs = self._hits(query, accept)
+        if len(docs) <= page_size:
+            yield sorted(docs, key=self._order)
+            return
+        first = heapq.nsmallest(page_size, docs, key=self._order)
+        yield first
+        last = self._order(first[-1])
+        rest = sorted((d for d in docs if self._order(d) > last), key=self._order)
+        for start in range(0, len(rest), page_size):
+            yield rest[start:start + page_size]
+
+    # --- Ranked (typo tolerant) ---
+
+    def fuzzy_tokens(self, text):
+        """{token: similarity} for vocabulary tokens matching text exactly, by prefix, substring or typo."""
+        matches = {}
+        for token in self.matching_tokens(text, prefix=len(text) < 3):
+            if token == text:
+                matches[token] = MATCH_EXACT
+            elif token.startswith(text):
+                matches[token] = MATCH_PREFIX
+            else:
+                matches[token] = MATCH_SUBSTRING
+        typos = max_typos(text)
+        if not typos:
+            return matches
+        grams = trigrams(text)
+        # each edit destroys at most 3 trigrams; demand at least half of them anyway
+        needed = max(len(grams) - 3 * typos, (len(grams) + 1) // 2, 1)
+        shared = {}
+        for gram in grams:
+            for token in self._trigram_tokens.get(gram, ()):
+                shared[token] = shared.get(token, 0) + 1
+        for token, count in shared.items():
+            if count < needed or token in matches:
+                continue
+            distance = edit_distance(text, token, typos)
+            if distance <= typos:
+                matches[token] = MATCH_TYPO[distance]
+        return matches
+
+    def _term_classes(self, term, n_docs):
+        """
+        [(weight, ids)] for one query term, best weight first; each doc sits
+        in the class of its best (field, match kind). weight = field weight x
+        match similarity x BM25 idf of the term.
+        """
+        fields = (term.field,) if term.field else FIELDS
+        if term.prefix:
+            tokens = {t: MATCH_PREFIX for t in self.matching_tokens(term.text, prefix=True)}
+        else:
+            tokens = self.fuzzy_tokens(term.text)
+        by_weight = {}
+        for token, similarity in tokens.items():
+            for field in fields:
+                ids = self.postings[field].get(token)
+                if ids:
+                    key = FIELD_WEIGHTS[field] * similarity
+                    by_weight.setdefault(key, []).append(ids)
+        classes, seen = [], set()
+        for key in sorted(by_weight, reverse=True):
+            ids = set().union(*by_weight[key]) - seen
+            if ids:
+                seen |= ids
+                classes.append((key, ids))
+        idf = math.log(1.0 + (n_docs - len(seen) + 0.5) / (len(seen) + 0.5))
+        return [(key * idf, ids) for key, ids in classes], seen
+
+    def _ranked_classes(self, query):
+        """
+        [(score, ids)] best first. Docs are never scored one by one: every
+        term splits its hits into a handful of weight classes and classes of
+        different terms are combined with set intersections, so the cost
+        follows the number of distinct scores, not the number of hits.
+        Within a class docs are equal; callers order them by name length
+        (the BM25 length norm for one-word fields) and name.
+        """
+        with self._lock:
+            terms = [t for group in parse_query(query) for t in group]
+            positive = [t for t in terms if not t.negated]
+            if not positive:
+                return []
+            excluded = set()
+            for term in terms:
+                if term.negated:
+                    excluded |= self.term_ids(term)
+
+            n_docs = max(len(self.docs), 1)
+            per_term = [self._term_classes(term, n_docs) for term in positive]
+            universe = set().union(*(seen for _classes, seen in per_term)) - excluded
+
+            # (score, matched terms, ids), refined one term at a time
+            combined = [(0.0, 0, universe)] if universe else []
+            for classes, seen in per_term:
+                missing = universe - seen
+                refined = []
+                for score, matched, ids in combined:
+                    for weight, term_ids in classes:
+                        both = ids & term_ids
+                        if both:
+                            refined.append((score + weight, matched + 1, both))
+                    rest = ids & missing
+                    if rest:
+                        refined.append((score, matched, rest))
+                combined = refined
+
+        # coordination: a doc matching every term outranks one matching some
+        total = len(positive)
+        ranked = [(score * matched / total, ids) for score, matched, ids in combined if matched]
+        ranked.sort(key=lambda item: -item[0])
+        return ranked
+
+    def _class_docs(self, ids, accept):
+        with self._lock:
+            docs = [self.docs[i] for i in ids if i in self.docs]
+        if accept is not None:
+            docs = [d for d in docs if accept(d)]
+        docs.sort(key=lambda d: (len(d["lower_name"]), d["lower_name"], d["id"]))
+        return docs
+
+    def ranked_search(self, query, limit=50, accept=None):
+        """Top `limit` docs by relevance: [(score, doc)], best first."""
+        results = []
+        for score, ids in self._ranked_classes(query):
+            for doc in self._class_docs(ids, accept):
+                results.append((score, doc))
+                if len(results) >= limit:
+                    return results
+        return results
+
+    def _ranked_pages(self, query, page_size, accept):
+        page = []
+        for _score, ids in self._ranked_classes(query):
+            for doc in self._class_docs(ids, accept):
+                page.append(doc)
+                if len(page) >= page_size:
+                    yield page
+                    page = []
+        if page:
+            yield page
@@ -0,0 +1,253 @@
+import os
+import re
+import json
+
+
+TEXTURE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".tif", ".tiff", ".exr")
+
+# slot -> file name keywords; the OpenPBR builder wires every slot but "ao"
+MAP_KEYWORDS = {
+    "albedo":       ("albedo", "basecolor", "diffuse", "color", "diff"),
+    "roughness":    ("roughness", "rough"),
+    "normal":       ("normal", "nor", "nrm"),
+    "metalness":    ("metalness", "metallic", "metal"),
+    "opacity":      ("opacity", "transparency", "alpha"),
+    "displacement": ("displace", "displacement", "height", "disp"),
+    "emission":     ("emission", "emit", "glow"),
+    "ao":           ("ambientocclusion", "occlusion", "ao"),
+}
+# short / generic words: only used when no specific keyword is in the name
+WEAK_KEYWORDS = {"color", "diff", "rough", "nor", "metal", "alpha", "height", "disp", "emit", "glow", "ao"}
+
+_KEYWORD_SLOT = {k: slot for slot, keys in MAP_KEYWORDS.items() for k in keys}
+_STRONG_SUFFIXES = sorted((k for k in _KEYWORD_SLOT if k not in WEAK_KEYWORDS), key=len, reverse=True)
+_SPLIT = re.compile(r"[\s_\-.]+")
+_RESOLUTION = re.compile(r"^(\d{1,2}k|256|512|1024|2048|4096|8192|16384|\d{3,5}x\d{3,5})$")
+# variant tokens after the map word that make a file the second choice (DirectX normals, previews)
+_SECOND_CHOICE = {"dx", "directx", "preview", "small"}
+# normal-map conventions glued to the map word ("NormalGL", "Normal_DX" is split already)
+_VARIANT_SUFFIXES = ("opengl", "directx", "gl", "dx")
+
+PLAN_FILE_NAME = "pbr_plan.json"
+
+
+def _norm(path):
+    return (path or "").replace("\\", "/").rstrip("/")
+
+
+def _resolution_rank(resolution):
+    """'4k' -> 4096, '2048' -> 2048, '2048x1024' -> 2048, None -> 0 (unknown sorts last)."""
+    if not resolution:
+        return 0
+    if resolution.endswith("k"):
+        return int(resolution[:-1]) * 1024
+    return int(resolution.split("x")[0])
+
+
+def _split_variant(token):
+    """'NormalGL' -> ('Normal', 'gl'); a token without a variant suffix comes back whole."""
+    lower = token.lower()
+    for suffix in _VARIANT_SUFFIXES:
+        head = lower[:-len(suffix)]
+        if (lower.endswith(suffix) and head
+                and (head in _KEYWORD_SLOT or any(head.endswith(k) for k in _STRONG_SUFFIXES))):
+            return token[:-len(suffix)], suffix
+    return token, None
+
+
+def classify_texture(file_name):
+    """
+    file name -> (set base, slot, resolution, variant tokens) or None.
+
+    The name is split on _ - . and spaces. Resolution tokens (4k, 2048,
+    2048x2048) are removed. The map word is then looked up from the end,
+    so "Metal_Plate_Roughness_4K" is roughness of set "Metal_Plate".
+    Specific keywords win over generic ones ("Emission_Color" is
+    emission), two-token words like "Base_Color" count as one, and a word
+    glued to the set name ("WoodFloorAlbedo") is split off, as is a GL /
+    DX suffix glued to the map word ("Fabric_NormalGL"; DX is the second
+    choice). base is "" when the file is named after the map alone.
+    """
+    stem, ext = os.path.splitext(file_name)
+    if ext.lower() not in TEXTURE_EXTENSIONS:
+        return None
+    resolution = None
+    tokens = []
+    variants = set()            # positions of variant tokens split off a map word
+    for token in _SPLIT.split(stem):
+        if not token:
+            continue
+        if _RESOLUTION.match(token.lower()):
+            resolution = token.lower()
+            continue
+        token, suffix = _split_variant(token)
+        tokens.append(token)
+        if suffix:
+            variants.add(len(tokens))
+            tokens.append(suffix)
+    if not tokens:
+        return None
+    lower = [t.lower() for t in tokens]
+
+    for allow_weak in (False, True):
+        for i in range(len(tokens) - 1, -1, -1):
+            if i > 0:
+                slot = _KEYWORD_SLOT.get(lower[i - 1] + lower[i])
+                if slot and (allow_weak or lower[i - 1] + lower[i] not in WEAK_KEYWORDS):
+                    return "_".join(tokens[:i - 1]), slot, resolution, lower[i + 1:]
+            slot = _KEYWORD_SLOT.get(lower[i])
+            if slot and (allow_weak or lower[i] not in WEAK_KEYWORDS):
+                return "_".join(tokens[:i]), slot, resolution, lower[i + 1:]
+
+    i = max(j for j in range(len(tokens)) if j not in variants)
+    last = lower[i]
+    for keyword in _STRONG_SUFFIXES:
+        if last.endswith(keyword) and len(last) > len(keyword):
+            base = tokens[:i] + [tokens[i][:-len(keyword)]]
+            return "_".join(base), _KEYWORD_SLOT[keyword], resolution, lower[i + 1:]
+    return None
+
+
+# ==========================
+# Texture-set plan
+# ==========================
+class TextureSetPlan:
+    """
+    Result of a texture scan: one entry per texture set, meant to be
+    reviewed before anything is written. Each entry is a dict:
+    name, folder, lib_path, resolution, maps {slot: path}, alternates
+    (other resolutions found), extras (duplicate files for a slot), status
+    ("new", "exists": a .mat of that name is already there, "no_albedo").
+    unmatched lists textures that fit no slot.
+    """
+
+    def __init__(self, root):
+        self.root = _norm(root)
+        self.sets = []
+        self.unmatched = []
+        self.folders = 0
+
+    @property
+    def buildable(self):
+        return [entry for entry in self.sets if entry["status"] == "new"]
+
+    def count(self, status):
+        return sum(1 for entry in self.sets if entry["status"] == status)
+
+    def summary(self):
+        return (f"{len(self.sets)} texture set(s) in {self.folders} folder(s): "
+                f"{self.count('new')} to build, {self.count('exists')} already have a .mat, "
+                f"{self.count('no_albedo')} without albedo / base color")
+
+    def describe(self, limit=300):
+        """Plain-text listing for the review dialog."""
+        lines = []
+        for entry in self.sets[:limit]:
+            folder = entry["folder"][len(self.root) + 1:] if entry["folder"].startswith(self.root + "/") else entry["folder"]
+            res = f" [{entry['resolution']}]" if entry["resolution"] else ""
+            lines.append(f"{entry['status'].upper():9} {folder}/{entry['name']}{res}: {', '.join(sorted(entry['maps']))}")
+        if len(self.sets) > limit:
+            lines.append(f"... and {len(self.sets) - limit} more (see {PLAN_FILE_NAME})")
+        return "\n".join(lines)
+
+    def save(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"root": self.root, "summary": self.summary(), "sets": self.sets,
+                       "unmatched": self.unmatched}, f, indent=2)
+
+
+def _add_folder(plan, folder, file_names, overwrite=False):
+    """Classify one directory listing into plan entries."""
+    groups = {}                 # base lower -> {resolution: {slot: [(rank, path)]}}
+    bases = {}
+    existing = {name.lower() for name in file_names}
+    found = False
+    for file_name in sorted(file_names):
+        info = classify_texture(file_name)
+        if info is None:
+            if file_name.lower().endswith(TEXTURE_EXTENSIONS):
+                plan.unmatched.append(f"{folder}/{file_name}")
+            continue
+        found = True
+        base, slot, resolution, variant = info
+        bases.setdefault(base.lower(), base)
+        rank = 1 if _SECOND_CHOICE.intersection(variant) else 0
+        groups.setdefault(base.lower(), {}).setdefault(resolution, {}).setdefault(slot, []).append(
+            (rank, f"{folder}/{file_name}"))
+    if not found:
+        return
+    plan.folders += 1
+
+    folder_name = os.path.basename(folder)
+    # a folder holding one set keeps the folder's name, as the per-folder action always did;
+    # maps named after the slot alone ("Albedo.png") next to named sets take the folder's
+    # name too, suffixed when a named set already has it, so no two sets share a lib_path
+    names, taken = {}, set()
+    for key in sorted(groups, key=lambda k: len(groups) == 1 or not bases[k]):
+        name = folder_name if len(groups) == 1 or not bases[key] else bases[key]
+        unique, n = name, 2
+        while unique.lower() in taken:
+            unique, n = f"{name}_{n}", n + 1
+        taken.add(unique.lower())
+        names[key] = unique
+
+    for key, by_resolution in groups.items():
+        # the resolution with the most maps, the larger one on a tie
+        resolution = max(by_resolution, key=lambda r: (len(by_resolution[r]), _resolution_rank(r)))
+        maps, extras = {}, []
+        for slot, candidates in by_resolution[resolution].items():
+            candidates.sort()
+            maps[slot] = candidates[0][1]
+            extras.extend(path for _rank, path in candidates[1:])
+        # slots missing at that resolution are taken from the largest other one that has them
+        for other in sorted(by_resolution, key=_resolution_rank, reverse=True):
+            for slot, candidates in by_resolution[other].items():
+                if slot not in maps:
+                    maps[slot] = sorted(candidates)[0][1]
+        name = names[key]
+        if "albedo" not in maps:
+            status = "no_albedo"
+        elif not overwrite and f"{name}.mat".lower() in existing:
+            status = "exists"
+        else:
+            status = "new"
+        plan.sets.append({
+            "name": name,
+            "folder": folder,
+            "lib_path": f"{folder}/{name}.mat",
+            "resolution": resolution,
+            "maps": maps,
+            "alternates": sorted((r for r in by_resolution if r != resolution), key=_resolution_rank),
+            "extras": extras,
+            "status": status,
+        })
+
+
+def scan_texture_sets(root, progress=None):
+    """
+    Walk root once and plan an OpenPBR material per texture set.
+    progress(folders visited) is called every 100 directories.
+    """
+    root = _norm(root)
+    plan = TextureSetPlan(root)
+    visited = 0
+    for folder, _dirs, files in os.walk(root):
+        visited += 1
+        if progress and visited % 100 == 0:
+            progress(visited)
+        _add_folder(plan, _norm(folder), files)
+    return plan
+
+
+def plan_folder(folder, overwrite=True):
+    """Plan for a single folder (the folder card's "Make PBR Material")."""
+    folder = _norm(folder)
+    plan = TextureSetPlan(folder)
+    try:
+        with os.scandir(folder) as it:
+            files = [entry.name for entry in it if entry.is_file()]
+    except OSError as e:
+        print(f"[WARNING] Could not read directory {folder}: {e}")
+        return plan
+    _add_folder(plan, folder, files, overwrite=overwrite)
+    return plan
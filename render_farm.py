@@ -0,0 +1,397 @@
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+import subprocess
+
+import constants
+
+
+JOB_FILE_NAME = "jobs.json"
+CANCEL_FILE_NAME = "cancel"
+WORKER_SCRIPT = os.path.join(constants.BASE_DIR, "thumbnail_worker.py").replace("\\", "/")
+STAND_IN_TEMPLATE = os.path.join(constants.BASE_DIR, "etc", "3dfile", "UVChecke.png").replace("\\", "/")
+
+# Environment handed to every worker process (3dsmaxbatch passes it through to its Python).
+ENV_FARM_DIR = "MAB_FARM_DIR"
+ENV_WORKER_ID = "MAB_FARM_WORKER"
+ENV_PLUGIN_DIR = "MAB_PLUGIN_DIR"
+
+DEFAULT_JOB_TIMEOUT = 300.0     # seconds one render may take before its worker counts as hung
+DEFAULT_MAX_ATTEMPTS = 2        # renders of one job before a crash / timeout is final
+
+
+# ==========================
+# Job directory layout
+# ==========================
+# <farm_dir>/jobs.json               [{"id", "mat_path", "mat_name", "engine", "output", "priority"}],
+#                                    sorted by (priority, engine)
+# <farm_dir>/claims/<id>             created O_EXCL by the worker that takes the job
+# <farm_dir>/progress/<worker>.jsonl one JSON event per line: claimed / done / failed
+# <farm_dir>/cancel                  present = workers stop after their current job
+
+def make_job(job_id, mat_path, mat_name, engine, output, priority=0):
+    return {"id": job_id, "mat_path": mat_path, "mat_name": mat_name,
+            "engine": engine or "", "output": output, "priority": priority}
+
+
+def write_job_file(farm_dir, jobs):
+    path = os.path.join(farm_dir, JOB_FILE_NAME)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"version": 1, "jobs": jobs}, f)
+    os.replace(tmp, path)
+    return path
+
+
+# ==========================
+# Worker side (runs in every worker process)
+# ==========================
+class FarmWorker:
+    """
+    Pulls jobs from a farm directory until none are left or the farm is
+    cancelled. Claims are files created with O_EXCL, so N processes can
+    share one job file without a server. Knows nothing about rendering:
+    run() takes a render(job) -> output path or None callable.
+    """
+
+    def __init__(self, farm_dir, worker_id):
+        self.farm_dir = farm_dir
+        self.worker_id = str(worker_id)
+        with open(os.path.join(farm_dir, JOB_FILE_NAME), "r", encoding="utf-8") as f:
+            self.jobs = json.load(f)["jobs"]
+        self.claims_dir = os.path.join(farm_dir, "claims")
+        self.progress_path = os.path.join(farm_dir, "progress", f"{self.worker_id}.jsonl")
+        os.makedirs(self.claims_dir, exist_ok=True)
+        os.makedirs(os.path.dirname(self.progress_path), exist_ok=True)
+        self._cursor = 0
+
+    @classmethod
+    def from_env(cls):
+        return cls(os.environ[ENV_FARM_DIR], os.environ.get(ENV_WORKER_ID, str(os.getpid())))
+
+    @property
+    def cancelled(self):
+        return os.path.exists(os.path.join(self.farm_dir, CANCEL_FILE_NAME))
+
+    def claim_next(self):
+        while self._cursor < len(self.jobs):
+            job = self.jobs[self._cursor]
+            self._cursor += 1
+            try:
+                fd = os.open(os.path.join(self.claims_dir, str(job["id"])), os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                continue
+            os.close(fd)
+            return job
+        return None
+
+    def report(self, event, job, **extra):
+        record = {"event": event, "job": job["id"], "worker": self.worker_id}
+        record.update(extra)
+        with open(self.progress_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+            f.flush()
+
+    def run(self, render):
+        done = 0
+        while not self.cancelled:
+            job = self.claim_next()
+            if job is None:
+                break
+            self.report("claimed", job)
+            try:
+                output = render(job)
+            except Exception as e:
+                self.report("failed", job, error=str(e))
+                continue
+            if output:
+                self.report("done", job, output=output)
+                done += 1
+            else:
+                self.report("failed", job, error="no output")
+        return done
+
+
+# ==========================
+# Worker commands (pluggable)
+# ==========================
+def max_batch_command(max_batch_exe, worker_script=WORKER_SCRIPT):
+    """Headless 3ds Max worker: 3dsmaxbatch.exe thumbnail_worker.py"""
+    def command(worker_id):
+        return [max_batch_exe, worker_script]
+    return command
+
+
+def stand_in_command(template=STAND_IN_TEMPLATE, delay=0.0, python=None):
+    """Local stand-in renderer (no 3ds Max): copies a template image to each output."""
+    def command(worker_id):
+        return [python or sys.executable, os.path.abspath(__file__), "--stand-in",
+                "--template", template, "--delay", str(delay)]
+    return command
+
+
+def find_max_batch(rt):
+    """3dsmaxbatch.exe next to the running 3dsmax.exe, or None."""
+    try:
+        path = os.path.join(str(rt.getDir(rt.name("maxroot"))), "3dsmaxbatch.exe")
+    except Exception as e:
+        print(f"[WARNING] Could not resolve 3ds Max root: {e}")
+        return None
+    return path if os.path.isfile(path) else None
+
+
+# ==========================
+# Coordinator (browser side)
+# ==========================
+class RenderFarm:
+    """
+    Writes the thumbnail jobs to a farm directory, starts N worker
+    processes and turns their progress files into events. No Qt: the
+    browser calls poll() from a QTimer, headless callers from a loop.
+
+    Events are the worker records ({"event": "done"/"failed"/"claimed",
+    "job": id, ...}) plus the job dict under "item". Jobs still unfinished
+    when every worker has exited are reported as failed once.
+
+    A worker that exits while it holds a claimed job crashed; one that
+    holds a job longer than job_timeout hung and is killed. Either way the
+    claim is released and a replacement worker started, until the job has
+    been tried max_attempts times; then it is reported as failed.
+    """
+
+    def __init__(self, jobs, worker_command, workers=2, farm_dir=None,
+                 job_timeout=DEFAULT_JOB_TIMEOUT, max_attempts=DEFAULT_MAX_ATTEMPTS):
+        self.jobs = {job["id"]: job for job in jobs}
+        self.worker_command = worker_command
+        self.worker_count = max(1, min(int(workers), len(jobs) or 1))
+        self.farm_dir = farm_dir or tempfile.mkdtemp(prefix="mab_farm_")
+        self.processes = []
+        self.done = 0
+        self.failed = 0
+        self._finished_jobs = set()
+        self._offsets = {}
+        self._closed = False
+        self._cancelled = False
+        self._kill_at = None            # time after cancel() when workers still running are killed
+        self._withdrawn = []
+        self.job_timeout = job_timeout
+        self.max_attempts = max(1, int(max_attempts))
+        self._in_flight = {}            # worker id -> (job id, time the claim was seen)
+        self._attempts = {}             # job id -> claims so far
+
+    @property
+    def total(self):
+        return len(self.jobs)
+
+    def start(self):
+        ordered = sorted(self.jobs.values(), key=lambda job: (job.get("priority", 0), job["engine"], job["id"]))
+        write_job_file(self.farm_dir, ordered)
+        os.makedirs(os.path.join(self.farm_dir, "progress"), exist_ok=True)
+        for _ in range(self.worker_count):
+            self._start_worker()
+        return self
+
+    def _start_worker(self):
+        """Launch one more worker; its id is its index in self.processes."""
+        worker_id = len(self.processes)
+        flags = subprocess.CREATE_NO_WINDOW if os.name == "nt" else 0
+        env = dict(os.environ)
+        env[ENV_FARM_DIR] = self.farm_dir
+        env[ENV_WORKER_ID] = str(worker_id)
+        env[ENV_PLUGIN_DIR] = constants.BASE_DIR
+        argv = self.worker_command(worker_id)
+        print(f"[FARM] Starting worker {worker_id}: {argv}")
+        self.processes.append(subprocess.Popen(argv, env=env, creationflags=flags,
+                                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL))
+
+    @property
+    def running(self):
+        return any(p.poll() is None for p in self.processes)
+
+    @property
+    def finished(self):
+        return self._closed
+
+    def poll(self):
+        """New events since the last call."""
+        if self._closed:
+            return []
+        if self._kill_at is not None and time.time() >= self._kill_at:
+            self._kill_at = None
+            for worker_id, p in enumerate(self.processes):
+                if p.poll() is None:
+                    self._kill(worker_id)
+        # read before the progress files, so no line of an exited worker is missed
+        exited = {str(i) for i, p in enumerate(self.processes) if p.poll() is not None}
+        events = []
+        progress_dir = os.path.join(self.farm_dir, "progress")
+        try:
+            names = sorted(os.listdir(progress_dir))
+        except OSError:
+            names = []
+        for name in names:
+            path = os.path.join(progress_dir, name)
+            offset = self._offsets.get(name, 0)
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    f.seek(offset)
+                    chunk = f.read()
+            except OSError:
+                continue
+            complete = chunk[:chunk.rfind("\n") + 1]     # leave a half-written line for next time
+            self._offsets[name] = offset + len(complete.encode("utf-8"))
+            for line in complete.splitlines():
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                events.append(self._track(record))
+        events.extend(self._recover(exited))
+
+        for job_id in self._withdrawn:
+            events.append(self._track({"event": "failed", "job": job_id, "error": "cancelled"}))
+        self._withdrawn = []
+
+        if len(exited) == len(self.processes):
+            for job_id in self.jobs:
+                if job_id not in self._finished_jobs:
+                    error = "cancelled" if self._cancelled else "worker exited"
+                    events.append(self._track({"event": "failed", "job": job_id, "error": error}))
+            self._closed = True
+        return events
+
+    def _track(self, record):
+        record["item"] = self.jobs.get(record.get("job"), {})
+        worker_id = record.get("worker")
+        if record["event"] == "claimed":
+            self._in_flight[worker_id] = (record["job"], time.time())
+            self._attempts[record["job"]] = self._attempts.get(record["job"], 0) + 1
+        elif self._in_flight.get(worker_id, (None,))[0] == record.get("job"):
+            del self._in_flight[worker_id]
+        if record["event"] in ("done", "failed") and record.get("job") not in self._finished_jobs:
+            self._finished_jobs.add(record.get("job"))
+            if record["event"] == "done":
+                self.done += 1
+            else:
+                self.failed += 1
+        return record
+
+    def _recover(self, exited):
+        """Release the jobs of crashed (exited) or hung (timed out) workers; returns failure events."""
+        events = []
+        now = time.time()
+        for worker_id, (job_id, since) in list(self._in_flight.items()):
+            if worker_id in exited:
+                reason = "worker crashed"
+            elif self.job_timeout and now - since > self.job_timeout:
+                reason = "timed out"
+                self._kill(worker_id)
+            else:
+                continue
+            if self._cancelled:
+                reason = "cancelled"
+            del self._in_flight[worker_id]
+            released = False
+            if not self._cancelled and self._attempts.get(job_id, 0) < self.max_attempts:
+                try:
+                    os.remove(os.path.join(self.farm_dir, "claims", str(job_id)))
+                    released = True
+                    print(f"[FARM] Job {job_id} {reason} on worker {worker_id}, retrying")
+                except OSError as e:
+                    print(f"[WARNING] Could not release farm job {job_id}: {e}")
+            if not released:
+                events.append(self._track({"event": "failed", "job": job_id, "error": reason}))
+            # the lost worker's unclaimed jobs need someone too
+            if not self._cancelled and (released or self._has_unclaimed()):
+                self._start_worker()
+        return events
+
+    def _kill(self, worker_id):
+        """No wait: the exit is picked up by a later poll()."""
+        try:
+            self.processes[int(worker_id)].kill()
+        except Exception as e:
+            print(f"[WARNING] Could not stop farm worker {worker_id}: {e}")
+
+    def _has_unclaimed(self):
+        claims_dir = os.path.join(self.farm_dir, "claims")
+        return any(not os.path.exists(os.path.join(claims_dir, str(job_id))) for job_id in self.jobs)
+
+    def cancel_jobs(self, job_ids):
+        """
+        Withdraw jobs no worker has claimed yet by claiming them here.
+        Returns the ids actually withdrawn; they are reported as failed ("cancelled").
+        """
+        claims_dir = os.path.join(self.farm_dir, "claims")
+        os.makedirs(claims_dir, exist_ok=True)
+        withdrawn = []
+        for job_id in job_ids:
+            try:
+                fd = os.open(os.path.join(claims_dir, str(job_id)), os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                continue
+            except OSError as e:
+                print(f"[WARNING] Could not withdraw farm job {job_id}: {e}")
+                continue
+            os.close(fd)
+            withdrawn.append(job_id)
+        self._withdrawn.extend(withdrawn)
+        return withdrawn
+
+    def cancel(self, grace=5.0):
+        """
+        Ask workers to stop after their current job. Returns at once (the
+        browser calls it on the GUI thread); poll() kills the workers still
+        running grace seconds later and reports the rest as cancelled.
+        """
+        self._cancelled = True
+        if self._kill_at is None:
+            self._kill_at = time.time() + grace
+        try:
+            open(os.path.join(self.farm_dir, CANCEL_FILE_NAME), "w").close()
+        except OSError as e:
+            print(f"[WARNING] Could not write farm cancel flag: {e}")
+
+    def wait(self, timeout=None, interval=0.2):
+        """Block until every worker exited; returns all events (headless use)."""
+        events = []
+        deadline = None if timeout is None else time.time() + timeout
+        while not self._closed:
+            events.extend(self.poll())
+            if deadline is not None and time.time() > deadline:
+                break
+            time.sleep(interval)
+        return events
+
+    def cleanup(self):
+        shutil.rmtree(self.farm_dir, ignore_errors=True)
+
+
+# ==========================
+# Stand-in worker entry point
+# ==========================
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Thumbnail farm stand-in worker (no 3ds Max).")
+    parser.add_argument("--stand-in", action="store_true", help="Run as a stand-in worker")
+    parser.add_argument("--template", default=STAND_IN_TEMPLATE, help="Image copied to every output")
+    parser.add_argument("--delay", type=float, default=0.0, help="Seconds per job (simulated render time)")
+    args = parser.parse_args(argv)
+
+    def render(job):
+        if args.delay:
+            time.sleep(args.delay)
+        shutil.copyfile(args.template, job["output"])
+        return job["output"]
+
+    worker = FarmWorker.from_env()
+    worker.run(render)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,145 @@
+import threading
+
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, QTimer, Signal
+
+
+SEARCH_DELAY_MS = 180      # typing pause before a query runs
+SEARCH_PAGE_SIZE = 120     # rows per chunk streamed into the model
+
+
+# ==========================
+# Search job (worker thread)
+# ==========================
+class _SearchSignals(QObject):
+    chunk = Signal(int, list, bool)      # generation, rows, first chunk
+    done = Signal(int, int)              # generation, total rows
+
+
+class _SearchJob(QRunnable):
+    """
+    Run one query against the SearchIndex and turn hits into model rows,
+    page by page. Checks the pipeline generation between pages, so a query
+    superseded by a newer keystroke stops at the next page boundary.
+    """
+
+    def __init__(self, pipeline, generation, query, accept, to_row, ranked):
+        super().__init__()
+        self.pipeline = pipeline
+        self.generation = generation
+        self.query = query
+        self.accept = accept
+        self.to_row = to_row
+        self.ranked = ranked
+
+    def run(self):
+        total = 0
+        first = True
+        try:
+            pages = self.pipeline.index.search_pages(self.query, self.pipeline.page_size, self.accept, self.ranked)
+            for page in pages:
+                if self.pipeline.is_stale(self.generation):
+                    return
+                rows = [self.to_row(doc) for doc in page]
+                total += len(rows)
+                self.pipeline.signals.chunk.emit(self.generation, rows, first)
+                first = False
+        except Exception as e:
+            print(f"[ERROR] Search failed for '{self.query}': {e}")
+        if not self.pipeline.is_stale(self.generation):
+            if first:
+                self.pipeline.signals.chunk.emit(self.generation, [], True)
+            self.pipeline.signals.done.emit(self.generation, total)
+
+
+# ==========================
+# Search Pipeline
+# ==========================
+class SearchPipeline(QObject):
+    """
+    Debounced, cancellable search for the search bar.
+
+    request() restarts a short timer on every keystroke; only the query
+    standing when typing pauses runs, on a private one-thread pool. Every
+    request bumps a generation number: jobs for older generations stop
+    early and their chunks are dropped here, never reaching the model.
+
+    rowsStarted(rows) carries the first ranked page (replace the model),
+    rowsAppended(rows) the following pages, finished(total) the end.
+    """
+
+    rowsStarted = Signal(list)
+    rowsAppended = Signal(list)
+    finished = Signal(int)
+
+    def __init__(self, index, delay_ms=SEARCH_DELAY_MS, page_size=SEARCH_PAGE_SIZE, parent=None):
+        super().__init__(parent)
+        self.index = index
+        self.page_size = page_size
+        self._generation = 0
+        self._gen_lock = threading.Lock()
+        self._pending = None
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(delay_ms)
+        self._timer.timeout.connect(self._start)
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(1)
+        self.signals = _SearchSignals()
+        self.signals.chunk.connect(self._on_chunk)
+        self.signals.done.connect(self._on_done)
+
+    def set_index(self, index):
+        self.cancel()
+        self.index = index
+
+    def is_stale(self, generation):
+        with self._gen_lock:
+            return generation != self._generation
+
+    def _bump(self):
+        with self._gen_lock:
+            self._generation += 1
+            return self._generation
+
+    def request(self, query, accept=None, to_row=None, ranked=False, immediate=False):
+        """
+        Queue query; accept(doc) filters hits, to_row(doc) builds the model
+        row (on the worker). ranked: relevance order with typo tolerance
+        instead of name order.
+        """
+        generation = self._bump()
+        self._pending = (generation, query, accept, to_row or (lambda doc: doc), ranked)
+        if immediate:
+            self._timer.stop()
+            self._start()
+        else:
+            self._timer.start()
+
+    def cancel(self):
+        """Forget the queued query and drop whatever a running one still produces."""
+        self._bump()
+        self._timer.stop()
+        self._pending = None
+        self._pool.clear()
+
+    def _start(self):
+        if self._pending is None:
+            return
+        generation, query, accept, to_row, ranked = self._pending
+        self._pending = None
+        if self.is_stale(generation):
+            return
+        self._pool.clear()      # an older job that has not started yet
+        self._pool.start(_SearchJob(self, generation, query, accept, to_row, ranked))
+
+    def _on_chunk(self, generation, rows, first):
+        if self.is_stale(generation):
+            return
+        if first:
+            self.rowsStarted.emit(rows)
+        elif rows:
+            self.rowsAppended.emit(rows)
+
+    def _on_done(self, generation, total):
+        if not self.is_stale(generation):
+            self.finished.emit(total)
@@ -38,7 +38,7 @@ QWidget {{
     font-size: 12px;
 }}
 
-QListWidget {{
+QListWidget, QListView {{
     background-color: {C_BG_PANEL};
     border: 1px solid {C_BORDER};
     border-radius: 4px;
@@ -0,0 +1,141 @@
+import os
+
+import pytest
+
+from bulk_ops import (BulkResult, _run_script, library_counts, move_materials, delete_materials,
+                      expand_pattern, plan_renames)
+
+
+class _Runtime:
+    """Stands in for pymxs.runtime: records the generated MaxScript, returns a canned report."""
+
+    def __init__(self, report=""):
+        self.report = report
+        self.scripts = []
+
+    def execute(self, script):
+        self.scripts.append(script)
+        if isinstance(self.report, Exception):
+            raise self.report
+        return self.report
+
+
+class _Libraries:
+    def __init__(self, counts):
+        self.counts = counts
+
+    def library(self, path):
+        count = self.counts.get(path)
+        return None if count is None else {f"m{i}": object() for i in range(count)}
+
+
+@pytest.fixture
+def lib(tmp_path):
+    src, dst = tmp_path / "src", tmp_path / "dst"
+    src.mkdir()
+    dst.mkdir()
+    return str(src).replace("\\", "/"), str(dst).replace("\\", "/")
+
+
+def _touch(path, data=b"x"):
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+def test_run_script_applies_report_lines():
+    result = BulkResult("Test")
+    a, b, c = result.add("L/one.mat", "A"), result.add("L/one.mat", "B"), result.add("L/two.mat", "C")
+    report = "L/one.mat\tB\tNOT_FOUND\nL/two.mat\t*\tSAVE_ERROR\nL/three.mat\t*\tEMPTY\ngarbage"
+    empty = _run_script(_Runtime(report), "", result, {"L/one.mat": [a, b], "L/two.mat": [c]})
+    assert empty == {"L/three.mat"}
+    assert (a["error"], b["error"], c["error"]) == (None, "not found", "save error")
+    assert result.summary() == "Test: 1 of 3 done, 2 failed"
+
+
+def test_run_script_failure_fails_every_item():
+    result = BulkResult("Test")
+    item = result.add("L/one.mat", "A")
+    _run_script(_Runtime(RuntimeError("boom")), "", result, {"L/one.mat": [item]})
+    assert item["error"] == "MaxScript failed: boom"
+
+
+def test_library_counts_use_headers_then_loaded_libraries(lib):
+    src, _dst = lib
+    _touch(f"{src}/Multi.mat", b"not an OLE file")      # header unreadable -> count unknown
+    counts = library_counts([f"{src}/Multi.mat", f"{src}/gone.mat"], libraries=_Libraries({f"{src}/Multi.mat": 3}))
+    assert counts == {f"{src}/Multi.mat": 3, f"{src}/gone.mat": None}
+    assert library_counts([f"{src}/Multi.mat"]) == {f"{src}/Multi.mat": None}
+
+
+def test_move_one_material_file_moves_file_and_thumbnail(lib):
+    src, dst = lib
+    _touch(f"{src}/Oak.mat")
+    _touch(f"{src}/Oak.jpg")
+    rt = _Runtime()
+    result = move_materials(rt, [(f"{src}/Oak.mat", "Oak")], dst, {f"{src}/Oak.mat": 1})
+    assert rt.scripts == []
+    assert [i["error"] for i in result.items] == [None]
+    assert os.path.exists(f"{dst}/Oak.mat") and not os.path.exists(f"{src}/Oak.mat")
+    assert result.items[0]["thumb"] == f"{dst}/Oak.jpg"
+
+
+def test_move_with_unknown_count_goes_through_maxscript(lib):
+    src, dst = lib
+    _touch(f"{src}/Oak.mat")
+    rt = _Runtime("")
+    result = move_materials(rt, [(f"{src}/Oak.mat", "Oak")], dst, {f"{src}/Oak.mat": None})
+    assert len(rt.scripts) == 1 and result.done
+    assert os.path.exists(f"{src}/Oak.mat")          # the script, not the file pass, edits libraries
+
+
+def test_move_script_saves_destinations_before_touching_sources(lib):
+    src, dst = lib
+    rt = _Runtime()
+    move_materials(rt, [(f"{src}/Woods.mat", "Oak")], dst, {f"{src}/Woods.mat": 4})
+    script = rt.scripts[0]
+    assert script.index("saveTempMaterialLibrary dstLibs[d]") < script.index("deleteItem srcLibs[s]")
+    assert "where dstSaved[m[2]]" in script
+
+
+def test_failed_destination_save_reports_the_item(lib):
+    src, dst = lib
+    _touch(f"{src}/Woods.mat")
+    _touch(f"{src}/Oak.jpg")
+    rt = _Runtime(f"{dst}/Oak.mat\t*\tSAVE_ERROR\n")
+    result = move_materials(rt, [(f"{src}/Woods.mat", "Oak"), (f"{src}/Woods.mat", "Pine")], dst,
+                            {f"{src}/Woods.mat": 4})
+    errors = {i["name"]: i["error"] for i in result.items}
+    assert errors == {"Oak": "save error", "Pine": None}
+    assert os.path.exists(f"{src}/Oak.jpg")          # thumbnail stays with the material
+
+
+def test_move_into_same_folder_is_refused(lib):
+    src, _dst = lib
+    result = move_materials(_Runtime(), [(f"{src}/Oak.mat", "Oak")], src, {f"{src}/Oak.mat": 1})
+    assert result.items[0]["error"] == "already in this folder"
+
+
+def test_delete_removes_owned_files_and_emptied_libraries(lib):
+    src, _dst = lib
+    for name in ("Oak.mat", "Oak.jpg", "Woods.mat", "Pine.jpg"):
+        _touch(f"{src}/{name}")
+    rt = _Runtime(f"{src}/Woods.mat\t*\tEMPTY\n")
+    result = delete_materials(rt, [(f"{src}/Oak.mat", "Oak"), (f"{src}/Woods.mat", "Pine")],
+                              {f"{src}/Oak.mat": 1, f"{src}/Woods.mat": 2})
+    assert not result.failed
+    assert sorted(result.removed_files) == sorted([f"{src}/Oak.mat", f"{src}/Woods.mat"])
+    assert os.listdir(src) == []
+
+
+def test_rename_patterns():
+    assert expand_pattern("Wood_###", "Oak", 7) == "Wood_007"
+    assert expand_pattern("{folder}_{name}_{n:02}", "Oak", 3, "R/floors") == "floors_Oak_03"
+    assert expand_pattern("Wood", "Oak", 2) == "Wood_02"
+    assert plan_renames([("R/a.mat", "A"), ("R/b.mat", "B")], "Same") == [
+        ("R/a.mat", "A", "Same_01"), ("R/b.mat", "B", "Same_02")]
+    with pytest.raises(ValueError, match="twice"):
+        plan_renames([("R/a.mat", "Oak"), ("R/b.mat", "oak")], "{name}")
+    with pytest.raises(ValueError, match="not a valid"):
+        plan_renames([("R/a.mat", "Oak")], "bad/{name}")
+    with pytest.raises(ValueError, match="Invalid pattern"):
+        plan_renames([("R/a.mat", "Oak")], "{n:z}")
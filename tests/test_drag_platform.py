@@ -0,0 +1,211 @@
+from drag_platform import DragSession, FakeWindowPlatform, ViewportHitTester, DRAG_DROP, DRAG_MOVE
+
+
+MAIN = 1
+VIEWPORT = 2
+VIEWPORT_CHILD = 3
+OTHER_VIEWPORT = 4
+FOREIGN = 10
+
+
+def _platform(main=MAIN):
+    return FakeWindowPlatform({
+        MAIN:           (0, "Qt5QWindowIcon", (0, 0, 1000, 1000)),
+        VIEWPORT:       (MAIN, "ViewExWnd", (100, 100, 500, 500)),
+        VIEWPORT_CHILD: (VIEWPORT, "Static", (200, 200, 300, 300)),
+        OTHER_VIEWPORT: (MAIN, "ViewExWnd", (500, 100, 900, 500)),
+        FOREIGN:        (0, "Chrome_WidgetWin_1", (2000, 0, 2500, 500)),
+    }, main=main)
+
+
+class _Node:
+    """pymxs node wrapper: a new object per call, the handle is what stays."""
+
+    def __init__(self, name, handle=1):
+        self.name = name
+        self.handle = handle
+        self.material = None
+
+
+class _Resolver:
+    """DropTargetResolver stand-in: every viewport pixel hits one box."""
+
+    def __init__(self, node=None, status=""):
+        self.node = node if node is not None else _Node("Box001")
+        self.status = status
+        self.picks = []
+        self.last = None
+        self.highlighted = []
+
+    def pick(self, vp_x, vp_y):
+        self.picks.append((vp_x, vp_y))
+        if self.status:
+            return None, self.status
+        self.last = _Node(self.node.name, self.node.handle)
+        return self.last, ""
+
+    def node_key(self, node):
+        return None if node is None else node.handle
+
+    def highlight(self, node):
+        self.highlighted.append(node)
+
+
+def _session(platform, resolver=None, **kwargs):
+    session = DragSession(platform, **kwargs)
+    platform.pressed = True
+    session.begin(resolver or _Resolver())
+    return session
+
+
+def _move(platform, session, x, y, ticks=1):
+    platform.cursor = (x, y)
+    results = [session.tick() for _ in range(ticks)]
+    return results[-1]
+
+
+def test_main_window_looked_up_once_per_drag():
+    platform = _platform()
+    session = _session(platform)
+    for x in range(110, 490, 10):
+        _move(platform, session, x, 150)
+    _move(platform, session, 2100, 100)
+    session.end()
+    assert platform.calls["main_window"] == 1
+
+    session.begin()
+    _move(platform, session, 150, 150)
+    assert platform.calls["main_window"] == 2
+
+
+def test_parent_walk_only_when_window_under_cursor_changes():
+    platform = _platform()
+    session = _session(platform)
+    _move(platform, session, 150, 150, ticks=10)
+    parents = platform.calls.get("parent", 0)
+    assert parents == 1     # viewport -> main
+
+    # same window, different pixels: no new walk
+    _move(platform, session, 160, 170, ticks=10)
+    assert platform.calls.get("parent", 0) == parents
+
+    # a child of the viewport: one hop up to an already-known window
+    _move(platform, session, 250, 250)
+    assert platform.calls["parent"] == parents + 1
+
+    # back to the viewport: memoised
+    _move(platform, session, 150, 150)
+    assert platform.calls["parent"] == parents + 1
+    assert "class_name" not in platform.calls
+
+
+def test_class_name_fallback_without_main_window():
+    platform = _platform(main=None)
+    session = _session(platform)
+    assert _move(platform, session, 150, 150, ticks=5) == (DRAG_MOVE, True)
+    assert platform.calls["class_name"] == 1
+    assert _move(platform, session, 2100, 100, ticks=5) == (DRAG_MOVE, False)
+    assert platform.calls["class_name"] == 2
+    # both windows are memoised for the rest of the drag
+    _move(platform, session, 150, 150)
+    _move(platform, session, 2100, 100)
+    assert platform.calls["class_name"] == 2
+    assert "parent" not in platform.calls
+
+
+def test_hit_tester_forgets_windows_after_the_drag():
+    platform = _platform()
+    hits = ViewportHitTester(platform)
+    hits.begin()
+    assert hits.sample(150, 150) == (VIEWPORT, True)
+    assert hits.sample(2100, 100) == (FOREIGN, False)
+    hits.end()
+    hits.begin()
+    hits.sample(150, 150)
+    assert platform.calls["parent"] == 3   # viewport, foreign, viewport again
+
+
+def test_hover_pick_is_throttled_and_once_per_position():
+    platform = _platform()
+    resolver = _Resolver()
+    session = _session(platform, resolver, hover_ticks=3)
+
+    _move(platform, session, 150, 150, ticks=9)
+    assert resolver.picks == [(50, 50)]         # cached per position
+
+    for i in range(6):
+        _move(platform, session, 151 + i, 150)
+    # a new pick at most every third tick
+    assert resolver.picks == [(50, 50), (51, 50), (54, 50)]
+
+
+def test_hover_highlights_and_reports_changes():
+    platform = _platform()
+    resolver = _Resolver()
+    hovered = []
+    session = _session(platform, resolver, on_hover=hovered.append)
+
+    _move(platform, session, 150, 150)
+    assert session.hover == (resolver.last, "")
+    assert hovered == [resolver.last]
+    _move(platform, session, 2100, 100)         # off Max: hover cleared
+    assert session.hover == (None, "NO_HIT")
+    assert hovered[1:] == [None]
+    assert resolver.highlighted[1:] == [None]
+
+
+def test_hover_compares_node_keys_not_wrappers():
+    platform = _platform()
+    resolver = _Resolver()
+    hovered = []
+    session = _session(platform, resolver, on_hover=hovered.append, hover_ticks=1)
+
+    for i in range(4):                          # same box, a new wrapper per pick
+        _move(platform, session, 150 + i, 150)
+    assert len(resolver.picks) == 4
+    assert [n.handle for n in hovered] == [1]
+    assert [n.handle for n in resolver.highlighted] == [1]
+
+    resolver.node = _Node("Box002", handle=2)
+    _move(platform, session, 160, 150)
+    _move(platform, session, 161, 150)
+    assert [n.handle for n in hovered] == [1, 2]
+    assert [n.handle for n in resolver.highlighted] == [1, 2]
+
+
+def test_drop_outside_max_is_cancelled():
+    platform = _platform()
+    resolver = _Resolver()
+    session = _session(platform, resolver)
+    _move(platform, session, 150, 150)
+    platform.pressed = False
+    assert _move(platform, session, 2100, 100) == (DRAG_DROP, (None, "NOT_OVER_MAX"))
+
+
+def test_drop_over_max_reuses_the_hover_pick():
+    platform = _platform()
+    resolver = _Resolver()
+    session = _session(platform, resolver)
+    _move(platform, session, 150, 150)
+    platform.pressed = False
+    assert _move(platform, session, 150, 150) == (DRAG_DROP, (resolver.last, ""))
+    assert len(resolver.picks) == 1
+
+    session.end()
+    assert resolver.highlighted[-1] is None
+    assert not session.active and session.material is None
+
+
+def test_drop_reports_pick_status_and_survives_pick_errors():
+    platform = _platform()
+    session = _session(platform, _Resolver(status="NO_RAY"))
+    platform.pressed = False
+    assert _move(platform, session, 150, 150) == (DRAG_DROP, (None, "NO_RAY"))
+
+    class _Broken(_Resolver):
+        def pick(self, vp_x, vp_y):
+            raise RuntimeError("no viewport")
+
+    session = _session(platform, _Broken())
+    platform.pressed = False
+    assert _move(platform, session, 150, 150) == (DRAG_DROP, (None, "NO_HIT"))
@@ -0,0 +1,135 @@
+import random
+
+from drop_targets import BoundsBVH, DropTargetResolver, parse_bounds
+
+
+def _brute(items, origin, direction):
+    hits = []
+    for key, box in items:
+        tmin, tmax = 0.0, float("inf")
+        for axis in range(3):
+            o, d = origin[axis], direction[axis]
+            lo, hi = box[axis], box[axis + 3]
+            if d == 0.0:
+                if not lo <= o <= hi:
+                    break
+                continue
+            t1, t2 = sorted(((lo - o) / d, (hi - o) / d))
+            tmin, tmax = max(tmin, t1), min(tmax, t2)
+        else:
+            if tmin <= tmax:
+                hits.append(key)
+    return sorted(hits)
+
+
+def _random_boxes(rng, count):
+    items = []
+    for key in range(count):
+        x, y, z = (rng.uniform(-100, 100) for _ in range(3))
+        w, h, d = (rng.uniform(0.5, 8) for _ in range(3))
+        items.append((key, (x, y, z, x + w, y + h, z + d)))
+    return items
+
+
+def _random_ray(rng):
+    direction = [rng.uniform(-1, 1) for _ in range(3)]
+    length = sum(c * c for c in direction) ** 0.5
+    return (rng.uniform(-150, 150), rng.uniform(-150, 150), 200.0), tuple(c / length for c in direction)
+
+
+def test_raycast_matches_brute_force():
+    rng = random.Random(7)
+    items = _random_boxes(rng, 500)
+    bvh = BoundsBVH(items)
+    for _ in range(200):
+        origin, direction = _random_ray(rng)
+        hits = bvh.raycast(origin, direction)
+        assert sorted(key for _t, key in hits) == _brute(items, origin, direction)
+        assert [t for t, _key in hits] == sorted(t for t, _key in hits)
+
+
+def test_nearest_box_comes_first():
+    bvh = BoundsBVH([("far", (-1, -1, -10, 1, 1, -8)), ("near", (-1, -1, -3, 1, 1, -2)),
+                     ("beside", (5, 5, -5, 6, 6, -4))])
+    hits = bvh.raycast((0, 0, 0), (0, 0, -1))
+    assert [key for _t, key in hits] == ["near", "far"]
+    assert hits[0][0] == 2
+
+
+def test_update_and_remove_refit_lazily():
+    rng = random.Random(3)
+    items = _random_boxes(rng, 200)
+    bvh = BoundsBVH(items)
+    moved = dict(items)
+    for key in range(0, 200, 7):
+        box = moved[key]
+        moved[key] = (box[0] + 40, box[1], box[2], box[3] + 40, box[4], box[5])
+        assert bvh.update(key, moved[key])
+    for key in range(1, 200, 11):
+        bvh.remove(key)
+        del moved[key]
+    assert not bvh.update("unknown", (0, 0, 0, 1, 1, 1))
+    assert len(bvh) == len(moved)
+    for _ in range(100):
+        origin, direction = _random_ray(rng)
+        assert sorted(key for _t, key in bvh.raycast(origin, direction)) == _brute(moved.items(), origin, direction)
+
+
+def test_empty_and_degenerate_trees():
+    assert BoundsBVH().raycast((0, 0, 0), (0, 0, 1)) == []
+    stacked = BoundsBVH([(i, (0, 0, 0, 1, 1, 1)) for i in range(20)])
+    assert len(stacked.raycast((0.5, 0.5, -5), (0, 0, 1))) == 20
+
+
+def test_parse_bounds_pads_boxes_and_skips_junk():
+    items = parse_bounds("12 0 0 0 10 10 10\nnot a line\n13 a b c d e f\n")
+    assert [key for key, _box in items] == [12]
+    box = items[0][1]
+    assert box[0] < 0 and box[3] > 10
+
+
+class _Runtime:
+    """Stands in for pymxs.runtime with the globals _SCENE_SCRIPT defines."""
+
+    def __init__(self, boxes):
+        self.boxes = dict(boxes)
+        self.pending = (True, [])
+        self.bounds_calls = []
+
+    def execute(self, script):
+        return True
+
+    def mabDropTargetsTake(self):
+        pending, self.pending = self.pending, (False, [])
+        return pending
+
+    def mabDropTargetsBounds(self, handles):
+        self.bounds_calls.append(handles)
+        keys = self.boxes if handles is None else [h for h in handles if h in self.boxes]
+        return "\n".join(f"{k} {' '.join(str(v) for v in self.boxes[k])}" for k in keys)
+
+
+def test_resolver_rebuilds_then_refits_changed_nodes():
+    rt = _Runtime({k: (k * 3, 0, 0, k * 3 + 1, 1, 1) for k in range(20)})
+    resolver = DropTargetResolver(rt)
+    resolver.sync()
+    assert len(resolver.bvh) == 20 and rt.bounds_calls == [None]
+
+    rt.boxes[1] = (0, 5, 0, 1, 6, 1)
+    del rt.boxes[2]
+    rt.pending = (False, [1, 2])
+    resolver.sync()
+    assert rt.bounds_calls[-1] == [1, 2]
+    assert 2 not in resolver.bvh and len(resolver.bvh) == 19
+    hits = resolver.bvh.raycast((0.5, 5.5, -5), (0, 0, 1))
+    assert [key for _t, key in hits] == [1]
+
+    # more than REBUILD_FRACTION of the scene changed: rebuild from scratch
+    rt.pending = (False, list(range(3, 10)))
+    resolver.sync()
+    assert rt.bounds_calls[-1] is None
+
+    # nothing changed: no MaxScript round trip for bounds
+    calls = len(rt.bounds_calls)
+    resolver.sync()
+    assert len(rt.bounds_calls) == calls
@@ -0,0 +1,74 @@
+import pytest
+
+from engine_lookup import EngineLookup
+
+ALLOWED = {
+    "octane": ["Diffuse_material", "0x3c35fce_0x20870143", "physicalmaterial", "standard"],
+    "arnold": ["ai_standard_surface", "ai_flat", "physicalmaterial"],
+    "vray": ["VRayMtl", "VRayBlendMtl", "physicalmaterial"],
+    "corona": ["CoronaPhysicalMtl"],
+}
+SCENES = ("octane", "vray", "corona")
+
+
+@pytest.fixture
+def lookup():
+    return EngineLookup(ALLOWED, SCENES, generic_classes=("physicalmaterial", "standard"))
+
+
+def _mask(lookup, *engines):
+    return sum(lookup.bits[engine] for engine in engines)
+
+
+def test_bits_follow_engine_order(lookup):
+    assert lookup.bits == {"octane": 1, "arnold": 2, "vray": 4, "corona": 8}
+    assert lookup.all_mask == 15
+
+
+@pytest.mark.parametrize("mat_class, engines, thumb", [
+    ("VRayMtl", ("vray",), "vray"),
+    ("Diffuse material", ("octane",), "octane"),           # display name vs MaxScript name
+    ("Diffuse_material", ("octane",), "octane"),
+    ("CoronaPhysicalMtl", ("corona",), "corona"),
+    ("PhysicalMaterial", ("octane", "arnold", "vray"), ""),  # generic: rendered without an engine scene
+    ("Standard", ("octane",), ""),
+])
+def test_known_classes(lookup, mat_class, engines, thumb):
+    assert lookup.classify(mat_class) == (_mask(lookup, *engines), thumb)
+
+
+def test_class_id_alone_is_enough(lookup):
+    assert lookup.classify("", class_id=(0x3c35fce, 0x20870143)) == (_mask(lookup, "octane"), "octane")
+
+
+@pytest.mark.parametrize("mat_class", ["SomePluginMtl", "", None])
+def test_unknown_classes_get_every_engine(lookup, mat_class):
+    assert lookup.classify(mat_class) == (lookup.all_mask, "")
+    assert all(lookup.allows_class(mat_class, engine) for engine in ALLOWED)
+
+
+@pytest.mark.parametrize("mat_class", ["ai_standard_surface", "ai_standard_surface_v2", "Custom_ai_flat_shader"])
+def test_arnold_matches_listed_names_inside_longer_classes(lookup, mat_class):
+    mask, thumb = lookup.classify(mat_class)
+    assert mask == _mask(lookup, "arnold") and thumb == ""
+    assert lookup.allows_class(mat_class, "arnold")
+    assert not lookup.allows_class(mat_class, "vray")
+
+
+def test_other_engines_match_exactly(lookup):
+    assert lookup.classify("VRayMtlWrapper") == (lookup.all_mask, "")     # unknown, not vray
+    assert lookup.classify("VRayMtl_ai_flat")[0] == _mask(lookup, "arnold")
+
+
+def test_substring_answers_are_memoised(lookup):
+    lookup.classify("ai_standard_surface_v2")
+    lookup._parts = []
+    assert lookup.classify("ai_standard_surface_v2")[0] == _mask(lookup, "arnold")
+
+
+def test_signature_changes_with_the_rules():
+    base = EngineLookup(ALLOWED, SCENES).signature
+    assert EngineLookup(ALLOWED, SCENES).signature == base
+    assert EngineLookup(ALLOWED, ("vray",)).signature != base
+    assert EngineLookup(ALLOWED, SCENES, substring_engines=()).signature != base
+    assert EngineLookup(dict(ALLOWED, vray=["VRayMtl"]), SCENES).signature != base
@@ -0,0 +1,127 @@
+import os
+
+import pytest
+
+import folder_summary
+from folder_summary import FolderSummaries, UNKNOWN_SUMMARY, summarize_folder
+from material_index import MaterialIndex
+
+
+@pytest.fixture
+def index(tmp_path):
+    (tmp_path / "db").mkdir()
+    idx = MaterialIndex(str(tmp_path / "db"))
+    yield idx
+    idx.close()
+
+
+def _folder(tmp_path, name, files=(), dirs=()):
+    folder = tmp_path / name
+    folder.mkdir(parents=True)
+    for file_name in files:
+        (folder / file_name).write_bytes(b"")
+    for dir_name in dirs:
+        (folder / dir_name).mkdir()
+    return folder
+
+
+def _path(folder):
+    return str(folder).replace("\\", "/")
+
+
+def _count_builds(monkeypatch):
+    built = []
+    real = folder_summary.summarize_folder
+
+    def spy(path, mtime=None):
+        built.append(path)
+        return real(path, mtime)
+    monkeypatch.setattr(folder_summary, "summarize_folder", spy)
+    return built
+
+
+def test_summary_counts_and_flags(tmp_path):
+    folder = _folder(tmp_path, "Wood", files=("Wood_Albedo.png", "Oak.mat", "Pine.MAT", "look.mtlx"),
+                     dirs=("Sub", "Other"))
+    summary = summarize_folder(str(folder))
+    assert summary["path"] == _path(folder)
+    assert summary["mtime"] == os.stat(folder).st_mtime
+    assert summary["has_pbr"] and summary["has_mtlx"]
+    assert (summary["subdirs"], summary["mat_files"], summary["mtlx_files"]) == (2, 2, 1)
+    assert summary["icon"] == ""
+
+
+def test_summary_plain_folder(tmp_path):
+    summary = summarize_folder(str(_folder(tmp_path, "Plain", files=("readme.txt",))))
+    assert not summary["has_pbr"] and not summary["has_mtlx"]
+    assert (summary["subdirs"], summary["mat_files"], summary["mtlx_files"]) == (0, 0, 0)
+
+
+def test_icon_png_wins_over_folder_thumbnail(tmp_path):
+    folder = _folder(tmp_path, "Stone", files=("Stone.jpg",))
+    assert summarize_folder(str(folder))["icon"] == f"{_path(folder)}/Stone.jpg"
+    (folder / "ICON.png").write_bytes(b"")
+    assert summarize_folder(str(folder))["icon"] == f"{_path(folder)}/ICON.png"
+
+
+def test_unreadable_folder_has_no_summary(tmp_path):
+    assert summarize_folder(str(tmp_path / "missing")) is None
+
+
+def test_get_many_uses_stored_summary_when_mtime_matches(tmp_path, index, monkeypatch):
+    folder = _path(_folder(tmp_path, "Metal", files=("a.mat",)))
+    mtime = os.stat(folder).st_mtime
+    stored = dict(summarize_folder(folder), mat_files=99)
+    index.put_folder_summaries([stored])
+
+    built = _count_builds(monkeypatch)
+    result = FolderSummaries(index).get_many({folder: mtime})
+    assert result[folder]["mat_files"] == 99
+    assert built == []
+
+
+def test_get_many_rebuilds_stale_summaries_and_writes_them_back(tmp_path, index, monkeypatch):
+    fresh = _path(_folder(tmp_path, "Fresh", files=("a.mat",)))
+    stale = _path(_folder(tmp_path, "Stale", files=("a.mat",)))
+    missing = _path(_folder(tmp_path, "New", files=("a.mat", "b.mat")))
+    index.put_folder_summaries([summarize_folder(fresh), dict(summarize_folder(stale), mtime=1.0, mat_files=99)])
+
+    built = _count_builds(monkeypatch)
+    mtimes = {p: os.stat(p).st_mtime for p in (fresh, stale, missing)}
+    result = FolderSummaries(index).get_many(mtimes)
+    assert sorted(built) == sorted([stale, missing])
+    assert result[stale]["mat_files"] == 1
+    assert result[missing]["mat_files"] == 2
+
+    stored = index.folder_summaries(mtimes)
+    assert stored[stale]["mtime"] == mtimes[stale] and stored[stale]["mat_files"] == 1
+    assert stored[missing]["mat_files"] == 2
+
+
+def test_get_many_skips_unreadable_folders(tmp_path, index):
+    gone = _path(tmp_path / "gone")
+    assert FolderSummaries(index).get_many({gone: 1.0}) == {}
+    assert index.folder_summaries([gone]) == {}
+
+
+def test_unknown_summary_matches_the_summary_shape(tmp_path):
+    folder = _folder(tmp_path, "Metal", files=("icon.png", "albedo.png"))
+    assert UNKNOWN_SUMMARY.keys() == summarize_folder(str(folder)).keys()
+    assert not UNKNOWN_SUMMARY["icon"] and not UNKNOWN_SUMMARY["has_pbr"]
+
+
+def test_get_and_refresh(tmp_path, index):
+    folder = _folder(tmp_path, "Glass", files=("a.mat",))
+    summaries = FolderSummaries(index)
+    assert summaries.get(str(folder))["mat_files"] == 1
+    assert summaries.get(str(tmp_path / "missing")) is None
+
+    (folder / "b.mat").write_bytes(b"")
+    assert summaries.refresh(str(folder))["mat_files"] == 2
+    assert index.folder_summaries([_path(folder)])[_path(folder)]["mat_files"] == 2
+
+
+def test_works_without_an_index(tmp_path):
+    folder = _path(_folder(tmp_path, "Loose", files=("a.mat",)))
+    result = FolderSummaries(None).get_many({folder: os.stat(folder).st_mtime})
+    assert result[folder]["mat_files"] == 1
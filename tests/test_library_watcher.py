@@ -0,0 +1,142 @@
+import os
+import time
+
+import pytest
+
+pytest.importorskip("PySide6.QtCore")
+from library_watcher import LibraryWatcher, _WatchJob, _WatchSignals  # noqa: E402
+from material_index import MaterialIndex  # noqa: E402
+
+
+def _p(path):
+    return str(path).replace("\\", "/")
+
+
+@pytest.fixture
+def library(tmp_path):
+    root = tmp_path / "lib"
+    (root / "wood").mkdir(parents=True)
+    (root / "wood" / "oak.mat").write_bytes(b"x")
+    index = MaterialIndex(_p(root), db_path=_p(tmp_path / "index.db"))
+    yield root, index
+    index.close()
+
+
+@pytest.fixture
+def watcher(qapp, library):
+    root, index = library
+    watcher = LibraryWatcher(index, _p(root), poll_seconds=0)
+    watcher.received = []
+    watcher.changesReady.connect(watcher.received.append)
+    yield watcher
+    watcher.stop()
+
+
+def _spin(app, done, timeout=5.0):
+    end = time.monotonic() + timeout
+    while not done() and time.monotonic() < end:
+        app.processEvents()
+        time.sleep(0.005)
+    return done()
+
+
+def _run_job(index, root, folder=None, generation=0):
+    signals = _WatchSignals()
+    emitted = []
+    signals.changes.connect(lambda gen, changes: emitted.append((gen, changes)))
+    _WatchJob(index, _p(root), signals, folder, generation).run()
+    return emitted
+
+
+def test_root_job_emits_deltas_of_changed_folders(library):
+    root, index = library
+    (emitted,) = _run_job(index, root, generation=7)
+    generation, changes = emitted
+    assert generation == 7
+    wood = next(c for c in changes if c["folder"] == _p(root / "wood"))
+    assert wood["added"] == [_p(root / "wood" / "oak.mat")] and wood["subdirs"] is None
+
+    # nothing changed: nothing emitted
+    assert _run_job(index, root) == []
+
+    (root / "wood" / "oak.mat").unlink()
+    (root / "wood" / "pine.mat").write_bytes(b"x")
+    st = os.stat(root / "wood")
+    os.utime(root / "wood", (st.st_atime, st.st_mtime + 5))
+    (_gen, changes), = _run_job(index, root)
+    assert changes == [{"folder": _p(root / "wood"), "added": [_p(root / "wood" / "pine.mat")],
+                        "removed": [_p(root / "wood" / "oak.mat")], "modified": [], "removed_dirs": [],
+                        "subdirs": None}]
+
+
+def test_folder_job_always_reports_the_listing(library):
+    root, index = library
+    _run_job(index, root)
+    (root / "wood" / "sub").mkdir()
+    (_gen, changes), = _run_job(index, root, folder=_p(root / "wood"))
+    assert changes == [{"folder": _p(root / "wood"), "added": [], "removed": [], "modified": [],
+                        "removed_dirs": [], "subdirs": [_p(root / "wood" / "sub")]}]
+
+
+def test_settle_timer_collapses_bursts_into_one_listing(qapp, watcher, library, monkeypatch):
+    root, _index = library
+    started = []
+    monkeypatch.setattr(watcher, "_queue", started.append)
+    watcher._settle.setInterval(20)
+    watcher.watch_folder(_p(root / "wood"))
+    for _ in range(5):
+        watcher._on_directory_changed(_p(root / "wood"))
+    watcher._on_directory_changed(_p(root))        # not the folder on screen
+    assert _spin(qapp, lambda: started)
+    time.sleep(0.05)
+    qapp.processEvents()
+    assert started == [_p(root / "wood")]
+
+
+def test_only_one_job_runs_and_duplicates_collapse(qapp, watcher, monkeypatch):
+    jobs = []
+    monkeypatch.setattr(watcher._pool, "start", jobs.append)
+    watcher._queue(None)
+    watcher._queue("R/a")
+    watcher._queue(None)
+    watcher._queue("R/a")
+    assert [job.folder for job in jobs] == [None]
+    assert watcher._queued == ["R/a", None]
+    watcher._on_finished(watcher._generation)
+    assert [job.folder for job in jobs] == [None, "R/a"]
+
+
+def test_deleted_and_recreated_folder_is_watched_again(qapp, watcher, library):
+    root, _index = library
+    folder = root / "wood"
+    watcher.watch_folder(_p(folder))
+    assert _p(folder) in [_p(p) for p in watcher._fs.directories()]
+    for path in folder.iterdir():
+        path.unlink()
+    folder.rmdir()
+    watcher._fs.removePaths(watcher._fs.directories())    # what Qt does once the directory is gone
+    folder.mkdir()
+    watcher._on_finished(watcher._generation)
+    assert _p(folder) in [_p(p) for p in watcher._fs.directories()]
+
+
+def test_results_from_before_a_root_switch_are_dropped(qapp, watcher, library, tmp_path):
+    root, index = library
+    watcher.check_now()
+    old = watcher._generation
+    other = MaterialIndex(_p(tmp_path), db_path=_p(tmp_path / "other.db"))
+    try:
+        watcher.set_root(other, _p(tmp_path))
+        assert not watcher._busy and watcher._pool.activeThreadCount() == 0
+        index.close()                               # safe: the old job has finished
+        watcher._signals.changes.emit(old, [{"folder": "late"}])
+        watcher._signals.finished.emit(old)
+        qapp.processEvents()
+        assert watcher.received == []
+        assert watcher.index is other and watcher.root_path == _p(tmp_path)
+
+        watcher.check_now()
+        assert _spin(qapp, lambda: not watcher._busy)
+    finally:
+        watcher.stop()
+        other.close()
@@ -0,0 +1,45 @@
+import struct
+
+from mat_reader import MatHeader, read_scene, class_key, class_id_key, MATERIAL_SUPERCLASS_ID
+
+CLASSES = [("VRayMtl", (1, 2), MATERIAL_SUPERCLASS_ID), ("Bitmaptexture", (3, 4), 0x0C10)]
+
+
+def _chunk(chunk_id, payload, container=False):
+    length = 6 + len(payload)
+    return struct.pack("<HI", chunk_id, length | (0x80000000 if container else 0)) + payload
+
+
+def _name(text):
+    return _chunk(0x4001, text.encode("utf-16-le"))
+
+
+def _material(name, *children):
+    return _chunk(0, _name(name) + b"".join(children), container=True)
+
+
+def test_read_scene_counts_top_level_materials_only():
+    texmap = _chunk(1, _name("Wood_Diffuse"), container=True)
+    scene = _chunk(0x2000, _material("Oak", texmap) + _material("Pine"), container=True)
+    first, names, count = read_scene(scene, CLASSES)
+    assert first == 0
+    assert count == 2
+    assert names == ["Oak", "Wood_Diffuse", "Pine"]
+
+
+def test_read_scene_without_stream_has_unknown_count():
+    assert read_scene(b"", CLASSES) == (None, [], None)
+
+
+def test_header_dict_round_trip_keeps_count():
+    header = MatHeader(names=["Oak"], material_class="VRayMtl", class_id=(1, 2), count=1)
+    again = MatHeader.from_dict(header.to_dict())
+    assert (again.name, again.class_id, again.count) == ("Oak", (1, 2), 1)
+    # headers cached before the count was stored
+    assert MatHeader.from_dict({"names": ["Oak"]}).count is None
+
+
+def test_class_keys():
+    assert class_key("Physical Material") == class_key("PhysicalMaterial") == "physicalmaterial"
+    assert class_id_key((0x3C35FCE, 0x20870143)) == "0x3c35fce_0x20870143"
+    assert class_id_key(None) == ""
@@ -0,0 +1,127 @@
+import json
+import sqlite3
+import threading
+
+import pytest
+
+from material_index import MaterialIndex, SCHEMA_COLUMNS
+
+
+@pytest.fixture
+def index(tmp_path):
+    idx = MaterialIndex(str(tmp_path))
+    yield idx
+    idx.close()
+
+
+def _add(index, folder, name, mtime=1.0):
+    index.apply_folder_delta(folder, mtime, added=[(f"{folder}/{name}.mat", 10, 1.0)])
+
+
+def test_old_database_gets_new_columns(tmp_path):
+    db = tmp_path / "material_index.db"
+    conn = sqlite3.connect(str(db))
+    conn.executescript("""
+        CREATE TABLE folders (path TEXT PRIMARY KEY, parent TEXT);
+        CREATE TABLE materials (id INTEGER PRIMARY KEY AUTOINCREMENT, mat_path TEXT NOT NULL,
+                                name TEXT NOT NULL, lower_name TEXT NOT NULL, folder TEXT NOT NULL,
+                                UNIQUE (mat_path, name));
+        INSERT INTO materials (mat_path, name, lower_name, folder) VALUES ('R/a.mat', 'A', 'a', 'R');
+    """)
+    conn.commit()
+    conn.close()
+
+    index = MaterialIndex(str(tmp_path))
+    try:
+        for table, column, _decl in SCHEMA_COLUMNS:
+            columns = [r["name"] for r in index.conn.execute(f"PRAGMA table_info({table})")]
+            assert column in columns
+        assert index.get_material("R/a.mat", "A")["mat_class"] == ""
+    finally:
+        index.close()
+
+
+def test_json_migration_runs_once(tmp_path, index):
+    legacy = tmp_path / "material_db.json"
+    legacy.write_text(json.dumps([
+        {"mat_path": "R/a.mat", "name": "A", "tags": ["Wood", "oak", "wood"]},
+        {"name": "broken"},
+    ]), encoding="utf-8")
+    assert index.migrate_from_json(str(legacy)) == 1
+    assert index.get_material("R/a.mat", "A")["tags"] == ["wood", "oak"]
+    assert index.migrate_from_json(str(legacy)) == 0
+
+
+def test_tags_follow_their_rows_in_insert_order(index):
+    index.upsert_material("R/a.mat", "A", tags=["zeta", "alpha"])
+    index.upsert_material("R/b.mat", "B", tags=["beta"])
+    index.upsert_material("R/c.mat", "C")
+    by_name = {e["name"]: e["tags"] for e in index.iter_materials()}
+    assert by_name == {"A": ["zeta", "alpha"], "B": ["beta"], "C": []}
+    assert [e["name"] for e in index.search("alpha")] == ["A"]
+
+
+def test_remove_tree_matches_the_exact_prefix(index):
+    for folder in ("R/Wood_A", "R/Wood_A/sub", "R/WoodXA", "R/wood_a", "R/wood_a/sub", "R/Wood_A2"):
+        _add(index, folder, "m")
+    index.remove_folder_tree("R/Wood_A")
+    left = sorted(e["mat_path"] for e in index.iter_materials())
+    assert left == sorted(["R/Wood_A2/m.mat", "R/WoodXA/m.mat", "R/wood_a/m.mat", "R/wood_a/sub/m.mat"])
+    assert index.folder_state("R/Wood_A") == (None, [])
+    assert index.files_in_folder("R/WoodXA")
+
+
+def test_move_folder_tree_keeps_ids_and_tags(index):
+    _add(index, "R/old", "m")
+    index.set_tags("R/old/m.mat", "m", ["metal"])
+    mat_id = index.get_material("R/old/m.mat", "m")["id"]
+    index.move_folder_tree("R/old", "R/new")
+    moved = index.get_material("R/new/m.mat", "m")
+    assert moved["id"] == mat_id and moved["tags"] == ["metal"]
+    assert index.get_material("R/old/m.mat", "m") is None
+
+
+def test_search_documents_under_folder(index):
+    _add(index, "R/a", "one")
+    _add(index, "R/a/b", "two")
+    _add(index, "R/ab", "three")
+    index.set_tags("R/a/b/two.mat", "two", ["x", "y"])
+    docs = {d["name"]: d for d in index.search_documents(under="R/a")}
+    assert sorted(docs) == ["one", "two"]
+    assert docs["two"]["tags"] == ["x", "y"]
+
+
+def _lock_free(index):
+    """True if another thread can take the index lock right now."""
+    result = []
+
+    def probe():
+        acquired = index._lock.acquire(timeout=1)
+        if acquired:
+            index._lock.release()
+        result.append(acquired)
+    worker = threading.Thread(target=probe)
+    worker.start()
+    worker.join()
+    return result[0]
+
+
+def test_transaction_on_closed_index_releases_the_lock(index):
+    index.close()
+    with pytest.raises(sqlite3.ProgrammingError):
+        with index.transaction() as cur:
+            cur.execute("SELECT 1")
+    assert _lock_free(index)
+
+    index.open()
+    index.set_meta("k", "v")
+    assert index.get_meta("k") == "v"
+
+
+def test_failed_begin_releases_the_lock(index):
+    with index.transaction():
+        with pytest.raises(sqlite3.OperationalError):
+            with index.transaction():
+                pass
+    assert _lock_free(index)
+    index.set_meta("k", "v")
@@ -0,0 +1,84 @@
+import os
+
+from material_library_cache import MaterialLibraryCache
+
+
+class _Material:
+    def __init__(self, name):
+        self.name = name
+
+
+class _Library(list):
+    @property
+    def count(self):
+        return len(self)
+
+
+class _Runtime:
+    """Stands in for pymxs.runtime: a library holds one material per line of the file."""
+
+    def __init__(self):
+        self.loads = []
+
+    def loadTempMaterialLibrary(self, path):
+        self.loads.append(path)
+        with open(path, encoding="utf-8") as f:
+            return _Library(_Material(line.strip()) for line in f if line.strip())
+
+
+def _write(path, *names, mtime=None):
+    path.write_text("\n".join(names), encoding="utf-8")
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+    return str(path).replace("\\", "/")
+
+
+def test_library_is_loaded_once_and_first_name_wins(tmp_path):
+    path = _write(tmp_path / "woods.mat", "Oak", "Pine", "Oak")
+    rt = _Runtime()
+    cache = MaterialLibraryCache(rt)
+    oak = cache.get(path, "Oak")
+    assert cache.get(path, "Oak") is oak
+    assert cache.names(path) == ["Oak", "Pine"]
+    assert cache.get(path, "Teak") is None
+    assert (len(rt.loads), cache.loads, cache.hits) == (1, 1, 3)
+
+
+def test_changed_file_is_reloaded(tmp_path):
+    path = _write(tmp_path / "woods.mat", "Oak", mtime=1000)
+    cache = MaterialLibraryCache(_Runtime())
+    assert cache.names(path) == ["Oak"]
+    _write(tmp_path / "woods.mat", "Oak", "Pine", mtime=2000)
+    assert cache.names(path) == ["Oak", "Pine"]
+    assert cache.loads == 2
+
+
+def test_missing_file_is_forgotten(tmp_path):
+    path = _write(tmp_path / "woods.mat", "Oak")
+    cache = MaterialLibraryCache(_Runtime())
+    cache.library(path)
+    os.remove(path)
+    assert cache.get(path, "Oak") is None
+    assert path not in cache
+
+
+def test_least_recently_used_library_is_evicted(tmp_path):
+    paths = [_write(tmp_path / f"lib{i}.mat", f"M{i}") for i in range(3)]
+    cache = MaterialLibraryCache(_Runtime(), max_libraries=2)
+    cache.library(paths[0])
+    cache.library(paths[1])
+    cache.library(paths[0])
+    cache.library(paths[2])
+    assert paths[0] in cache and paths[2] in cache and paths[1] not in cache
+
+
+def test_invalidate_under_matches_whole_folders(tmp_path):
+    (tmp_path / "Wood").mkdir()
+    (tmp_path / "Wood2").mkdir()
+    inside = _write(tmp_path / "Wood" / "a.mat", "A")
+    beside = _write(tmp_path / "Wood2" / "b.mat", "B")
+    cache = MaterialLibraryCache(_Runtime())
+    cache.library(inside)
+    cache.library(beside)
+    cache.invalidate_under(str(tmp_path / "Wood"))
+    assert inside not in cache and beside in cache
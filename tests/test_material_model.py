@@ -0,0 +1,52 @@
+import pytest
+
+QtCore = pytest.importorskip("PySide6.QtCore")
+
+from material_model import MaterialCardModel, make_row  # noqa: E402
+
+
+class _Thumbnails(QtCore.QObject):
+    thumbnailReady = QtCore.Signal(str)
+
+    def pixmap(self, icon_path):
+        return None
+
+    def cancel_pending(self):
+        pass
+
+    def invalidate(self, icon_path):
+        pass
+
+
+@pytest.fixture
+def model(qapp):
+    model = MaterialCardModel(_Thumbnails())
+    model.set_rows([make_row("folder", "R/sub", "sub")] +
+                   [make_row("material", f"R/m{i}.mat::m{i}", f"m{i}", pending=i % 2 == 0) for i in range(8)])
+    return model
+
+
+def _paths(model):
+    return [model.row(i)["path"] for i in range(model.rowCount())]
+
+
+def test_remove_rows_signals_one_range_per_run(model):
+    ranges = []
+    model.rowsAboutToBeRemoved.connect(lambda _parent, first, last: ranges.append((first, last)))
+    model.remove_rows([2, 3, 4, 7, 8])
+    assert ranges == [(7, 8), (2, 4)]
+    assert _paths(model) == ["R/sub", "R/m0.mat::m0", "R/m4.mat::m4", "R/m5.mat::m5"]
+    assert [model.find_row(p) for p in _paths(model)] == [0, 1, 2, 3]
+    assert model.find_row("R/m6.mat::m6") == -1
+    assert model.pending_count == 2
+
+
+def test_file_rows_and_kinds_follow_updates(model):
+    assert model.file_rows("R/m3.mat") == [4]
+    assert model.paths_of_kind("folder") == ["R/sub"]
+    model.update_row("R/m3.mat::m3", path="R/x.mat::x", name="x")
+    assert model.file_rows("R/m3.mat") == []
+    assert model.file_rows("R/x.mat") == [4]
+    model.remove_row(0)
+    assert model.paths_of_kind("folder") == []
+    assert model.file_rows("R/x.mat") == [3]
@@ -0,0 +1,157 @@
+import os
+
+import pytest
+
+import material_scanner
+from material_index import MaterialIndex
+from material_scanner import IncrementalScanner
+
+
+@pytest.fixture
+def library(tmp_path):
+    root = tmp_path / "lib"
+    (root / "wood" / "oak").mkdir(parents=True)
+    (root / "metal").mkdir()
+    for rel in ("wood/pine.mat", "wood/oak/oak.mat", "metal/steel.mat"):
+        (root / rel).write_bytes(b"not a real library")
+    index = MaterialIndex(str(root), db_path=str(tmp_path / "index.db"))
+    yield root, index
+    index.close()
+
+
+def _scan(index, root, **kwargs):
+    return IncrementalScanner(index, str(root), max_workers=2, read_headers=False).scan(**kwargs)
+
+
+def _names(index):
+    return sorted(e["name"] for e in index.iter_materials())
+
+
+def _touch_dir(path, offset):
+    st = os.stat(path)
+    os.utime(path, (st.st_atime, st.st_mtime + offset))
+
+
+def test_first_scan_adds_everything(library):
+    root, index = library
+    result = _scan(index, root)
+    assert (result.added, result.removed, result.modified) == (3, 0, 0)
+    assert _names(index) == ["oak", "pine", "steel"]
+
+
+def test_unchanged_directories_are_not_listed_again(library):
+    root, index = library
+    _scan(index, root)
+    result = _scan(index, root)
+    assert not result.changed
+    assert result.dirs_listed == 0 and result.dirs_skipped == 4
+
+
+def test_add_remove_and_modify_deltas(library):
+    root, index = library
+    _scan(index, root)
+    (root / "metal" / "steel.mat").unlink()
+    (root / "metal" / "iron.mat").write_bytes(b"x")
+    _touch_dir(root / "metal", 5)
+    (root / "wood" / "pine.mat").write_bytes(b"rewritten in place")
+    result = _scan(index, root, full=True)
+    assert (result.added, result.removed, result.modified) == (1, 1, 1)
+    assert _names(index) == ["iron", "oak", "pine"]
+
+
+def test_deleted_folder_is_dropped_by_its_parent(library):
+    root, index = library
+    _scan(index, root)
+    (root / "wood" / "oak" / "oak.mat").unlink()
+    (root / "wood" / "oak").rmdir()
+    _touch_dir(root / "wood", 5)
+    _scan(index, root)
+    assert _names(index) == ["pine", "steel"]
+
+
+def test_stat_failure_keeps_the_subtree(library, monkeypatch):
+    root, index = library
+    _scan(index, root)
+    flaky = str(root / "wood").replace("\\", "/")
+    real_stat = os.stat
+
+    def stat(path, *args, **kwargs):
+        if str(path).replace("\\", "/") == flaky:
+            raise OSError("share hiccup")
+        return real_stat(path, *args, **kwargs)
+
+    monkeypatch.setattr(material_scanner.os, "stat", stat)
+    _scan(index, root)
+    assert _names(index) == ["oak", "pine", "steel"]
+
+
+@pytest.fixture
+def wide_library(tmp_path):
+    root = tmp_path / "wide"
+    for i in range(12):
+        folder = root / f"set{i:02}" / "sub"
+        folder.mkdir(parents=True)
+        (folder.parent / f"a{i:02}.mat").write_bytes(b"x")
+        (folder / f"b{i:02}.mat").write_bytes(b"x")
+    index = MaterialIndex(str(root), db_path=str(tmp_path / "wide.db"))
+    yield root, index
+    index.close()
+
+
+def _on_disk(folder):
+    return sorted(str(p).replace("\\", "/") for p in folder.iterdir() if p.suffix == ".mat")
+
+
+def test_deltas_arrive_in_batches(wide_library):
+    root, index = wide_library
+    batches, progress = [], []
+    scanner = IncrementalScanner(index, str(root), max_workers=1, batch_size=5, read_headers=False,
+                                 delta_callback=lambda deltas: batches.append([d[0] for d in deltas]),
+                                 progress_callback=lambda result: progress.append(result.dirs_done))
+    result = scanner.scan()
+    assert result.added == 24
+    assert len(batches) > 1 and all(len(batch) <= 5 for batch in batches)
+    folders = [folder for batch in batches for folder in batch]
+    assert len(folders) == len(set(folders)) == 25         # root + 12 sets + 12 subs
+    assert progress == sorted(progress) and progress[-1] == 25
+
+
+def test_parallel_scan_matches_single_threaded(wide_library, tmp_path):
+    root, index = wide_library
+    IncrementalScanner(index, str(root), max_workers=8, batch_size=3, read_headers=False).scan()
+    other = MaterialIndex(str(root), db_path=str(tmp_path / "single.db"))
+    try:
+        IncrementalScanner(other, str(root), max_workers=1, read_headers=False).scan()
+        assert _names(index) == _names(other)
+    finally:
+        other.close()
+
+
+def test_cancel_mid_scan_leaves_the_index_consistent(wide_library):
+    root, index = wide_library
+    scanner = None
+
+    def cancel_after_first_batch(_deltas):
+        scanner.cancel()
+
+    scanner = IncrementalScanner(index, str(root), max_workers=2, batch_size=3, read_headers=False,
+                                 delta_callback=cancel_after_first_batch)
+    result = scanner.scan()
+    assert result.cancelled
+    assert 0 < len(_names(index)) < 24
+
+    # every folder with a stored mtime was written completely; the rest is unknown
+    for folder in [root] + [p for p in root.rglob("*") if p.is_dir()]:
+        path = str(folder).replace("\\", "/")
+        mtime, _children = index.folder_state(path)
+        if mtime is not None:
+            assert sorted(index.files_in_folder(path)) == _on_disk(folder)
+        else:
+            assert index.files_in_folder(path) == {}
+
+    # the next scan picks up exactly what is missing
+    indexed = len(_names(index))
+    result = IncrementalScanner(index, str(root), max_workers=2, read_headers=False).scan()
+    assert not result.cancelled
+    assert result.added == 24 - indexed and result.removed == 0
+    assert len(_names(index)) == 24
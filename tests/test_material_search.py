@@ -0,0 +1,82 @@
+import pytest
+
+from material_search import SearchIndex, parse_query, edit_distance, max_typos
+
+
+@pytest.fixture
+def index():
+    idx = SearchIndex()
+    idx.add(1, "Red_Metal_Rust", tags=["metal", "old"], folder="metals/iron", mat_class="VRayMtl", path="a.mat")
+    idx.add(2, "Blue_Metal", tags=["metal"], folder="metals", mat_class="PhysicalMaterial", path="b.mat")
+    idx.add(3, "Oak_Floor", tags=["wood", "floor"], folder="wood/floors", mat_class="VRayMtl", path="c.mat")
+    idx.add(4, "Walnut", tags=["wood"], folder="wood", mat_class="VRayMtl", path="d.mat")
+    idx.add(5, "Marble_White", tags=["stone"], folder="stone", mat_class="VRayMtl", path="e.mat")
+    idx.add(6, "Painted", tags=["marble"], folder="misc", mat_class="VRayMtl", path="f.mat")
+    return idx
+
+
+def _names(docs):
+    return [d["name"] for d in docs]
+
+
+def test_parse_query_groups_fields_and_negation():
+    groups = parse_query("red tag:metal OR -rust wood*")
+    assert [[repr(t) for t in group] for group in groups] == [
+        ["Term(red)", "Term(tag:metal)"],
+        ["Term(-rust)", "Term(wood*)"],
+    ]
+    assert [t.text for t in parse_query("oak-floor_01")[0]] == ["oak", "floor", "01"]
+
+
+def test_name_mode_is_exact_substring_and_sorted(index):
+    assert _names(index.search("metal")) == ["Blue_Metal", "Red_Metal_Rust"]
+    assert _names(index.search("metal -rust")) == ["Blue_Metal"]
+    assert _names(index.search("oak OR walnut")) == ["Oak_Floor", "Walnut"]
+    assert _names(index.search("tag:floor")) == ["Oak_Floor"]
+    assert _names(index.search("folder:wood")) == ["Oak_Floor", "Walnut"]
+    assert _names(index.search("wal*")) == ["Walnut"]
+    # no typo tolerance outside ranked mode
+    assert index.search("marbel") == []
+
+
+def test_name_mode_pages_keep_name_order(index):
+    pages = list(index.search_pages("vraymtl", page_size=2))
+    assert [len(p) for p in pages] == [2, 2, 1]
+    assert _names(doc for page in pages for doc in page) == [
+        "Marble_White", "Oak_Floor", "Painted", "Red_Metal_Rust", "Walnut"]
+
+
+def test_ranked_mode_tolerates_typos_and_prefers_names(index):
+    ranked = index.ranked_search("marbel")
+    # the name hit outranks the tag hit
+    assert [doc["name"] for _score, doc in ranked] == ["Marble_White", "Painted"]
+    assert ranked[0][0] > ranked[1][0]
+
+
+def test_ranked_mode_rewards_matching_every_term(index):
+    ranked = [doc["name"] for _score, doc in index.ranked_search("red metal")]
+    assert ranked[0] == "Red_Metal_Rust"
+    assert "Blue_Metal" in ranked
+
+
+def test_tags_and_paths_update_in_place(index):
+    index.set_tags(4, ["wood", "dark"])
+    assert _names(index.search("dark")) == ["Walnut"]
+    assert index.remove_path("d.mat") == 1
+    assert index.search("dark") == []
+    assert len(index) == 5
+
+
+def test_edit_distance_counts_swaps_once():
+    assert edit_distance("marbel", "marble", 2) == 1
+    assert edit_distance("wood", "walnut", 1) == 2
+    assert (max_typos("oak"), max_typos("metal"), max_typos("concrete")) == (0, 1, 2)
+
+
+def test_short_terms_match_anywhere_in_a_word(index):
+    assert _names(index.search("ak")) == ["Oak_Floor"]
+    assert _names(index.search("al")) == ["Blue_Metal", "Red_Metal_Rust", "Walnut"]
+    assert _names(index.search("ar")) == ["Marble_White", "Painted"]     # tag "marble" too
+    assert _names(index.search("name:o")) == ["Oak_Floor"]
+    assert _names(index.search("ak*")) == []        # an explicit prefix stays a prefix
+    assert _names(index.search("tag:oo")) == ["Oak_Floor", "Walnut"]
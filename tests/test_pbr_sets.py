@@ -0,0 +1,109 @@
+import json
+
+import pytest
+
+from pbr_sets import PLAN_FILE_NAME, TextureSetPlan, _add_folder, classify_texture, plan_folder, scan_texture_sets
+
+
+@pytest.mark.parametrize("file_name, expected", [
+    ("Metal_Plate_Roughness_4K.jpg", ("Metal_Plate", "roughness", "4k", [])),
+    ("Emission_Color.png", ("", "emission", None, ["color"])),
+    ("Wood_Base_Color.png", ("Wood", "albedo", None, [])),
+    ("WoodFloorAlbedo.png", ("WoodFloor", "albedo", None, [])),
+    ("Brick-diff-2048x2048.tif", ("Brick", "albedo", "2048x2048", [])),
+    ("Fabric_NormalGL.png", ("Fabric", "normal", None, ["gl"])),
+    ("Fabric_NormalDX.png", ("Fabric", "normal", None, ["dx"])),
+    ("FabricNormalGL_2K.png", ("Fabric", "normal", "2k", ["gl"])),
+    ("Fabric_Normal_DirectX.png", ("Fabric", "normal", None, ["directx"])),
+    ("Albedo.jpg", ("", "albedo", None, [])),
+])
+def test_classify_texture(file_name, expected):
+    assert classify_texture(file_name) == expected
+
+
+@pytest.mark.parametrize("file_name", ["notes.txt", "Angle.png", "Fabric_GL.png", "4K.png"])
+def test_classify_texture_no_match(file_name):
+    assert classify_texture(file_name) is None
+
+
+def _plan(files, folder="R/Fabric", overwrite=False):
+    plan = TextureSetPlan("R")
+    _add_folder(plan, folder, files, overwrite=overwrite)
+    return plan
+
+
+def test_one_set_takes_the_folder_name():
+    plan = _plan(["Cloth_Albedo.png", "Cloth_Roughness.png", "Cloth_NormalGL.png", "readme.png"])
+    (entry,) = plan.sets
+    assert entry["name"] == "Fabric"
+    assert entry["lib_path"] == "R/Fabric/Fabric.mat"
+    assert sorted(entry["maps"]) == ["albedo", "normal", "roughness"]
+    assert entry["status"] == "new"
+    assert plan.unmatched == ["R/Fabric/readme.png"]
+    assert plan.folders == 1
+
+
+def test_gl_normal_is_preferred_over_dx():
+    plan = _plan(["Cloth_Albedo.png", "Cloth_NormalDX.png", "Cloth_NormalGL.png"])
+    (entry,) = plan.sets
+    assert entry["maps"]["normal"] == "R/Fabric/Cloth_NormalGL.png"
+    assert entry["extras"] == ["R/Fabric/Cloth_NormalDX.png"]
+
+
+def test_resolution_with_most_maps_wins_and_fills_from_others():
+    plan = _plan(["Cloth_Albedo_2K.png", "Cloth_Roughness_2K.png", "Cloth_Albedo_4K.png",
+                  "Cloth_Normal_1K.png"])
+    (entry,) = plan.sets
+    assert entry["resolution"] == "2k"
+    assert entry["maps"]["albedo"] == "R/Fabric/Cloth_Albedo_2K.png"
+    assert entry["maps"]["normal"] == "R/Fabric/Cloth_Normal_1K.png"
+    assert entry["alternates"] == ["1k", "4k"]
+
+
+def test_several_sets_keep_their_own_names():
+    plan = _plan(["Oak_Albedo.png", "Oak_Roughness.png", "Pine_Albedo.png", "Pine_Roughness.png"])
+    assert sorted(e["name"] for e in plan.sets) == ["Oak", "Pine"]
+
+
+def test_map_only_files_do_not_share_a_library_with_a_named_set():
+    plan = _plan(["Albedo.png", "Roughness.png", "Fabric_Albedo.png", "Fabric_Normal.png",
+                  "Oak_Albedo.png"])
+    names = sorted(e["name"] for e in plan.sets)
+    assert names == ["Fabric", "Fabric_2", "Oak"]
+    assert len({e["lib_path"] for e in plan.sets}) == 3
+    named = next(e for e in plan.sets if e["name"] == "Fabric")
+    assert named["maps"]["normal"] == "R/Fabric/Fabric_Normal.png"
+
+
+def test_status_exists_and_no_albedo():
+    plan = _plan(["Fabric.MAT", "Cloth_Albedo.png", "Cloth_Roughness.png"])
+    assert plan.sets[0]["status"] == "exists"
+    assert plan.buildable == []
+    assert _plan(["Fabric.mat", "Cloth_Albedo.png"], overwrite=True).sets[0]["status"] == "new"
+    assert _plan(["Cloth_Roughness.png", "Cloth_Normal.png"]).sets[0]["status"] == "no_albedo"
+
+
+def test_folder_without_textures_is_not_counted():
+    plan = _plan(["notes.txt", "Fabric.mat"])
+    assert plan.sets == [] and plan.folders == 0
+
+
+def test_scan_texture_sets_and_save(tmp_path):
+    for rel in ("Wood/Oak_Albedo.png", "Wood/Oak_Roughness.png", "Metal/Steel/BaseColor.jpg",
+                "Metal/Steel/Metalness.jpg", "Empty/readme.txt"):
+        path = tmp_path / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b"")
+    plan = scan_texture_sets(str(tmp_path))
+    root = str(tmp_path).replace("\\", "/")
+    assert sorted(e["lib_path"] for e in plan.sets) == [f"{root}/Metal/Steel/Steel.mat", f"{root}/Wood/Wood.mat"]
+    assert plan.folders == 2
+    assert plan.summary().startswith("2 texture set(s) in 2 folder(s): 2 to build")
+
+    plan.save(str(tmp_path / PLAN_FILE_NAME))
+    saved = json.loads((tmp_path / PLAN_FILE_NAME).read_text(encoding="utf-8"))
+    assert len(saved["sets"]) == 2
+
+    single = plan_folder(str(tmp_path / "Wood"))
+    assert [e["name"] for e in single.sets] == ["Wood"]
+    assert plan_folder(str(tmp_path / "missing")).sets == []
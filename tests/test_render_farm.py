@@ -0,0 +1,151 @@
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+from render_farm import FarmWorker, RenderFarm, make_job, write_job_file, stand_in_command
+
+# Test worker: renders by touching the output file. FAIL_MODE picks how it misbehaves.
+WORKER_SCRIPT = """
+import os, sys, time
+sys.path.insert(0, os.environ["MAB_PLUGIN_DIR"])
+from render_farm import FarmWorker
+
+worker = FarmWorker.from_env()
+mode = os.environ.get("FAIL_MODE", "")
+
+def render(job):
+    if mode == "crash_first_worker" and worker.worker_id == "0":
+        os._exit(3)
+    if mode == "hang_first_worker" and worker.worker_id == "0":
+        time.sleep(60)
+    if mode == "crash_job_0" and job["id"] == 0:
+        os._exit(3)
+    open(job["output"], "w").close()
+    return job["output"]
+
+worker.run(render)
+"""
+
+
+def _jobs(tmp_path, count):
+    return [make_job(i, f"R/m{i}.mat", f"m{i}", "", str(tmp_path / f"m{i}.jpg")) for i in range(count)]
+
+
+def _farm_dir(tmp_path):
+    farm_dir = tmp_path / "farm"
+    farm_dir.mkdir()
+    return str(farm_dir)
+
+
+@pytest.fixture
+def worker_command(tmp_path):
+    script = tmp_path / "worker.py"
+    script.write_text(WORKER_SCRIPT, encoding="utf-8")
+    return lambda worker_id: [sys.executable, str(script)]
+
+
+def _run(farm, mode, monkeypatch):
+    monkeypatch.setenv("FAIL_MODE", mode)
+    farm.start()
+    try:
+        events = farm.wait(timeout=60, interval=0.05)
+    finally:
+        if not farm.finished:
+            farm.cancel(grace=0.0)
+            farm.wait(timeout=10, interval=0.05)
+    assert farm.finished
+    return {e["job"]: e for e in events if e["event"] in ("done", "failed")}
+
+
+def test_each_job_is_claimed_once(tmp_path):
+    farm_dir = tmp_path / "farm"
+    farm_dir.mkdir()
+    write_job_file(str(farm_dir), _jobs(tmp_path, 200))
+    workers = [FarmWorker(str(farm_dir), i) for i in range(4)]
+    claimed = [[] for _ in workers]
+
+    def drain(i):
+        while True:
+            job = workers[i].claim_next()
+            if job is None:
+                return
+            claimed[i].append(job["id"])
+
+    threads = [threading.Thread(target=drain, args=(i,)) for i in range(len(workers))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    every = [job_id for ids in claimed for job_id in ids]
+    assert sorted(every) == list(range(200))
+
+
+def test_cancel_jobs_withdraws_only_unclaimed(tmp_path):
+    farm = RenderFarm(_jobs(tmp_path, 3), stand_in_command(), farm_dir=_farm_dir(tmp_path))
+    write_job_file(farm.farm_dir, list(farm.jobs.values()))
+    worker = FarmWorker(farm.farm_dir, 0)
+    assert worker.claim_next()["id"] == 0
+    assert farm.cancel_jobs([0, 1]) == [1]
+    assert worker.claim_next()["id"] == 2
+    events = farm.poll()
+    cancelled = [e["job"] for e in events if e.get("error") == "cancelled"]
+    assert cancelled == [1]
+
+
+def test_cancelled_farm_reports_the_rest_as_cancelled(tmp_path):
+    farm = RenderFarm(_jobs(tmp_path, 5), lambda worker_id: [sys.executable, "-c", "pass"],
+                      workers=1, farm_dir=_farm_dir(tmp_path))
+    farm.start()
+    farm.cancel(grace=10.0)
+    events = farm.wait(timeout=30, interval=0.05)
+    assert sorted(e["job"] for e in events if e.get("error") == "cancelled") == list(range(5))
+
+
+def test_crashed_worker_job_is_retried(tmp_path, worker_command, monkeypatch):
+    farm = RenderFarm(_jobs(tmp_path, 3), worker_command, workers=1, farm_dir=_farm_dir(tmp_path))
+    results = _run(farm, "crash_first_worker", monkeypatch)
+    assert {job_id: e["event"] for job_id, e in results.items()} == {0: "done", 1: "done", 2: "done"}
+    assert farm.done == 3 and farm.failed == 0
+    assert len(farm.processes) == 2
+
+
+def test_hung_worker_is_killed_and_its_job_retried(tmp_path, worker_command, monkeypatch):
+    farm = RenderFarm(_jobs(tmp_path, 2), worker_command, workers=1, farm_dir=_farm_dir(tmp_path),
+                      job_timeout=1.0)
+    results = _run(farm, "hang_first_worker", monkeypatch)
+    assert farm.done == 2 and farm.failed == 0
+    assert farm.processes[0].poll() is not None
+    assert os.path.exists(results[0]["output"])
+
+
+def test_job_that_keeps_crashing_fails_after_max_attempts(tmp_path, worker_command, monkeypatch):
+    farm = RenderFarm(_jobs(tmp_path, 2), worker_command, workers=1, farm_dir=_farm_dir(tmp_path),
+                      max_attempts=2)
+    results = _run(farm, "crash_job_0", monkeypatch)
+    assert results[0]["event"] == "failed" and results[0]["error"] == "worker crashed"
+    assert results[1]["event"] == "done"
+    assert farm.done == 1 and farm.failed == 1
+
+
+def test_cancel_returns_at_once_and_poll_kills_stragglers(tmp_path, worker_command, monkeypatch):
+    monkeypatch.setenv("FAIL_MODE", "hang_first_worker")
+    farm = RenderFarm(_jobs(tmp_path, 3), worker_command, workers=1, farm_dir=_farm_dir(tmp_path))
+    farm.start()
+    deadline = time.time() + 30
+    while not farm._in_flight and time.time() < deadline:
+        farm.poll()
+        time.sleep(0.05)
+    assert farm._in_flight                  # the worker is stuck in its first job
+
+    start = time.time()
+    farm.cancel(grace=0.5)
+    assert time.time() - start < 0.2
+    assert farm.processes[0].poll() is None
+
+    events = farm.wait(timeout=30, interval=0.05)
+    assert farm.finished and farm.processes[0].poll() is not None
+    assert sorted(e["job"] for e in events if e.get("error") == "cancelled") == [0, 1, 2]
+    assert len(farm.processes) == 1         # no replacement worker after a cancel
@@ -0,0 +1,105 @@
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("PySide6.QtCore")
+from search_pipeline import SearchPipeline  # noqa: E402
+
+
+class _Index:
+    """SearchIndex stand-in: one page per query, [query + ":" + n] rows; "slow" waits for release."""
+
+    def __init__(self, pages=1):
+        self.pages = pages
+        self.queries = []
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.release.set()
+
+    def search_pages(self, query, page_size, accept, ranked):
+        self.queries.append(query)
+        self.started.set()
+        self.release.wait(5)
+        for n in range(self.pages):
+            yield [f"{query}:{n}"]
+
+
+def _spin(app, done, timeout=5.0):
+    end = time.monotonic() + timeout
+    while not done() and time.monotonic() < end:
+        app.processEvents()
+        time.sleep(0.005)
+    return done()
+
+
+@pytest.fixture
+def pipeline(qapp):
+    pipeline = SearchPipeline(_Index(), delay_ms=30)
+    pipeline.results = []
+    pipeline.totals = []
+    pipeline.rowsStarted.connect(lambda rows: pipeline.results.append(("start", rows)))
+    pipeline.rowsAppended.connect(lambda rows: pipeline.results.append(("append", rows)))
+    pipeline.finished.connect(pipeline.totals.append)
+    yield pipeline
+    pipeline.cancel()
+    pipeline.index.release.set()
+    pipeline._pool.waitForDone()
+
+
+def test_quick_requests_run_one_search(qapp, pipeline):
+    for query in ("o", "oa", "oak"):
+        pipeline.request(query)
+    assert _spin(qapp, lambda: pipeline.totals)
+    assert pipeline.index.queries == ["oak"]
+    assert pipeline.results == [("start", ["oak:0"])]
+    assert pipeline.totals == [1]
+
+
+def test_pages_stream_as_start_then_append(qapp, pipeline):
+    pipeline.index.pages = 3
+    pipeline.request("oak", immediate=True)
+    assert _spin(qapp, lambda: pipeline.totals)
+    assert pipeline.results == [("start", ["oak:0"]), ("append", ["oak:1"]), ("append", ["oak:2"])]
+    assert pipeline.totals == [3]
+
+
+def test_older_generation_results_are_dropped(qapp, pipeline):
+    index = pipeline.index
+    index.release.clear()
+    pipeline.request("old", immediate=True)
+    assert index.started.wait(5)            # the old query is running on the worker
+    pipeline.request("new", immediate=True)
+    index.release.set()
+    assert _spin(qapp, lambda: pipeline.totals)
+    qapp.processEvents()
+    assert index.queries == ["old", "new"]
+    assert pipeline.results == [("start", ["new:0"])]
+    assert pipeline.totals == [1]
+
+
+def test_chunks_of_a_stale_generation_never_reach_the_model(qapp, pipeline):
+    old = pipeline._bump()
+    pipeline._bump()
+    pipeline.signals.chunk.emit(old, ["late"], True)
+    pipeline.signals.done.emit(old, 1)
+    qapp.processEvents()
+    assert pipeline.results == [] and pipeline.totals == []
+
+
+def test_cancel_drops_the_queued_query(qapp, pipeline):
+    pipeline.request("oak")
+    pipeline.cancel()
+    time.sleep(0.1)
+    qapp.processEvents()
+    assert pipeline.index.queries == [] and pipeline.results == []
+
+
+def test_set_index_cancels_and_switches(qapp, pipeline):
+    pipeline.request("oak")
+    other = _Index()
+    pipeline.set_index(other)
+    pipeline.request("pine", immediate=True)
+    assert _spin(qapp, lambda: pipeline.totals)
+    assert other.queries == ["pine"]
+    assert pipeline.results == [("start", ["pine:0"])]
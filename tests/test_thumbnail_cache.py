@@ -0,0 +1,128 @@
+import os
+import threading
+import time
+
+import pytest
+
+QtGui = pytest.importorskip("PySide6.QtGui")
+from PySide6.QtCore import QSize  # noqa: E402
+
+import thumbnail_cache  # noqa: E402
+from thumbnail_cache import ThumbnailService  # noqa: E402
+from thumbnail_store import ThumbnailStore  # noqa: E402
+
+
+@pytest.fixture
+def app(qapp):
+    return qapp
+
+
+@pytest.fixture
+def service(app):
+    service = ThumbnailService(size=QSize(150, 140))
+    yield service
+    service.clear()
+    service._pool.waitForDone()
+
+
+def _image(width, height, color=QtGui.QColor("red")):
+    image = QtGui.QImage(width, height, QtGui.QImage.Format_RGB32)
+    image.fill(color)
+    return image
+
+
+def _jpg(tmp_path, name, width=400, height=300):
+    path = str(tmp_path / name).replace("\\", "/")
+    assert _image(width, height).save(path, "JPG")
+    return path
+
+
+def _spin(app, done, timeout=5.0):
+    end = time.monotonic() + timeout
+    while not done() and time.monotonic() < end:
+        app.processEvents()
+        time.sleep(0.005)
+    return done()
+
+
+def test_lru_evicts_least_recently_used_by_bytes(service):
+    tile = _image(10, 10)
+    one = ThumbnailService._pixmap_bytes(QtGui.QPixmap.fromImage(tile))
+    service.max_bytes = 2 * one
+    service._on_decoded("a", tile)
+    service._on_decoded("b", tile)
+    assert service.pixmap("a") is not None      # a is now the most recent
+    service._on_decoded("c", tile)
+    assert list(service._cache) == ["a", "c"]
+    assert service.cached_bytes == 2 * one
+
+
+def test_oversized_entry_is_still_kept(service):
+    service.max_bytes = 1
+    service._on_decoded("a", _image(10, 10))
+    service._on_decoded("b", _image(10, 10))
+    assert list(service._cache) == ["b"]
+    assert service.cached_bytes == ThumbnailService._pixmap_bytes(service._cache["b"])
+
+
+def test_redecoded_path_does_not_count_twice(service):
+    service._on_decoded("a", _image(10, 10))
+    before = service.cached_bytes
+    service._on_decoded("a", _image(10, 10))
+    assert service.cached_bytes == before and len(service._cache) == 1
+
+
+def test_decodes_off_the_gui_thread_and_delivers_on_it(app, service, tmp_path, monkeypatch):
+    paths = [_jpg(tmp_path, f"{i}.jpg") for i in range(3)]
+    jobs, ready = [], []
+    real_run = thumbnail_cache._DecodeJob.run
+
+    def run(job):
+        jobs.append((threading.get_ident(), list(job.paths)))
+        real_run(job)
+    monkeypatch.setattr(thumbnail_cache._DecodeJob, "run", run)
+    service.thumbnailReady.connect(lambda path: ready.append((threading.get_ident(), path)))
+
+    assert [service.pixmap(p) for p in paths] == [None, None, None]
+    assert service.pixmap(paths[0]) is None         # queued once
+    assert _spin(app, lambda: len(ready) == 3)
+
+    assert len(jobs) == 1 and sorted(jobs[0][1]) == sorted(paths)     # one page, one job
+    assert jobs[0][0] != threading.get_ident()
+    assert {thread for thread, _path in ready} == {threading.get_ident()}
+    pix = service.pixmap(paths[0])
+    assert pix is not None and pix.width() <= 150 and pix.height() <= 140
+
+
+def test_unreadable_thumbnail_is_not_requeued(app, service, tmp_path, monkeypatch):
+    missing = str(tmp_path / "missing.jpg").replace("\\", "/")
+    assert service.pixmap(missing) is None
+    assert _spin(app, lambda: missing in service._failed)
+    started = []
+    monkeypatch.setattr(service._pool, "start", started.append)
+    assert service.pixmap(missing) is None
+    app.processEvents()
+    assert started == []
+
+
+def test_store_serves_tiles_once_ingested(app, tmp_path):
+    store = ThumbnailStore(str(tmp_path / "store" / "thumbnails.db"))
+    path = _jpg(tmp_path, "a.jpg")
+    try:
+        first = ThumbnailService(size=QSize(150, 140), store=store)
+        first.pixmap(path)
+        assert _spin(app, lambda: first.pixmap(path) is not None)
+        assert store.source_state(path) is not None
+
+        os.remove(path)                     # the share is gone: the stored tile is enough
+        second = ThumbnailService(size=QSize(150, 140), store=store)
+        second.pixmap(path)
+        assert _spin(app, lambda: second.pixmap(path) is not None)
+
+        second.invalidate(path)
+        assert store.source_state(path) is None
+        assert path not in second._cache
+        for svc in (first, second):
+            svc._pool.waitForDone()
+    finally:
+        store.close()
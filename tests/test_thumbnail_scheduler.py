@@ -0,0 +1,92 @@
+from thumbnail_scheduler import ThumbnailScheduler
+
+
+def _queue(*paths, folder="R/a"):
+    queue = ThumbnailScheduler()
+    queue.set_current_folder(folder)
+    for path in paths:
+        queue.push(path, path.rsplit("/", 1)[-1][:-4])
+    return queue
+
+
+def _drain(queue):
+    order = []
+    while True:
+        item = queue.pop()
+        if item is None:
+            return order
+        order.append(item[0])
+
+
+def test_newest_request_first_within_a_tier():
+    queue = _queue("R/a/1.mat", "R/a/2.mat", "R/a/3.mat")
+    assert _drain(queue) == ["R/a/3.mat", "R/a/2.mat", "R/a/1.mat"]
+    assert len(queue) == 0 and not queue
+
+
+def test_visible_beats_current_folder_beats_background():
+    queue = _queue("R/a/on_screen.mat", "R/b/elsewhere.mat", "R/a/folder.mat", "R/b/visible_elsewhere.mat")
+    queue.set_visible({"R/a/on_screen.mat", "R/b/visible_elsewhere.mat"})
+    assert _drain(queue) == ["R/a/on_screen.mat", "R/b/visible_elsewhere.mat",
+                             "R/a/folder.mat", "R/b/elsewhere.mat"]
+
+
+def test_requeue_moves_an_item_up_without_duplicating_it():
+    queue = _queue("R/a/1.mat", "R/a/2.mat")
+    queue.push("R/a/1.mat", "renamed")
+    assert len(queue) == 2
+    assert queue.pop() == ("R/a/1.mat", "renamed")
+    assert queue.pop() == ("R/a/2.mat", "2")
+    assert queue.pop() is None
+
+
+def test_visibility_and_folder_changes_reprioritise_queued_items():
+    queue = _queue("R/a/1.mat", "R/b/2.mat")
+    queue.set_current_folder("R/b")
+    assert queue.tier("R/b/2.mat") == (1, 0)
+    queue.set_visible({"R/a/1.mat"})
+    assert _drain(queue) == ["R/a/1.mat", "R/b/2.mat"]
+
+
+def test_stale_heap_entries_are_skipped():
+    queue = _queue("R/a/1.mat", "R/a/2.mat", "R/a/3.mat")
+    queue.set_visible({"R/a/1.mat"})
+    queue.set_visible({"R/a/2.mat"})
+    queue.discard("R/a/3.mat")
+    assert len(queue._heap) > len(queue)         # old entries are still in the heap
+    assert _drain(queue) == ["R/a/2.mat", "R/a/1.mat"]
+    assert queue._heap == []
+
+
+def test_discarded_then_requeued_item_is_not_matched_by_its_stale_entry():
+    queue = _queue("R/a/1.mat", "R/a/2.mat")
+    queue.discard("R/a/1.mat")
+    queue.push("R/a/1.mat", "again")
+    assert _drain(queue) == ["R/a/1.mat", "R/a/2.mat"]
+
+
+def test_take_tier_stops_at_the_next_tier():
+    queue = _queue("R/a/1.mat", "R/a/2.mat", "R/b/3.mat")
+    queue.set_visible({"R/a/1.mat", "R/a/2.mat"})
+    assert [path for path, _name in queue.take_tier()] == ["R/a/2.mat", "R/a/1.mat"]
+    assert [path for path, _name in queue.take_tier(limit=5)] == ["R/b/3.mat"]
+    assert queue.take_tier() == []
+
+
+def test_take_all_reports_tier_and_pin():
+    queue = _queue("R/a/1.mat", "R/b/2.mat")
+    queue.push("R/b/3.mat", "3", pinned=True)
+    queue.set_visible({"R/b/3.mat"})
+    assert queue.take_all() == [("R/b/3.mat", "3", 1, True), ("R/a/1.mat", "1", 2, False),
+                                ("R/b/2.mat", "2", 3, False)]
+
+
+def test_cancel_folders_except_keeps_pinned_items_and_compacts():
+    queue = _queue("R/a/keep.mat")
+    for i in range(100):
+        queue.push(f"R/b/{i}.mat", str(i))
+    queue.push("R/b/pinned.mat", "pinned", pinned=True)
+    cancelled = queue.cancel_folders_except("R/a")
+    assert len(cancelled) == 100
+    assert sorted(path for path, _name in queue) == ["R/a/keep.mat", "R/b/pinned.mat"]
+    assert len(queue._heap) == 2
@@ -0,0 +1,96 @@
+import pytest
+
+from thumbnail_store import ThumbnailStore, content_hash, default_store_path, open_thumbnail_store, tile_size_for
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ThumbnailStore(str(tmp_path / "cache" / "thumbnails.db"))
+    yield store
+    store.close()
+
+
+def _tiles(tag):
+    return {64: f"{tag}-64".encode(), 150: f"{tag}-150".encode(), 256: f"{tag}-256".encode()}
+
+
+def _tile_rows(store):
+    return store.conn.execute("SELECT COUNT(*) FROM tiles").fetchone()[0]
+
+
+def test_default_path_is_per_user_and_local(monkeypatch, tmp_path):
+    monkeypatch.setenv("LOCALAPPDATA", str(tmp_path))
+    expected = str(tmp_path).replace("\\", "/") + "/MaterialAssetsBrowser/thumbnails.db"
+    assert default_store_path() == expected
+    monkeypatch.delenv("LOCALAPPDATA")
+    assert default_store_path().endswith("/.cache/MaterialAssetsBrowser/thumbnails.db")
+
+
+def test_store_creates_its_folder(tmp_path):
+    store = open_thumbnail_store(str(tmp_path / "a" / "b" / "thumbnails.db"))
+    try:
+        assert (tmp_path / "a" / "b" / "thumbnails.db").exists()
+    finally:
+        store.close()
+
+
+def test_unavailable_store_falls_back_to_none(tmp_path):
+    blocker = tmp_path / "file"
+    blocker.write_bytes(b"")
+    assert open_thumbnail_store(str(blocker / "thumbnails.db")) is None
+
+
+@pytest.mark.parametrize("box, expected", [((10, 10), 64), ((150, 140), 150), ((151, 20), 256), ((900, 900), 256)])
+def test_tile_size_for(box, expected):
+    assert tile_size_for(*box) == expected
+
+
+def test_read_page_returns_the_requested_tile_size(store):
+    store.put("S:\\lib\\a.jpg", 10, 1.0, content_hash(b"a"), _tiles("a"))
+    store.put("S:/lib/b.jpg", 20, 2.0, content_hash(b"b"), _tiles("b"))
+    page = store.read_page(["S:/lib/a.jpg", "S:\\lib\\b.jpg", "S:/lib/missing.jpg"], 150)
+    assert page == {"S:/lib/a.jpg": (b"a-150", 10, 1.0), "S:/lib/b.jpg": (b"b-150", 20, 2.0)}
+    assert store.source_state("S:\\lib\\a.jpg") == (10, 1.0)
+    assert store.source_state("S:/lib/missing.jpg") is None
+
+
+def test_read_page_over_the_variable_limit(store):
+    paths = [f"S:/lib/{i}.jpg" for i in range(1200)]
+    for path in paths:
+        store.put(path, 1, 1.0, "same", {64: b"x"})
+    assert len(store.read_page(paths, 64)) == 1200
+
+
+def test_identical_renders_share_tiles(store):
+    digest = content_hash(b"same render")
+    store.put("S:/a.jpg", 1, 1.0, digest, _tiles("same"))
+    assert store.has_tiles(digest)
+    store.put("S:/b.jpg", 1, 1.0, digest, {})
+    assert _tile_rows(store) == 3
+    assert store.read_page(["S:/b.jpg"], 64)["S:/b.jpg"][0] == b"same-64"
+
+    store.forget("S:/a.jpg")
+    assert store.has_tiles(digest)          # still used by b.jpg
+    store.forget("S:/b.jpg")
+    assert not store.has_tiles(digest) and _tile_rows(store) == 0
+
+
+def test_rewritten_source_replaces_its_tiles(store):
+    store.put("S:/a.jpg", 1, 1.0, "old", _tiles("old"))
+    store.put("S:/a.jpg", 2, 2.0, "new", _tiles("new"))
+    assert not store.has_tiles("old")
+    assert store.read_page(["S:/a.jpg"], 256)["S:/a.jpg"] == (b"new-256", 2, 2.0)
+
+
+def test_failed_put_leaves_the_store_unchanged(store):
+    store.put("S:/a.jpg", 1, 1.0, "old", _tiles("old"))
+    with pytest.raises(Exception):
+        store.put("S:/a.jpg", 2, 2.0, "new", {64: None})    # NOT NULL violation
+    assert store.source_state("S:/a.jpg") == (1, 1.0)
+    assert store.has_tiles("old") and not store.has_tiles("new")
+    store.put("S:/b.jpg", 1, 1.0, "b", _tiles("b"))         # not left inside a transaction
+
+
+def test_forget_unknown_path_is_harmless(store):
+    store.forget("S:/nothing.jpg")
+    assert _tile_rows(store) == 0
@@ -0,0 +1,212 @@
+import os
+from collections import OrderedDict
+
+from PySide6.QtCore import Qt, QSize, QObject, QRunnable, QThreadPool, QTimer, QBuffer, QIODevice, Signal
+from PySide6.QtGui import QImage, QPixmap
+
+from thumbnail_store import TILE_SIZES, tile_size_for, content_hash
+
+
+DEFAULT_CACHE_BYTES = 64 * 1024 * 1024    # decoded thumbnails kept in memory
+DEFAULT_DECODE_THREADS = 2                # leave cores to 3ds Max
+
+
+# ==========================
+# Decode job (worker thread)
+# ==========================
+class _DecodeSignals(QObject):
+    decoded = Signal(str, QImage)
+
+
+class _DecodeJob(QRunnable):
+    """
+    Load one page of thumbnails (QImage is thread-safe, QPixmap is not).
+    Tiles already in the local ThumbnailStore come back from a single query;
+    the rest are read from the share once, scaled to every TILE_SIZES
+    variant and stored. Served hits are then re-checked against the source
+    (size, mtime) so a changed .jpg is picked up without blocking the page.
+    """
+
+    def __init__(self, paths, size, signals, store):
+        super().__init__()
+        self.paths = paths
+        self.size = size
+        self.signals = signals
+        self.store = store
+
+    def run(self):
+        size_px = tile_size_for(self.size.width(), self.size.height())
+        hits = {}
+        if self.store is not None:
+            try:
+                hits = self.store.read_page(self.paths, size_px)
+            except Exception as e:
+                print(f"[WARNING] Thumbnail store read failed: {e}")
+
+        for path, (data, _size, _mtime) in hits.items():
+            self.signals.decoded.emit(path, self._fit(QImage.fromData(data)))
+
+        for path in self.paths:
+            try:
+                st = os.stat(path)
+            except OSError:
+                if path not in hits:
+                    self.signals.decoded.emit(path, QImage())
+                continue
+            hit = hits.get(path)
+            if hit is not None and (hit[1], hit[2]) == (st.st_size, st.st_mtime):
+                continue
+            self.signals.decoded.emit(path, self._ingest(path, st, size_px))
+
+    def _ingest(self, path, st, size_px):
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            source = QImage.fromData(data)
+            if source.isNull():
+                print(f"[WARNING] Could not decode thumbnail {path}")
+                return QImage()
+        except Exception as e:
+            print(f"[ERROR] Thumbnail decode failed for {path}: {e}")
+            return QImage()
+
+        if self.store is None:
+            return self._fit(source)
+
+        wanted = None
+        try:
+            digest = content_hash(data)
+            tiles = {}
+            if not self.store.has_tiles(digest):
+                for tile_px in TILE_SIZES:
+                    tile = source.scaled(QSize(tile_px, tile_px), Qt.KeepAspectRatio, Qt.SmoothTransformation) \
+                        if max(source.width(), source.height()) > tile_px else source
+                    tiles[tile_px] = _encode(tile)
+                    if tile_px == size_px:
+                        wanted = tile
+            self.store.put(path, st.st_size, st.st_mtime, digest, tiles)
+        except Exception as e:
+            print(f"[WARNING] Could not store thumbnail tiles for {path}: {e}")
+        return self._fit(wanted if wanted is not None else source)
+
+    def _fit(self, image):
+        if image.isNull() or (image.width() <= self.size.width() and image.height() <= self.size.height()):
+            return image
+        return image.scaled(self.size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+
+
+def _encode(image):
+    """JPEG for opaque renders, PNG when there is alpha (folder / engine icons)."""
+    buffer = QBuffer()
+    buffer.open(QIODevice.WriteOnly)
+    if image.hasAlphaChannel():
+        image.save(buffer, "PNG")
+    else:
+        image.save(buffer, "JPG", 90)
+    return bytes(buffer.data())
+
+
+# ==========================
+# Thumbnail Service
+# ==========================
+class ThumbnailService(QObject):
+    """
+    Shared thumbnail source for the grid, search results and folder cards.
+
+    pixmap(path) answers from a byte-bounded LRU or returns None and queues
+    the path; misses of one event-loop turn (one painted page) become a
+    single job on a private QThreadPool, served from the local
+    ThumbnailStore when possible. thumbnailReady(path) fires once the
+    pixmap is cached. Entries are keyed by file path, so revisiting a folder
+    decodes nothing; call invalidate() after a thumbnail file is rewritten.
+    """
+
+    thumbnailReady = Signal(str)
+
+    def __init__(self, size=QSize(150, 140), max_bytes=DEFAULT_CACHE_BYTES,
+                 threads=DEFAULT_DECODE_THREADS, store=None, parent=None):
+        super().__init__(parent)
+        self.size = QSize(size)
+        self.max_bytes = max_bytes
+        self.store = store
+        self._queued = []
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.timeout.connect(self._start_page)
+        self._cache = OrderedDict()     # path -> QPixmap
+        self._bytes = 0
+        self._inflight = set()
+        self._failed = set()
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(max(1, threads))
+        self._signals = _DecodeSignals()
+        self._signals.decoded.connect(self._on_decoded)
+
+    @property
+    def cached_bytes(self):
+        return self._bytes
+
+    def pixmap(self, path):
+        """Cached pixmap for path, or None (decode queued). Never decodes on the caller's thread."""
+        if not path:
+            return None
+        pix = self._cache.get(path)
+        if pix is not None:
+            self._cache.move_to_end(path)
+            return pix
+        if path not in self._inflight and path not in self._failed:
+            self._inflight.add(path)
+            self._queued.append(path)
+            if not self._flush_timer.isActive():
+                self._flush_timer.start(0)
+        return None
+
+    def _start_page(self):
+        paths, self._queued = self._queued, []
+        if paths:
+            self._pool.start(_DecodeJob(paths, self.size, self._signals, self.store))
+
+    def invalidate(self, path):
+        """Forget a path whose file changed on disk (e.g. a re-rendered thumbnail)."""
+        path = (path or "").replace("\\", "/")
+        pix = self._cache.pop(path, None)
+        if pix is not None:
+            self._bytes -= self._pixmap_bytes(pix)
+        self._failed.discard(path)
+        if self.store is not None:
+            try:
+                self.store.forget(path)
+            except Exception as e:
+                print(f"[WARNING] Could not drop stored thumbnail {path}: {e}")
+
+    def cancel_pending(self):
+        """Drop decodes that have not started yet (the cards that wanted them are gone)."""
+        self._pool.clear()
+        self._queued = []
+        self._inflight.clear()
+
+    def clear(self):
+        self.cancel_pending()
+        self._cache.clear()
+        self._failed.clear()
+        self._bytes = 0
+
+    def _on_decoded(self, path, image):
+        self._inflight.discard(path)
+        if image.isNull():
+            self._failed.add(path)
+            return
+        pix = QPixmap.fromImage(image)
+        old = self._cache.pop(path, None)
+        if old is not None:
+            self._bytes -= self._pixmap_bytes(old)
+        self._cache[path] = pix
+        self._bytes += self._pixmap_bytes(pix)
+        while self._bytes > self.max_bytes and len(self._cache) > 1:
+            _old_path, evicted = self._cache.popitem(last=False)
+            self._bytes -= self._pixmap_bytes(evicted)
+        self.thumbnailReady.emit(path)
+
+    @staticmethod
+    def _pixmap_bytes(pix):
+        return pix.width() * pix.height() * max(1, pix.depth()) // 8
@@ -0,0 +1,159 @@
+import os
+
+import constants
+from material_library_cache import MaterialLibraryCache
+
+
+# ==========================
+# Thumbnail scenes
+# ==========================
+SCENE_DIR = os.path.join(constants.BASE_DIR, "etc", "3dfile").replace("\\", "/")
+THUMBNAIL_SIZE = 128
+
+# engine -> (scene file in etc/3dfile, renderer class). Every scene holds Sphere001 / Cylinder001.
+THUMBNAIL_SCENES = {
+    "octane":   ("Octane.max",   "Octane_Renderer"),
+    "redshift": ("RedShift.max", "Redshift_Renderer"),
+    "fstorm":   ("FStorm.max",   "FStorm_Renderer"),
+    "corona":   ("Corona.max",   "CoronaRenderer"),
+    "vray":     ("Vray.max",     "V_Ray_Renderer"),
+}
+# allowed on every engine, so they never pick an engine scene (rendered with Scanline)
+GENERIC_THUMBNAIL_CLASSES = {"physicalmaterial", "standard"}
+
+
+def thumbnail_output(mat_path, mat_name):
+    return os.path.join(os.path.dirname(mat_path), f"{mat_name}.jpg").replace("\\", "/")
+
+
+# ==========================
+# Thumbnail Renderer (pymxs)
+# ==========================
+class ThumbnailRenderer:
+    """
+    Renders material thumbnails into whatever scene is open in this Max
+    session. The engine scene stays loaded between calls, so a run of
+    materials for the same engine costs one loadMaxFile; only the material
+    on Sphere001 / Cylinder001 is swapped.
+
+    Used in-process by AssetBrowserWidget.render_thumbnail_batch and by
+    thumbnail_worker.py inside headless 3dsmaxbatch workers. Engine scenes
+    are loaded and the generic one is built on a reset scene, so in an
+    artist's session every call must sit between the caller's
+    holdMaxFile / fetchMaxFile. Materials come from a
+    MaterialLibraryCache (the browser's own when given), so a library
+    holding several materials is loaded once per run.
+    """
+
+    def __init__(self, rt, log=None, libraries=None):
+        self.rt = rt
+        self.log = log or (lambda message, level="INFO": print(message))
+        self.libraries = libraries if libraries is not None else MaterialLibraryCache(rt)
+        self._engine = None         # scene currently loaded ("" = generic scene)
+        self._targets = []
+        self._render_kwargs = {}
+
+    def render(self, engine, mat_path, mat_name):
+        """Render one thumbnail. Returns the jpg path, or None on failure."""
+        rt = self.rt
+        engine = engine or ""
+        if engine != self._engine:
+            self._engine = None
+            ready = self._load_scene(engine) if engine else self._build_generic_scene()
+            if not ready:
+                return None
+            self._engine = engine
+
+        mat = self._load_material(mat_path, mat_name)
+        if not mat:
+            return None
+        for node in self._targets:
+            node.material = mat
+
+        thumb_path = thumbnail_output(mat_path, mat_name)
+        rt.render(vfb=False, outputfile=thumb_path, **self._render_kwargs)
+        if not os.path.exists(thumb_path):
+            self.log(f"[ERROR] Render did not produce output: {thumb_path}", "error")
+            return None
+        self.log(f"[SUCCESS] Thumbnail rendered at: {thumb_path}")
+        return thumb_path
+
+    def _load_material(self, mat_path, mat_name):
+        mat = self.libraries.get(mat_path, mat_name)
+        if mat is not None:
+            return mat
+        self.log(f"[ERROR] Material '{mat_name}' not found in {mat_path}", "error")
+        return None
+
+    def _load_scene(self, engine):
+        rt = self.rt
+        scene_name, renderer_class = THUMBNAIL_SCENES[engine]
+        scene_file = os.path.join(SCENE_DIR, scene_name).replace("\\", "/")
+        if not os.path.isfile(scene_file):
+            self.log(f"[ERROR] Scene file does not exist: {scene_file}", "error")
+            return False
+
+        self.log(f"[INFO] Loading {engine} thumbnail scene: {scene_file}")
+        rt.loadMaxFile(scene_file, quiet=True)
+        try:
+            rt.renderers.current = getattr(rt, renderer_class)()
+        except Exception as e:
+            self.log(f"[WARNING] Could not set {renderer_class}: {e}", "warning")
+
+        sphere = rt.getNodeByName("Sphere001")
+        cylinder = rt.getNodeByName("Cylinder001")
+        if not (sphere and cylinder):
+            self.log("[ERROR] Scene objects not found: Sphere001 or Cylinder001", "error")
+            return False
+        self._targets = [sphere, cylinder]
+        self._render_kwargs = {"width": THUMBNAIL_SIZE, "height": THUMBNAIL_SIZE}
+        return True
+
+    def _build_generic_scene(self):
+        """
+        Physical / Standard / Matcap materials: procedural sphere + UV checker
+        plane, Scanline. Built on a reset scene once per run of generic
+        materials (render() keeps it until another engine is needed).
+        """
+        rt = self.rt
+        rt.resetMaxFile(rt.name("noPrompt"))
+        try:
+            rt.renderers.current = rt.Default_Scanline_Renderer()
+        except Exception as e:
+            self.log(f"[WARNING] Could not set Default Scanline Renderer: {e}", "warning")
+
+        rt.renderWidth = THUMBNAIL_SIZE
+        rt.renderHeight = THUMBNAIL_SIZE
+
+        sphere = rt.sphere(radius=25, segments=32, pos=rt.Point3(0, 0, 0))
+        uvwmod = rt.UVWMap()
+        uvwmod.mapping = rt.Name("spherical")
+        rt.addModifier(sphere, uvwmod)
+
+        bg = rt.plane(length=300, width=300)
+        bg.rotation = rt.eulerangles(-50, 0, 0)
+        bg.position = rt.Point3(0, 35, 0)
+        uv_texture_path = os.path.join(SCENE_DIR, "UVChecke.png").replace("\\", "/")
+        bg_mat = rt.standardMaterial() # StandardMaterial for Scanline compatibility
+        if os.path.exists(uv_texture_path):
+            tex = rt.Bitmaptexture()
+            tex.filename = uv_texture_path
+            bg_mat.diffuseMap = tex
+        else:
+            bg_mat.diffuse = rt.color(100, 100, 100) # Neutral grey
+        bg.material = bg_mat
+        uvw_bg = rt.UVWMap()
+        uvw_bg.mapping = rt.Name("planar")
+        rt.addModifier(bg, uvw_bg)
+
+        light = rt.omniLight()
+        light.position = rt.Point3(50, -80, 100)
+
+        cam = rt.freeCamera()
+        cam.position = rt.Point3(0, -70, 40)
+        cam.target = sphere
+        cam.depthOfField = False
+
+        self._targets = [sphere]
+        self._render_kwargs = {"camera": cam, "width": THUMBNAIL_SIZE, "height": THUMBNAIL_SIZE}
+        return True
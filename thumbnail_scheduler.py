@@ -0,0 +1,161 @@
+import os
+import heapq
+import itertools
+
+
+def _folder_of(mat_path):
+    return os.path.dirname(mat_path.replace("\\", "/"))
+
+
+# ==========================
+# Thumbnail Scheduler
+# ==========================
+class ThumbnailScheduler:
+    """
+    Priority queue of missing thumbnails, one entry per .mat path.
+
+    Priority (lowest first) = (not visible, not in current folder, -recency):
+    cards on screen first, then the rest of the open folder, newest request
+    first within a tier. Membership is a dict lookup; re-prioritising pushes
+    a new heap entry and the stale one is skipped on pop (lazy deletion).
+
+    Auto-queued entries (cards without a thumbnail) are dropped by
+    cancel_folders_except when the user navigates away; pinned entries
+    (explicit "Generate Thumbnail", matcap creation) are never cancelled.
+    """
+
+    TIERS = ((0, 0), (0, 1), (1, 0), (1, 1))
+
+    def __init__(self):
+        self._heap = []
+        self._entries = {}          # mat_path -> entry dict
+        self._counter = itertools.count()
+        self.current_folder = None
+        self.visible = set()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __bool__(self):
+        return bool(self._entries)
+
+    def __contains__(self, mat_path):
+        return mat_path in self._entries
+
+    def __iter__(self):
+        """(mat_path, mat_name) in no particular order."""
+        return ((path, entry["name"]) for path, entry in self._entries.items())
+
+    # --- Priority ---
+
+    def tier(self, mat_path):
+        entry = self._entries[mat_path]
+        return (0 if mat_path in self.visible else 1,
+                0 if entry["folder"] == self.current_folder else 1)
+
+    def _push_entry(self, mat_path):
+        entry = self._entries[mat_path]
+        entry["version"] = next(self._counter)     # unique, so a re-queued path never matches a stale item
+        heapq.heappush(self._heap, (self.tier(mat_path), -entry["seq"], entry["version"], mat_path))
+
+    # --- Queue ---
+
+    def push(self, mat_path, mat_name, pinned=False):
+        """Queue (or bump the recency of) one thumbnail."""
+        entry = self._entries.get(mat_path)
+        if entry is None:
+            entry = self._entries[mat_path] = {"name": mat_name, "folder": _folder_of(mat_path),
+                                               "pinned": pinned, "seq": 0, "version": 0}
+        entry["name"] = mat_name
+        entry["pinned"] = entry["pinned"] or pinned
+        entry["seq"] = next(self._counter)
+        self._push_entry(mat_path)
+
+    def pop(self):
+        """Best (mat_path, mat_name), or None when empty."""
+        while self._heap:
+            _tier, _seq, version, mat_path = heapq.heappop(self._heap)
+            entry = self._entries.get(mat_path)
+            if entry is None or entry["version"] != version:
+                continue
+            del self._entries[mat_path]
+            return mat_path, entry["name"]
+        return None
+
+    def take_tier(self, limit=None):
+        """Pop every entry of the best non-empty tier (up to limit), best first."""
+        batch = []
+        best = None
+        while self._heap and (limit is None or len(batch) < limit):
+            tier, _seq, version, mat_path = self._heap[0]
+            entry = self._entries.get(mat_path)
+            if entry is None or entry["version"] != version:
+                heapq.heappop(self._heap)
+                continue
+            if best is None:
+                best = tier
+            elif tier != best:
+                break
+            batch.append(self.pop())
+        return batch
+
+    def take_all(self):
+        """Pop everything as [(mat_path, mat_name, tier number, pinned)], best first."""
+        batch = []
+        while self._entries:
+            mat_path = self._peek_path()
+            tier = self.TIERS.index(self.tier(mat_path))
+            pinned = self._entries[mat_path]["pinned"]
+            batch.append(self.pop() + (tier, pinned))
+        return batch
+
+    def _peek_path(self):
+        while self._heap:
+            _tier, _seq, version, mat_path = self._heap[0]
+            entry = self._entries.get(mat_path)
+            if entry is not None and entry["version"] == version:
+                return mat_path
+            heapq.heappop(self._heap)
+        return None
+
+    def discard(self, mat_path):
+        self._entries.pop(mat_path, None)
+
+    def clear(self):
+        self._heap = []
+        self._entries = {}
+
+    # --- Context (what the user is looking at) ---
+
+    def set_current_folder(self, folder):
+        folder = (folder or "").replace("\\", "/").rstrip("/")
+        if folder == self.current_folder:
+            return
+        old = self.current_folder
+        self.current_folder = folder
+        for mat_path, entry in self._entries.items():
+            if entry["folder"] in (old, folder):
+                self._push_entry(mat_path)
+
+    def set_visible(self, mat_paths):
+        mat_paths = set(mat_paths)
+        changed = (self.visible ^ mat_paths) & self._entries.keys()
+        self.visible = mat_paths
+        for mat_path in changed:
+            self._push_entry(mat_path)
+
+    def cancel_folders_except(self, folder):
+        """Drop auto-queued entries outside folder. Returns the cancelled mat paths."""
+        folder = (folder or "").replace("\\", "/").rstrip("/")
+        cancelled = [path for path, entry in self._entries.items()
+                     if entry["folder"] != folder and not entry["pinned"]]
+        for path in cancelled:
+            del self._entries[path]
+        if len(self._heap) > 4 * len(self._entries) + 64:
+            self._compact()
+        return cancelled
+
+    def _compact(self):
+        self._heap = [item for item in self._heap
+                      if item[3] in self._entries and self._entries[item[3]]["version"] == item[2]]
+        heapq.heapify(self._heap)
@@ -0,0 +1,163 @@
+import os
+import sqlite3
+import hashlib
+import threading
+
+
+STORE_FILE_NAME = "thumbnails.db"
+TILE_SIZES = (64, 150, 256)     # pre-scaled variants kept per thumbnail (longest side, px)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sources (
+    path  TEXT PRIMARY KEY,
+    size  INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    hash  TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_sources_hash ON sources (hash);
+
+CREATE TABLE IF NOT EXISTS tiles (
+    hash    TEXT NOT NULL,
+    size_px INTEGER NOT NULL,
+    data    BLOB NOT NULL,
+    PRIMARY KEY (hash, size_px)
+);
+"""
+
+
+def _norm(path):
+    return path.replace("\\", "/") if path else path
+
+
+def default_store_path():
+    """Per-user, local disk: %LOCALAPPDATA%/MaterialAssetsBrowser/thumbnails.db (~/.cache elsewhere)."""
+    base = os.environ.get("LOCALAPPDATA") or os.path.join(os.path.expanduser("~"), ".cache")
+    return _norm(os.path.join(base, "MaterialAssetsBrowser", STORE_FILE_NAME))
+
+
+def content_hash(data):
+    return hashlib.sha1(data).hexdigest()
+
+
+def tile_size_for(width, height):
+    """Smallest stored variant that covers a width x height box."""
+    need = max(width, height)
+    for size_px in TILE_SIZES:
+        if size_px >= need:
+            return size_px
+    return TILE_SIZES[-1]
+
+
+# ==========================
+# Thumbnail Store (SQLite, local)
+# ==========================
+class ThumbnailStore:
+    """
+    Local cache of encoded, pre-scaled thumbnail tiles.
+
+    sources maps a thumbnail file (path, size, mtime) to the SHA-1 of its
+    bytes; tiles holds one encoded image per (hash, size_px). Identical
+    renders share tiles, and a page of cards is one indexed query
+    (read_page) instead of one SMB read per sidecar .jpg.
+    Lives on the local disk, so WAL is fine here (unlike MaterialIndex).
+    """
+
+    def __init__(self, db_path=None):
+        self.db_path = _norm(db_path or default_store_path())
+        self._lock = threading.RLock()
+        self.conn = None
+        self.open()
+
+    def open(self):
+        with self._lock:
+            if self.conn is not None:
+                return
+            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+            self.conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+            self.conn.execute("PRAGMA journal_mode = WAL")
+            self.conn.execute("PRAGMA synchronous = NORMAL")
+            self.conn.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock:
+            if self.conn is not None:
+                self.conn.close()
+                self.conn = None
+
+    # --- Read ---
+
+    def read_page(self, paths, size_px):
+        """{path: (encoded bytes, size, mtime)} for every path with a stored tile, in one query."""
+        paths = [_norm(p) for p in paths]
+        found = {}
+        with self._lock:
+            # stay well below SQLITE_MAX_VARIABLE_NUMBER
+            for start in range(0, len(paths), 500):
+                chunk = paths[start:start + 500]
+                marks = ",".join("?" * len(chunk))
+                rows = self.conn.execute(
+                    "SELECT s.path, s.size, s.mtime, t.data FROM sources s "
+                    "JOIN tiles t ON t.hash = s.hash AND t.size_px = ? "
+                    f"WHERE s.path IN ({marks})",
+                    [size_px] + chunk,
+                ).fetchall()
+                for path, size, mtime, data in rows:
+                    found[path] = (bytes(data), size, mtime)
+        return found
+
+    def source_state(self, path):
+        """(size, mtime) the stored tiles were made from, or None."""
+        with self._lock:
+            row = self.conn.execute("SELECT size, mtime FROM sources WHERE path = ?", (_norm(path),)).fetchone()
+        return (row[0], row[1]) if row else None
+
+    # --- Write ---
+
+    def put(self, path, size, mtime, digest, tiles):
+        """Store {size_px: encoded bytes} for a source file; tiles already stored under digest are kept."""
+        path = _norm(path)
+        with self._lock:
+            self.conn.execute("BEGIN")
+            try:
+                old = self.conn.execute("SELECT hash FROM sources WHERE path = ?", (path,)).fetchone()
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO sources (path, size, mtime, hash) VALUES (?, ?, ?, ?)",
+                    (path, size, mtime, digest),
+                )
+                self.conn.executemany(
+                    "INSERT OR IGNORE INTO tiles (hash, size_px, data) VALUES (?, ?, ?)",
+                    [(digest, size_px, sqlite3.Binary(data)) for size_px, data in tiles.items()],
+                )
+                if old and old[0] != digest:
+                    self._drop_orphan(old[0])
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+
+    def has_tiles(self, digest):
+        with self._lock:
+            return self.conn.execute("SELECT 1 FROM tiles WHERE hash = ? LIMIT 1", (digest,)).fetchone() is not None
+
+    def forget(self, path):
+        """Drop a source (its file was re-rendered or deleted)."""
+        path = _norm(path)
+        with self._lock:
+            row = self.conn.execute("SELECT hash FROM sources WHERE path = ?", (path,)).fetchone()
+            if not row:
+                return
+            self.conn.execute("DELETE FROM sources WHERE path = ?", (path,))
+            self._drop_orphan(row[0])
+
+    def _drop_orphan(self, digest):
+        still_used = self.conn.execute("SELECT 1 FROM sources WHERE hash = ? LIMIT 1", (digest,)).fetchone()
+        if not still_used:
+            self.conn.execute("DELETE FROM tiles WHERE hash = ?", (digest,))
+
+
+def open_thumbnail_store(db_path=None):
+    try:
+        return ThumbnailStore(db_path)
+    except Exception as e:
+        print(f"[WARNING] Thumbnail store unavailable, decoding from source files: {e}")
+        return None
@@ -0,0 +1,28 @@
+# ==========================
+# Headless thumbnail worker
+# ==========================
+# Run by render_farm.RenderFarm as:  3dsmaxbatch.exe thumbnail_worker.py
+# Pulls jobs from $MAB_FARM_DIR until none are left; see render_farm.FarmWorker.
+import os
+import sys
+
+plugin_dir = os.environ.get("MAB_PLUGIN_DIR") or os.path.dirname(os.path.abspath(__file__))
+if plugin_dir not in sys.path:
+    sys.path.insert(0, plugin_dir)
+
+from pymxs import runtime as rt
+
+from render_farm import FarmWorker
+from thumbnail_renderer import ThumbnailRenderer
+
+
+def main():
+    worker = FarmWorker.from_env()
+    renderer = ThumbnailRenderer(rt)
+    # jobs are sorted by engine, so each worker loads an engine scene about once
+    done = worker.run(lambda job: renderer.render(job["engine"], job["mat_path"], job["mat_name"]))
+    print(f"[SUCCESS] Worker {worker.worker_id} rendered {done} thumbnail(s)")
+
+
+if __name__ == "__main__":
+    main()
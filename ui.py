@@ -1,13 +1,26 @@
 from logic import *
 import shutil
-import ctypes
-from ctypes import wintypes
 import style
-from PySide6.QtCore import Qt, QSize, QDir
+from PySide6.QtCore import Qt, QSize, QDir, QPoint, QModelIndex, QPersistentModelIndex, QItemSelectionModel
 from PySide6.QtGui import QColor, QCursor
-from PySide6.QtWidgets import QGroupBox, QSplitter, QTreeView, QLabel, QListWidgetItem
+from PySide6.QtWidgets import QGroupBox, QSplitter, QTreeView, QLabel, QListView
 import constants
 from TagManagerDialog import TagManagerDialog
+from material_index import open_material_index
+from mat_reader import get_mat_header
+from engine_lookup import EngineLookup
+from material_model import MaterialCardModel, MaterialCardDelegate, make_row, NameRole, ICON_SIZE
+from thumbnail_cache import ThumbnailService
+from thumbnail_store import open_thumbnail_store
+from thumbnail_renderer import ThumbnailRenderer, THUMBNAIL_SCENES, GENERIC_THUMBNAIL_CLASSES, thumbnail_output
+from thumbnail_scheduler import ThumbnailScheduler
+from material_search import SearchIndex
+from search_pipeline import SearchPipeline
+from library_watcher import LibraryWatcher, DEFAULT_POLL_SECONDS
+from material_library_cache import MaterialLibraryCache, DEFAULT_MAX_LIBRARIES
+from drop_targets import DropTargetResolver
+from drag_platform import DragSession, DRAG_DROP
+from folder_summary import FolderSummaries, UNKNOWN_SUMMARY
 
 try:
     from PySide6.QtGui import QFileSystemModel
@@ -17,42 +30,8 @@ except ImportError:
 
 
 # ==========================
-# Drag & Drop — Win32 helpers (physical pixels, DPI-safe)
-# ==========================
-def _phys_cursor_pos():
-    """Win32 physical cursor position — not affected by DPI scaling."""
-    pt = wintypes.POINT()
-    ctypes.windll.user32.GetCursorPos(ctypes.byref(pt))
-    return pt.x, pt.y
-
-def _hwnd_at(phys_x, phys_y):
-    return ctypes.windll.user32.WindowFromPoint(wintypes.POINT(phys_x, phys_y))
-
-def _is_max_viewport(hwnd):
-    """True if hwnd is anywhere inside the 3ds Max main window."""
-    try:
-        from qtmax import GetQMaxMainWindow
-        max_hwnd = int(GetQMaxMainWindow().winId())
-        check = hwnd
-        for _ in range(25):
-            if check == max_hwnd:
-                return True
-            parent = ctypes.windll.user32.GetParent(check)
-            if not parent:
-                break
-            check = parent
-        return False
-    except Exception:
-        buf = ctypes.create_unicode_buffer(256)
-        ctypes.windll.user32.GetClassNameW(hwnd, buf, 256)
-        return any(k in buf.value for k in ["ViewExWnd", "AfxFrameOrView"])
-
-def _screen_to_local(hwnd, phys_x, phys_y):
-    """Physical screen coords → client-area coords of hwnd (DPI-safe via ScreenToClient)."""
-    pt = wintypes.POINT(phys_x, phys_y)
-    ctypes.windll.user32.ScreenToClient(hwnd, ctypes.byref(pt))
-    return pt.x, pt.y
-
+# Drag & Drop — cursor helpers (Win32 side lives in drag_platform)
+# ==========================
 def _logical_cursor_pos():
     """Qt logical cursor position — used only for overlay positioning."""
     p = QCursor.pos()
@@ -85,12 +64,14 @@ class DragOverlay(QLabel):
 # ==========================
 # Draggable Material List
 # ==========================
-class DraggableMaterialList(QListWidget):
+class DraggableMaterialList(QListView):
     """
-    QListWidget with drag-to-viewport support.
+    QListView (MaterialCardModel + MaterialCardDelegate) with drag-to-viewport support.
 
     Uses QTimer polling + Win32 GetAsyncKeyState instead of grabMouse(),
-    so it never blocks 3ds Max's own event loop.
+    so it never blocks 3ds Max's own event loop. The drag itself (hit-test,
+    hover pick, drop target) is a drag_platform.DragSession; this class only
+    draws the overlay and cursor and reports the result.
 
     Coordinate strategy
     -------------------
@@ -103,7 +84,7 @@ class DraggableMaterialList(QListWidget):
 
     DRAG_THRESHOLD = 8   # logical px before drag starts
     POLL_MS        = 16  # timer interval during drag (~60 fps)
-    VK_LBUTTON     = 0x01
+    FETCH_MS       = 30  # settle time after scroll / resize before resolving cards
 
     def __init__(self, browser, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -113,16 +94,53 @@ class DraggableMaterialList(QListWidget):
         self._dragging      = False
         self._cursor_set    = False
         self._overlay       = None
+        self._session       = DragSession(on_hover=self._hover_changed)
         self._poll          = QTimer(self)
         self._poll.timeout.connect(self._tick)
+        self._fetch_timer   = QTimer(self)
+        self._fetch_timer.setSingleShot(True)
+        self._fetch_timer.timeout.connect(self.fetch_visible)
+        self.verticalScrollBar().valueChanged.connect(self.schedule_fetch)
+
+    # --- Viewport-driven lazy loading ---
+
+    def schedule_fetch(self, *_args):
+        self._fetch_timer.start(self.FETCH_MS)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.schedule_fetch()
+
+    def visible_rows(self):
+        """(first visible row, cards per viewport page)."""
+        grid = self.gridSize()
+        cell_w, cell_h = max(1, grid.width()), max(1, grid.height())
+        rect = self.viewport().rect()
+        columns = max(1, rect.width() // cell_w)
+        page = columns * (rect.height() // cell_h + 2)
+        first = self.indexAt(QPoint(cell_w // 2, cell_h // 2))
+        if first.isValid():
+            return first.row(), page
+        return (self.verticalScrollBar().value() // cell_h) * columns, page
+
+    def fetch_visible(self):
+        """Resolve pending cards where the user is looking, not just at the bottom."""
+        model = self.model()
+        if model is None:
+            return
+        first, page = self.visible_rows()
+        model.set_visible_range(first, page)
+        if model.canFetchMore(QModelIndex()):
+            model.fetchMore(QModelIndex())
+        self.browser.visible_cards_changed(first, page)
 
     # --- Qt mouse events — only used to START the drag ---
 
     def mousePressEvent(self, event):
         if event.button() == Qt.LeftButton:
-            item = self.itemAt(event.pos())
-            if item and "::" in str(item.data(Qt.UserRole) or ""):
-                self._drag_item  = item
+            index = self.indexAt(event.pos())
+            if index.isValid() and "::" in str(index.data(Qt.UserRole) or ""):
+                self._drag_item  = QPersistentModelIndex(index)
                 self._drag_start = QCursor.pos()
         super().mousePressEvent(event)
 
@@ -157,17 +175,29 @@ class DraggableMaterialList(QListWidget):
         self._overlay.move(lx + 14, ly + 14)
         self._overlay.show()
         QApplication.setOverrideCursor(Qt.DragCopyCursor)
+        self._session.begin(self.browser.drop_targets)
+        # load the library and the scene bounds right after the overlay shows, not on mouse-up
+        QTimer.singleShot(0, self._prefetch)
         self._poll.start(self.POLL_MS)
 
+    def _prefetch(self):
+        if not self._dragging:
+            return
+        mat_path, mat_name = self._drag_item.data(Qt.UserRole).split("::")
+        try:
+            self._session.material = self.browser.library_cache.get(mat_path.replace("\\", "/"), mat_name)
+            self.browser.drop_targets.sync()
+        except Exception as e:
+            print(f"[WARNING] Drag prefetch failed: {e}")
+
     def _tick(self):
         """
         Runs every POLL_MS ms.
         Reads Win32 async key state — works even when cursor is outside Qt.
         """
-        button_held = ctypes.windll.user32.GetAsyncKeyState(self.VK_LBUTTON) & 0x8000
-        if not button_held:
-            px, py = _phys_cursor_pos()
-            self._drop(px, py)
+        event, result = self._session.tick()
+        if event == DRAG_DROP:
+            self._drop(*result)
             self._end()
             return
 
@@ -175,72 +205,35 @@ class DraggableMaterialList(QListWidget):
         lx, ly = _logical_cursor_pos()
         if self._overlay:
             self._overlay.move(lx + 14, ly + 14)
-
-        # Update cursor shape (physical coords for accurate Win32 hit-test)
-        px, py = _phys_cursor_pos()
-        over_max = _is_max_viewport(_hwnd_at(px, py))
         QApplication.changeOverrideCursor(
-            Qt.DragCopyCursor if over_max else Qt.ForbiddenCursor
+            Qt.DragCopyCursor if result else Qt.ForbiddenCursor
         )
 
-    def _drop(self, phys_x, phys_y):
-        hwnd = _hwnd_at(phys_x, phys_y)
-        if not hwnd or not _is_max_viewport(hwnd):
+    def _hover_changed(self, node):
+        if self._overlay and self._drag_item:
+            mat_name = self._drag_item.data(Qt.UserRole).split("::")[-1]
+            self._overlay.setText(f"  {mat_name}  →  {node.name}  " if node is not None else f"  {mat_name}  ")
+            self._overlay.adjustSize()
+
+    def _drop(self, node, status):
+        if status == "NOT_OVER_MAX":
             self.browser.show_status_message(
                 "Drop cancelled — cursor not over a 3ds Max viewport.", "orange"
             )
             return
 
-        data     = self._drag_item.data(Qt.UserRole)
-        mat_path, mat_name = data.split("::")
-        mat_path = mat_path.replace("\\", "/")
-
-        # Physical viewport-local coords → what mapScreenToWorldRay expects
-        vp_x, vp_y = _screen_to_local(hwnd, phys_x, phys_y)
-        self._assign(mat_path, mat_name, int(vp_x), int(vp_y))
-
-    def _assign(self, mat_path, mat_name, vp_x, vp_y):
+        mat_path, mat_name = self._drag_item.data(Qt.UserRole).split("::")
         try:
-            from pymxs import runtime as rt
-            ms = f'''(
-                -- Load material
-                local lib = loadTempMaterialLibrary @"{mat_path}"
-                local theMat = undefined
-                for i = 1 to lib.count do (
-                    if lib[i].name == "{mat_name}" then ( theMat = lib[i]; exit )
-                )
-                if theMat == undefined then (
-                    "MAT_NOT_FOUND"
-                ) else (
-                    local ray = mapScreenToWorldRay [{vp_x}, {vp_y}]
-                    if ray == undefined then (
-                        "NO_RAY"
-                    ) else (
-                        -- Per-object ray test: avoids intersectRayScene format issues
-                        local closest = undefined
-                        local closestDist = 1e30
-                        for obj in geometry do (
-                            try (
-                                local h = intersectRay obj ray
-                                if h != undefined then (
-                                    local d = distance ray.pos h.pos
-                                    if d < closestDist then (
-                                        closestDist = d
-                                        closest = obj
-                                    )
-                                )
-                            ) catch ()
-                        )
-                        if closest != undefined then (
-                            closest.material = theMat
-                            closest.name
-                        ) else (
-                            "NO_HIT"
-                        )
-                    )
-                )
-            )'''
-            result = rt.execute(ms)
+            the_mat = self._session.material
+            if the_mat is None:
+                the_mat = self.browser.library_cache.get(mat_path.replace("\\", "/"), mat_name)
+            if the_mat is None:
+                result = "MAT_NOT_FOUND"
+            elif node is not None:
+                node.material = the_mat
+                result = str(node.name)
+            else:
+                result = status
             msgs = {
                 "MAT_NOT_FOUND": (f"Material '{mat_name}' not found in file.", "red"),
                 "NO_RAY":        ("Could not build a ray — make sure a viewport is active.", "red"),
@@ -256,6 +249,7 @@ class DraggableMaterialList(QListWidget):
 
     def _end(self):
         self._poll.stop()
+        self._session.end()
         if self._overlay:
             self._overlay.close()
             self._overlay = None
@@ -280,13 +274,15 @@ class AssetBrowserWidget(QWidget):
         from collections import deque
 
         # Thumbnail queue
-        self.thumbnail_queue = deque()
+        self.thumbnail_queue = ThumbnailScheduler()     # visible > current folder > recency
+        self.thumbnail_failed = set()       # mat paths whose render failed; not re-queued on reload
+        self.render_farm = None             # RenderFarm while headless workers are rendering
+        self.farm_auto_jobs = set()         # farm job ids that may be withdrawn on folder change
         self.thumbnail_running = False
         self.thumbnail_processing = False
         self.render_queue = deque()
         self.is_rendering = False
         self._move_in_progress = False
-        self.material_class_cache = {}
         self.context_menu = None
         
         self.config = load_config()
@@ -343,6 +339,8 @@ class AssetBrowserWidget(QWidget):
         current_dir = os.path.dirname(inspect.getfile(inspect.currentframe()))
         self.icon_path = os.path.join(current_dir, "etc", "icon")
         self.icon_path = self.icon_path.replace("\\", "/")
+        default_folder_icon = os.path.join(self.icon_path, "folder.ico").replace("\\", "/")
+        self.default_folder_icon = default_folder_icon if os.path.exists(default_folder_icon) else ""
         print("[DEBUG] Icon path:", self.icon_path)
         print("[DEBUG] Folder exists:", os.path.exists(self.icon_path))
 
@@ -471,23 +469,43 @@ class AssetBrowserWidget(QWidget):
         self.search_bar = QLineEdit()
         self.search_bar.setPlaceholderText("Search materials...")
         self.search_bar.textChanged.connect(self.filter_items)
+        # opt-in relevance search; off = exact name / tag matches A-Z
+        self.btn_ranked_search = QPushButton("Fuzzy")
+        self.btn_ranked_search.setToolTip("Rank results by relevance and tolerate typos")
+        self.btn_ranked_search.setCheckable(True)
+        self.btn_ranked_search.setChecked(self.config.get("search_mode", "name") == "ranked")
+        self.btn_ranked_search.clicked.connect(self.toggle_ranked_search)
+        search_layout = QHBoxLayout()
+        search_layout.setSpacing(6)
+        search_layout.addWidget(self.search_bar, 1)
+        search_layout.addWidget(self.btn_ranked_search)
         tools_layout.addLayout(top_tools_layout)
         self.main_layout.addWidget(self.group_tools)
 
-        # --- Main asset list ---
+        # --- Main asset list (model/delegate: only visible cards are painted) ---
+        self.thumbnails = ThumbnailService(ICON_SIZE, store=open_thumbnail_store(), parent=self)
+        self.card_model = MaterialCardModel(self.thumbnails, self)
         self.asset_list = DraggableMaterialList(self)
-        self.asset_list.setViewMode(QListWidget.IconMode)
+        self.asset_list.setModel(self.card_model)
+        self.asset_list.setItemDelegate(MaterialCardDelegate(self.asset_list))
+        self.asset_list.setViewMode(QListView.IconMode)
         self.asset_list.setGridSize(QSize(180, 260))
         self.asset_list.setIconSize(QSize(150, 140))
         self.asset_list.setSpacing(8)
         self.asset_list.setWordWrap(True)
-        self.asset_list.setResizeMode(QListWidget.Adjust) 
-        self.asset_list.setMovement(QListWidget.Static)
+        self.asset_list.setResizeMode(QListView.Adjust) 
+        self.asset_list.setMovement(QListView.Static)
+        self.asset_list.setUniformItemSizes(True)
+        self.asset_list.setLayoutMode(QListView.Batched)
+        self.asset_list.setBatchSize(500)
+        self.asset_list.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+        self.card_model.set_resolver(self.resolve_material_row)
+        self.card_model.rowsResolved.connect(self.report_rows_resolved)
 
         
         self.asset_list.setContextMenuPolicy(Qt.CustomContextMenu)
         self.asset_list.customContextMenuRequested.connect(self.show_context_menu)
-        self.asset_list.itemDoubleClicked.connect(self.handle_double_click)
+        self.asset_list.doubleClicked.connect(self.handle_double_click)
         self.asset_list.setSelectionMode(QAbstractItemView.ExtendedSelection)
         self.asset_list.setSelectionBehavior(QAbstractItemView.SelectItems)
         self.asset_list.setDragEnabled(False)
@@ -589,6 +607,8 @@ class AssetBrowserWidget(QWidget):
                 "physicalmaterial", "standard", "raytrace", "architectural", 
                 "MaterialX_Material", "OpenPBR_Material", "materialx material", "materialxmat"
             ]}
+        # class -> engines / thumbnail scene, compiled once; results are stored per material in the index
+        self.engine_lookup = EngineLookup(self.allowed_classes, THUMBNAIL_SCENES, GENERIC_THUMBNAIL_CLASSES)
             
 
         
@@ -596,24 +616,46 @@ class AssetBrowserWidget(QWidget):
        
         # --- Main layout ---
         self.main_layout.addWidget(self.path_display)
-        self.main_layout.addWidget(self.search_bar)
+        self.main_layout.addLayout(search_layout)
         #self.main_layout.addWidget(scroll)
         self.main_layout.addWidget(self.splitter, 1)
         self.main_layout.addWidget(self.status_label)
-        # --- loaderunit ---
-        from loader_utils import BatchLoader
-        self.loader = BatchLoader(self, items_per_page=10)
-        self.asset_list.verticalScrollBar().valueChanged.connect(self.handle_lazy_scroll)
-        
-        # --- cache search ---
-        self.material_cache = []
+        # --- material index (SQLite) ---
+        self.material_index = open_material_index(self.root_path)
+        self.material_index.set_engine_lookup(self.engine_lookup)
+        # PBR / MaterialX flags and icons of folder cards, kept in the index per directory mtime
+        self.folder_summaries = FolderSummaries(self.material_index)
+        self.search_index = SearchIndex()
+        # resolved .mat libraries, so repeat assigns / drops / renders skip loadTempMaterialLibrary
+        self.library_cache = MaterialLibraryCache(
+            max_libraries=self.config.get("library_cache_size", DEFAULT_MAX_LIBRARIES))
+        # {mat_path: mtime} of libraries already found to hold one material
+        self.unsplit_libraries = {}
+        # node bounds for drag-and-drop picking, kept current by scene callbacks once first used
+        self.drop_targets = DropTargetResolver()
+        # typing is debounced; queries run on a worker and stream ranked pages into card_model
+        self.search_pipeline = SearchPipeline(self.search_index, parent=self)
+        self.search_pipeline.rowsStarted.connect(self.card_model.set_rows)
+        self.search_pipeline.rowsAppended.connect(self.card_model.append_rows)
+        self.search_pipeline.finished.connect(self.report_search_results)
         self.build_cache() 
+        # materials other artists drop on the share show up without Refresh
+        self.library_watcher = LibraryWatcher(
+            self.material_index, self.root_path,
+            self.config.get("watch_interval", DEFAULT_POLL_SECONDS), parent=self)
+        self.library_watcher.changesReady.connect(self.apply_library_changes)
 
         self.setLayout(self.main_layout)
         self.load_folder(self.current_path)
 # ==========================
 # Tree View Controls
 # ========================== 
+    def toggle_ranked_search(self):
+        self.config["search_mode"] = "ranked" if self.btn_ranked_search.isChecked() else "name"
+        save_config(self.config)
+        if self.search_bar.text().strip():
+            self.filter_items(self.search_bar.text())
+
     def toggle_tree_view(self):
         if self.tree_view.isVisible():
             self.tree_view.hide()
@@ -660,60 +702,110 @@ class AssetBrowserWidget(QWidget):
 # Build Material Cache
 # ========================== 
     def build_cache(self, force_rescan=False):
-        from logic import load_material_db, save_material_db
-        import os
+        from material_scanner import IncrementalScanner
         
         self.show_status_message("Checking material database...", "orange")
         
-        # check Json if exist
+        # index already populated
         if not force_rescan:
-            loaded_db = load_material_db(self.root_path)
-            if loaded_db and len(loaded_db) > 0:
-                self.material_cache = loaded_db
-                self.show_status_message(f"Loaded {len(self.material_cache)} materials from cache.", "green")
+            count = self.material_index.count()
+            if count > 0:
+                self.rebuild_search_index()
+                self.show_status_message(f"Loaded {count} materials from index.", "green")
                 return
             
-        self.show_status_message("Scanning folders and building database... Please wait.", "orange")
-        self.material_cache = []
+        self.show_status_message("Scanning folders and updating database... Please wait.", "orange")
         
         try:
-            for root, dirs, files in os.walk(self.root_path):
-                for file in files:
-                    if file.lower().endswith(".mat"):
-                        mat_name = os.path.splitext(file)[0]
-                        mat_path = os.path.join(root, file).replace("\\", "/")
-                        thumbnail_path = os.path.join(root, f"{mat_name}.jpg").replace("\\", "/")
-                        
-                        
-                        existing_tags = []
-                        if force_rescan:
-                            old_db = load_material_db(self.root_path)
-                            if old_db:
-                                old_item = next((i for i in old_db if i["mat_path"] == mat_path and i["name"] == mat_name), None)
-                                if old_item:
-                                    existing_tags = old_item.get("tags", [])
-
-                        self.material_cache.append({
-                            "name": mat_name,
-                            "lower_name": mat_name.lower(),
-                            "mat_path": mat_path,
-                            "thumbnail_path": thumbnail_path,
-                            "tags": existing_tags
-                        })
-            
-            save_material_db(self.root_path, self.material_cache)
-            self.show_status_message(f"Database built and saved: {len(self.material_cache)} materials.", "green")
+            import threading
+
+            # only directories whose mtime changed are listed again; tags are kept
+            scanner = IncrementalScanner(self.material_index, self.root_path)
+            outcome = {}
+
+            def run_scan():
+                try:
+                    outcome["result"] = scanner.scan()
+                except Exception as e:
+                    outcome["error"] = e
+
+            worker = threading.Thread(target=run_scan, name="material-scan", daemon=True)
+            worker.start()
+
+            # crawl runs off the GUI thread; keep Max responsive and show progress
+            dialog = None
+            while worker.is_alive():
+                worker.join(0.05)
+                if dialog is None and worker.is_alive():
+                    dialog = ScanProgressDialog(self)
+                    dialog.show()
+                if dialog is not None:
+                    dialog.update_progress(scanner.result)
+                    if dialog.cancel_requested and not scanner.cancelled:
+                        scanner.cancel()
+                QApplication.processEvents()
+            if dialog is not None:
+                dialog.close()
+
+            if "error" in outcome:
+                raise outcome["error"]
+
+            result = outcome["result"]
+            print(f"[DEBUG] Rescan: {result}")
+            self.rebuild_search_index()
+            if result.cancelled:
+                self.show_status_message(
+                    f"Scan cancelled: {self.material_index.count()} materials indexed so far.", "orange")
+            else:
+                self.show_status_message(
+                    f"Database updated: {self.material_index.count()} materials "
+                    f"(+{result.added} / -{result.removed}).", "green")
             
         except Exception as e:
             print(f"[ERROR] Failed to build cache: {e}")
 
+# ==========================
+# Search Index (in memory)
+# ==========================
+    def rebuild_search_index(self):
+        index = SearchIndex()
+        try:
+            self.add_search_documents(self.material_index.search_documents(), index)
+        except Exception as e:
+            print(f"[ERROR] Failed to build search index: {e}")
+        self.search_index = index
+        self.search_pipeline.set_index(index)
+        print(f"[DEBUG] Search index: {len(index)} materials")
+
+    def refresh_search_entry(self, mat_path, mat_name=None, doc_id=None):
+        """
+        Re-read materials from the SQLite index into the search index (rename / move / retag).
+        mat_name None = every material of the .mat file, replacing what the search index had for it.
+        """
+        if doc_id is not None:
+            self.search_index.remove(doc_id)
+        if mat_name is None:
+            self.search_index.remove_path(mat_path.replace("\\", "/"))
+        self.add_search_documents(self.material_index.search_documents(mat_path, mat_name))
+
+    def add_search_documents(self, docs, index=None):
+        index = index if index is not None else self.search_index
+        for doc in docs:
+            index.add(doc["id"], doc["name"], doc["tags"], doc["folder"], doc["mat_class"],
+                      payload=doc, path=doc["mat_path"])
+
 # ==========================
 # Material class allowed
 # ========================== 
     def is_material_class_allowed(self, mat, engine=None):
         try:
-            from pymxs import runtime as rt
             engine = engine or self.active_render_engine.lower()
+
+            # .mat path: indexed lookup of the class stored during scanning
+            if isinstance(mat, str):
+                return self.material_index.is_class_allowed(mat, engine)
+
+            from pymxs import runtime as rt
             mat_class_obj = rt.classOf(mat)
             mat_class = str(mat_class_obj.name).lower() if hasattr(mat_class_obj, "name") else str(mat_class_obj).lower()
             allowed = [cls.lower() for cls in self.allowed_classes.get(engine, [])]
@@ -721,7 +813,7 @@ class AssetBrowserWidget(QWidget):
             if engine == "arnold":
                 return any(cls in mat_class for cls in allowed)
             else:
-                return mat_class in allowed
+                return self.engine_lookup.allows_class(mat_class, engine)
 
         except Exception as e:
             print(f"[FILTER ERROR] Failed to check material class: {e}")
@@ -749,8 +841,8 @@ class AssetBrowserWidget(QWidget):
 # Assign with Butten 
 # ==========================
     def assign_selected_material(self):
-        selected_item = self.asset_list.currentItem()
-        if not selected_item:
+        selected_item = self.asset_list.currentIndex()
+        if not selected_item.isValid():
             self.show_status_message("No item selected.", "red")
             return
 
@@ -774,19 +866,7 @@ class AssetBrowserWidget(QWidget):
             print(f"[DEBUG] Assigning material: {mat_name} from {mat_path}")
             from pymxs import runtime as rt
 
-            lib = rt.loadTempMaterialLibrary(mat_path)
-            if not lib:
-                print(f"[ERROR] Cannot load material library: {mat_path}")
-                return
-
-            print(f"[DEBUG] Material library loaded. Count: {lib.count}")
-            target_mat = None
-            for i in range(lib.count):
-                print(f"[DEBUG] Checking material: {lib[i].name}")
-                if lib[i].name == mat_name:
-                    target_mat = lib[i]
-                    break
-
+            target_mat = self.library_cache.get(mat_path, mat_name)
             if not target_mat:
                 print(f"[ERROR] Material '{mat_name}' not found in library.")
                 return
@@ -811,25 +891,15 @@ class AssetBrowserWidget(QWidget):
 # Update Card Selection
 # ==========================
     def update_card_selection(self):
-        
-        for i in range(self.asset_list.count()):
-            item = self.asset_list.item(i)
-            card = self.asset_list.itemWidget(item)
-            if card:
-                
-                is_selected = item.isSelected()
-                card.setProperty("selected", "true" if is_selected else "false")
-                card.style().unpolish(card)
-                card.style().polish(card)        
+        # selection is painted by MaterialCardDelegate; just repaint visible cards
+        self.asset_list.viewport().update()
 # ==========================
 # Move selected materials to folder (multi-material safe)
 # ==========================
     def move_selected_materials_to_folder(self):
-        import os
-        import shutil
         from PySide6.QtWidgets import QFileDialog, QMessageBox
 
-        items = self.asset_list.selectedItems()
+        items = self.selected_materials()
         if not items:
             return
 
@@ -838,43 +908,115 @@ class AssetBrowserWidget(QWidget):
             QMessageBox.warning(self, "Invalid Destination", "You can only move items inside the material root folder.")
             return
 
-        for item in items:
-            data = item.data(Qt.UserRole)
-            if not data or "::" not in data:
-                continue
+        from bulk_ops import move_materials, library_counts
+        from pymxs import runtime as rt
 
-            mat_path, mat_name = data.split("::")
+        counts = library_counts((p for p, _n in items), self.material_index, self.library_cache)
+        result = move_materials(rt, items, destination, counts)
+        self.apply_bulk_result(result)
 
-            # Real File [mat_name].mat
-            actual_file = os.path.join(os.path.dirname(mat_path), f"{mat_name}.mat")
+# ==========================
+# Bulk material operations (selection)
+# ==========================
+    def selected_materials(self):
+        """[(mat_path, mat_name)] of the selected material cards, in grid order."""
+        items = []
+        for index in sorted(self.asset_list.selectedIndexes(), key=lambda i: i.row()):
+            data = index.data(Qt.UserRole)
+            if data and "::" in data and data.split("::")[0].lower().endswith(".mat"):
+                mat_path, mat_name = data.split("::")
+                items.append((mat_path.replace("\\", "/"), mat_name))
+        return items
+
+    def delete_selected_materials(self):
+        items = self.selected_materials()
+        if not items:
+            return
+        confirm = QMessageBox.question(
+            self, "Delete Materials", f"Delete {len(items)} selected material(s) and their thumbnails?",
+            QMessageBox.Yes | QMessageBox.No)
+        if confirm != QMessageBox.Yes:
+            return
 
-            if not os.path.exists(actual_file):
-                print(f"[WARNING] File not found: {actual_file}")
-                continue
+        from bulk_ops import delete_materials, library_counts
+        from pymxs import runtime as rt
 
-            try:
-                destination_file = os.path.join(destination, f"{mat_name}.mat")
-                shutil.move(actual_file, destination_file)
-                print(f"[MOVE] {mat_name} ? {destination}")
+        counts = library_counts((p for p, _n in items), self.material_index, self.library_cache)
+        self.apply_bulk_result(delete_materials(rt, items, counts))
 
-                # --- Move thumbnail if exists ---
-                mat_dir = os.path.dirname(mat_path)
-                found_thumb = False
-                for file in os.listdir(mat_dir):
-                    if file.lower().endswith(".jpg") and file.startswith(mat_name):
-                        thumb_src = os.path.join(mat_dir, file)
-                        thumb_dest = os.path.join(destination, file)
-                        shutil.move(thumb_src, thumb_dest)
-                        print(f"[THUMB] Moved thumbnail: {thumb_src} ? {thumb_dest}")
-                        found_thumb = True
-                        break
-                if not found_thumb:
-                    print(f"[THUMB] No thumbnail found for material: {mat_name}")
+    def rename_selected_materials(self):
+        items = self.selected_materials()
+        if not items:
+            return
+        pattern, ok = QInputDialog.getText(
+            self, "Rename Materials",
+            f"Pattern for {len(items)} material(s):\n"
+            "{name} = current name, {n} / ### = counter, {folder} = folder name",
+            text="{name}_###")
+        if not ok or not pattern.strip():
+            return
 
-            except Exception as e:
-                print(f"[ERROR] Failed to move {mat_name}: {e}")
+        from bulk_ops import plan_renames, rename_materials, library_counts
+        try:
+            plan = plan_renames(items, pattern.strip())
+        except ValueError as e:
+            QMessageBox.warning(self, "Rename Materials", str(e))
+            return
 
-        self.load_folder(self.current_path)
+        from pymxs import runtime as rt
+
+        counts = library_counts((p for p, _n in items), self.material_index, self.library_cache)
+        self.apply_bulk_result(rename_materials(rt, plan, counts))
+
+    def retag_selected_materials(self):
+        """Tags shared by the whole selection can be removed, new ones are added to every material."""
+        items = self.selected_materials()
+        if not items:
+            return
+        common = None
+        for mat_path, mat_name in items:
+            entry = self.material_index.get_material(mat_path, mat_name)
+            tags = set(entry["tags"]) if entry else set()
+            common = tags if common is None else common & tags
+        common = sorted(common or [])
+
+        dialog = TagManagerDialog(self, common)
+        if not dialog.exec():
+            return
+        new_tags = [t.strip().lower() for t in dialog.get_tags() if t.strip()]
+        added = [t for t in new_tags if t not in common]
+        removed = [t for t in common if t not in new_tags]
+        if not added and not removed:
+            return
+
+        found = self.material_index.update_tags(items, add=added, remove=removed)
+        self.refresh_search_paths({p for p, _n in items})
+        self.show_status_message(f"Tags updated on {found} material(s)", "green")
+        if self.search_active():
+            self.filter_items(self.search_bar.text())
+
+    def apply_bulk_result(self, result):
+        """Push a bulk_ops.BulkResult into the index / grid and report failures per item."""
+        done = result.done
+        if result.operation == "Delete":
+            self.apply_materials_removed([(i["mat_path"], i["name"]) for i in done])
+        else:
+            self.apply_materials_renamed(
+                [(i["mat_path"], i["name"], i["new_mat_path"], i["new_name"], i["thumb"]) for i in done])
+        if result.removed_files:
+            self.library_cache.invalidate_paths(result.removed_files)
+            self.material_index.sync_files(result.removed_files)
+            self.refresh_search_paths(result.removed_files)
+
+        print(f"[SUCCESS] {result.summary()}")
+        for item in result.failed:
+            print(f"[ERROR] {result.operation} '{item['name']}' ({item['mat_path']}): {item['error']}")
+        self.show_status_message(result.summary(), "orange" if result.failed else "green")
+        if result.failed:
+            lines = [f"{i['name']}: {i['error']}" for i in result.failed[:20]]
+            if len(result.failed) > 20:
+                lines.append(f"... and {len(result.failed) - 20} more (see the listener log)")
+            QMessageBox.warning(self, result.operation, result.summary() + "\n\n" + "\n".join(lines))
     
 # ==========================
 # Move .mat Material File
@@ -965,15 +1107,15 @@ class AssetBrowserWidget(QWidget):
                 self.context_menu = None
 
             # Move thumbnail if it exists
+            found_thumb = None
             try:
-                found_thumb = False
                 for file in os.listdir(mat_dir):
                     if file.lower().endswith(".jpg") and file.startswith(mat_name):
                         thumb_src = os.path.join(mat_dir, file)
                         thumb_dest = os.path.join(destination, file)
                         shutil.move(thumb_src, thumb_dest)
                         print(f"[THUMB] Moved thumbnail: {thumb_src} -> {thumb_dest}")
-                        found_thumb = True
+                        found_thumb = thumb_dest
                         break
                 if not found_thumb:
                     print(f"[THUMB] No thumbnail found for material: {mat_name}")
@@ -981,8 +1123,8 @@ class AssetBrowserWidget(QWidget):
                 print(f"[THUMB ERROR] Could not move thumbnail for {mat_name}: {e}")
             
 
-            # Refresh and clean UI
-            self.load_folder(self.current_path)
+            # Update index and the one card, then clean UI
+            self.apply_material_renamed(mat_path, mat_name, new_mat_path, mat_name, found_thumb)
             self.asset_list.clearFocus()             # ? prevent right-click triggering again
             QApplication.processEvents()             # ? flush pending UI events
             self.show_status_message(f"Moved material '{mat_name}'", "green")
@@ -1008,249 +1150,173 @@ class AssetBrowserWidget(QWidget):
 # ==========================
 # generate thumbnail
 # ==========================
+    def engine_info(self, mat_path):
+        """(engine mask, thumbnail engine) stored in the index; classified from the header if not there yet."""
+        info = self.material_index.engine_info(mat_path)
+        if info is None:
+            header = get_mat_header(mat_path, self.material_index)
+            info = self.engine_lookup.classify(header.material_class, header.class_id) if header else (self.engine_lookup.all_mask, "")
+        return info
+
+    def thumbnail_engine(self, mat_path):
+        """Engine whose scene renders this material's thumbnail, or None for the generic Scanline scene."""
+        return self.engine_info(mat_path)[1] or None
+
     def generate_thumbnail(self, mat_path, mat_name, callback=None):
         print(f"[GENERATE] Starting thumbnail for: {mat_name}")
-        original_renderer = None
-        try:
-            import inspect, re, os
-            from pymxs import runtime as rt
+        self.render_thumbnail_batch([(mat_path, mat_name)])
+        if callback:
+            callback()
 
-            current_dir = os.path.dirname(inspect.getfile(inspect.currentframe()))
-            scene_dir = os.path.join(current_dir, "etc", "3dfile")
-
-            # Load material
-            self.log_status(f"[DEBUG] Loading material from: {mat_path} / name: {mat_name}")
-            lib = rt.loadTempMaterialLibrary(mat_path)
-            mat = None
-            for i in range(lib.count):
-                if lib[i].name == mat_name:
-                    mat = lib[i]
-                    break
+    def render_thumbnail_batch(self, items):
+        """
+        Render thumbnails for [(mat_path, mat_name)] in this Max session,
+        sorted by engine so each engine scene is loaded once and only the
+        material on Sphere001 / Cylinder001 changes between renders.
+        The whole batch runs between holdMaxFile and fetchMaxFile, so the
+        user's scene (unsaved changes and file name included) and renderer
+        come back at the end; the engine / generic thumbnail scenes only
+        ever replace the held scene.
+        """
+        if not running_inside_3dsmax():
+            self.log_status("[ERROR] This must run inside 3ds Max.", "error")
+            return
 
-            if not mat:
-                self.log_status(f"[ERROR] Material '{mat_name}' not found in {mat_path}", "error")
-                return
+        from pymxs import runtime as rt
 
-            # Determine render engine type based on material class
-            class_name = str(rt.classOf(mat)).lower()
-            
-            # --- START MODIFICATION FOR NUANCED ENGINE DETECTION ---
-            # Define truly native Octane classes that require Octane.max scene
-            # These are Octane's specific material types, EXCLUDING generic physical/standard materials
-            octane_native_specific_classes = [
-                cls.lower() for cls in self.allowed_classes.get("octane", [])
-                if cls.lower() not in ["physicalmaterial", "standard"]
-            ]
-            
-            # Check if the material is one of these truly native Octane-specific materials
-            is_octane_material_for_scene = any(cls in class_name for cls in octane_native_specific_classes)
-
-            # Define native Redshift classes
-            redshift_classes = [
-                cls.lower() for cls in self.allowed_classes.get("redshift", [])
-                if cls.lower() not in ["physicalmaterial", "standard"]            
-            ]
-            # Check if the material is one of these truly native Redshift-specific materials
-            is_redshift_material = any(cls in class_name for cls in redshift_classes)
-
-            # Define native FStorm classes
-            fstorm_classes = [
-                cls.lower() for cls in self.allowed_classes.get("fstorm", [])
-                if cls.lower() not in ["physicalmaterial", "standard"]
-            ]
-            # Check if the material is one of these truly native fstorm-specific materials
-            is_fstorm_material = any(cls in class_name for cls in fstorm_classes)
-
-            # Define native Corona classes
-            corona_classes = [
-                cls.lower() for cls in self.allowed_classes.get("corona", [])
-                if cls.lower() not in ["physicalmaterial", "standard"]
-            ]
-            # Check if the material is one of these truly native Corona-specific materials
-            is_corona_material = any(cls in class_name for cls in corona_classes)
-
-            # Define native Vray classes
-            vray_classes = [
-                cls.lower() for cls in self.allowed_classes.get("vray", [])
-                if cls.lower() not in ["physicalmaterial", "standard"]
-            ]
-            # Check if the material is one of these truly native Vray-specific materials
-            is_vray_material = any(cls in class_name for cls in vray_classes)
-            # --- END MODIFICATION FOR NUANCED ENGINE DETECTION ---
-
-            # Thumbnail path
-            mat_clean = re.sub(r'[^\w\-_\.]', '_', mat_name)
-            thumb_name = f"{mat_name}.jpg"
-            thumb_path = os.path.join(os.path.dirname(mat_path), thumb_name).replace("\\", "/")
-            self.log_status(f"[DEBUG] Thumbnail output path: {thumb_path}")
-
-            if not running_inside_3dsmax():
-                self.log_status("[ERROR] This must run inside 3ds Max.", "error")
-                return
+        jobs = sorted(((self.thumbnail_engine(mat_path) or "", mat_path, mat_name)
+                       for mat_path, mat_name in items), key=lambda job: job[0])
+        self.log_status(f"[QUEUE] Rendering {len(jobs)} thumbnail(s) in {len({j[0] for j in jobs})} scene(s)")
 
-            original_renderer = rt.renderers.current
+        save_required = bool(rt.getSaveRequired())
+        try:
+            rt.holdMaxFile()
+        except Exception as e:
+            self.log_status(f"[ERROR] Could not hold the scene, thumbnails not rendered: {e}", "error")
+            return
 
-            # === Render with specific scene for truly native supported engine materials ===
-            scene_file = None
-            engine_label = "Generic/Scanline" # Default
-            
-            if is_octane_material_for_scene: # Use the new, more specific check
-                scene_file = os.path.join(scene_dir, "Octane.max").replace("\\", "/")
-                engine_label = "Octane"
-                try:
-                    # Ensure Octane is the active renderer for truly native Octane materials
-                    rt.renderers.current = rt.Octane_Renderer()
-                except Exception as e:
-                    self.log_status(f"[WARNING] Could not set Octane Renderer: {e}", "warning")
-            elif is_redshift_material:
-                scene_file = os.path.join(scene_dir, "RedShift.max").replace("\\", "/")
-                engine_label = "Redshift"
-                try:
-                    rt.renderers.current = rt.Redshift_Renderer()
-                except Exception as e:
-                    self.log_status(f"[WARNING] Could not set Redshift Renderer: {e}", "warning")
-            elif is_fstorm_material:
-                scene_file = os.path.join(scene_dir, "FStorm.max").replace("\\", "/")
-                engine_label = "FStorm"
-                try:
-                    rt.renderers.current = rt.FStorm_Renderer()
-                except Exception as e:
-                    self.log_status(f"[WARNING] Could not set FStorm Renderer: {e}", "warning")
-            elif is_corona_material:
-                scene_file = os.path.join(scene_dir, "Corona.max").replace("\\", "/")
-                engine_label = "Corona"
-                try:
-                    rt.renderers.current = rt.CoronaRenderer() 
-                except Exception as e:
-                    self.log_status(f"[WARNING] Could not set Corona Renderer: {e}", "warning")
-            elif is_vray_material:
-                scene_file = os.path.join(scene_dir, "Vray.max").replace("\\", "/")
-                engine_label = "Vray"
-                try:
-                    rt.renderers.current = rt.V_Ray_Renderer()
-                except Exception as e:
-                    self.log_status(f"[WARNING] Could not set Vray Renderer: {e}", "warning")
-            else:
-                # If not a truly native specific renderer material, use a generic scene and force Scanline
-                # This handles PhysicalMaterials, Standard materials, and Matcaps (which are PhysicalMaterials with OSL)
+        renderer = ThumbnailRenderer(rt, log=self.log_status, libraries=self.library_cache)
+        original_renderer = rt.renderers.current
+        try:
+            for engine, mat_path, mat_name in jobs:
+                self.status_label.setText(f"Rendering thumbnail for: {mat_name}...")
+                QApplication.processEvents()
                 try:
-                    rt.renderers.current = rt.Default_Scanline_Renderer() # Explicitly set to Scanline
-                    self.log_status("[DEBUG] Forced renderer to Default Scanline for generic material.")
+                    thumb_path = renderer.render(engine, mat_path, mat_name)
                 except Exception as e:
-                    self.log_status(f"[WARNING] Could not set Default Scanline Renderer: {e}", "warning")
-
-
-            if scene_file:
-                # Render using a pre-saved scene file
-                self.log_status(f"[DEBUG] Scene file selected: {scene_file}")
-                if not os.path.isfile(scene_file):
-                    self.log_status(f"[ERROR] Scene file does not exist: {scene_file}", "error")
-                    return
-
-                self.log_status(f"[INFO] Rendering inside 3ds Max ({engine_label})...")
-                rt.loadMaxFile(scene_file, quiet=True)
-
-                sphere = rt.getNodeByName("Sphere001")
-                cylinder = rt.getNodeByName("Cylinder001")
-
-                if sphere and cylinder:
-                    sphere.material = mat
-                    cylinder.material = mat
-                    self.log_status("[DEBUG] Materials assigned. Starting render...")
-
-                    rt.render(width=128, height=128, vfb=False, outputfile=thumb_path)
-
-                    if os.path.exists(thumb_path):
-                        self.log_status(f"[SUCCESS] Thumbnail rendered at: {thumb_path}")
-                    else:
-                        self.log_status("[ERROR] Render did not produce output.", "error")
-                    
-                    self.log_status("[DEBUG] Calling resetMaxFile...")
-                    rt.resetMaxFile(rt.name("noPrompt"))
-                    self.log_status("[DEBUG] resetMaxFile done.")
-                else:
-                    self.log_status("[ERROR] Scene objects not found: Sphere001 or Cylinder001", "error")
-                    return
-            else:
-                # === Non-specific renderer material (e.g., Physical, Standard, Matcap): Procedural scene render with Scanline ===
-                try:
-                    thumb_width, thumb_height = 128, 128
-                    rt.renderWidth = thumb_width
-                    rt.renderHeight = thumb_height
-
-                    # Create simple scene for generic materials
-                    sphere = rt.sphere(radius=25, segments=32, pos=rt.Point3(0, 0, 0)) 
-                    sphere.material = mat
-                    uvwmod = rt.UVWMap()
-                    uvwmod.mapping = rt.Name("spherical")
-                    rt.addModifier(sphere, uvwmod)
-
-                    bg = rt.plane(length=300, width=300)
-                    bg.rotation = rt.eulerangles(-50, 0, 0)
-                    bg.position = rt.Point3(0, 35, 0)
-                    uv_texture_path = os.path.join(scene_dir, "UVChecke.png").replace("\\", "/")
-
-                    if os.path.exists(uv_texture_path):
-                        tex = rt.Bitmaptexture()
-                        tex.filename = uv_texture_path
-                        bg_mat = rt.standardMaterial() # Use StandardMaterial for Scanline compatibility
-                        bg_mat.diffuseMap = tex
-                    else:
-                        bg_mat = rt.standardMaterial() # Fallback to a simple grey standard material
-                        bg_mat.diffuse = rt.color(100, 100, 100) # Neutral grey
-
-                    bg.material = bg_mat
-                    uvw_bg = rt.UVWMap()
-                    uvw_bg.mapping = rt.Name("planar")
-                    rt.addModifier(bg, uvw_bg)
-
-                    # Use a standard Omni light for generic scene
-                    light = rt.omniLight()
-                    light.position = rt.Point3(50, -80, 100)
-
-                    cam = rt.freeCamera()
-                    cam.position = rt.Point3(0, -70, 40)
-                    cam.target = sphere
-                    rt.viewport.setCamera(cam)
-                    cam.depthOfField = False
+                    self.log_status(f"[ERROR] Thumbnail generation failed for {mat_name}: {e}", "error")
+                    thumb_path = None
+                self.thumbnail_finished(mat_path, mat_name, thumb_path)
+        finally:
+            try:
+                rt.fetchMaxFile(quiet=True)
+                # fetch leaves the scene marked as changed; keep the user's own state
+                rt.setSaveRequired(save_required)
+            except Exception as e:
+                self.log_status(f"[ERROR] Could not fetch the held scene, use Edit > Fetch: {e}", "error")
+            try:
+                rt.renderers.current = original_renderer
+                self.log_status(f"[DEBUG] Restored renderer to: {str(original_renderer)}")
+            except Exception as e:
+                self.log_status(f"[WARNING] Could not restore original renderer: {e}", "warning")
 
-                    self.log_status("[INFO] Rendering generic scene with Scanline...")
-                    rt.render(camera=cam, width=thumb_width, height=thumb_height, vfb=False, outputfile=thumb_path)
+    def thumbnail_finished(self, mat_path, mat_name, thumb_path):
+        """One render came back (in-process or from a farm worker); None = failed."""
+        if not thumb_path:
+            self.thumbnail_failed.add(mat_path)
+            return
+        self.thumbnails.invalidate(thumb_path)
+        self.card_model.set_icon(f"{mat_path}::{mat_name}", thumb_path)
 
-                    if os.path.exists(thumb_path):
-                        self.log_status(f"[SUCCESS] Thumbnail saved: {thumb_path}")
-                    else:
-                        self.log_status(f"[ERROR] Thumbnail NOT saved: {thumb_path}", "error")
+# ==========================
+# Thumbnail render farm (headless 3dsmaxbatch workers)
+# ==========================
+    def thumbnail_farm_workers(self):
+        """config "render_workers": number of headless workers; 0 = render in this session."""
+        try:
+            return max(0, int(self.config.get("render_workers", 0)))
+        except (TypeError, ValueError):
+            return 0
 
-                    # Clean up scene
-                    rt.delete(sphere)
-                    rt.delete(bg)
-                    rt.delete(light)
-                    rt.delete(cam)
+    def start_thumbnail_farm(self, items):
+        """Hand [(mat_path, mat_name)] to headless workers. False if no worker could be started."""
+        from render_farm import RenderFarm, make_job, max_batch_command, find_max_batch
 
-                except Exception as e:
-                    self.log_status(f"[EXCEPTION] Generic thumbnail render failed: {e}", "error")
+        max_batch = self.config.get("max_batch_path")
+        if not max_batch and running_inside_3dsmax():
+            from pymxs import runtime as rt
+            max_batch = find_max_batch(rt)
+        if not max_batch:
+            self.log_status("[WARNING] 3dsmaxbatch.exe not found, rendering in this session.", "warning")
+            return False
 
+        jobs = [make_job(i, mat_path, mat_name, self.thumbnail_engine(mat_path),
+                         thumbnail_output(mat_path, mat_name), priority=tier)
+                for i, (mat_path, mat_name, tier, _pinned) in enumerate(items)]
+        self.farm_auto_jobs = {i for i, item in enumerate(items) if not item[3]}
+        try:
+            self.render_farm = RenderFarm(jobs, max_batch_command(max_batch),
+                                          workers=self.thumbnail_farm_workers()).start()
         except Exception as e:
-            self.log_status(f"[ERROR] Thumbnail generation failed: {e}", "error")
-        finally:
-            # Always restore the original renderer
-            if original_renderer is not None:
-                try:
-                    rt.renderers.current = original_renderer
-                    self.log_status(f"[DEBUG] Restored renderer to: {str(original_renderer)}")
-                except Exception as e:
-                    self.log_status(f"[WARNING] Could not restore original renderer: {e}", "warning")
+            self.log_status(f"[ERROR] Could not start render workers: {e}", "error")
+            self.render_farm = None
+            return False
 
-            if getattr(self, 'thumbnail_dialog', None):
-                try:
-                    self.thumbnail_dialog.close()
-                except Exception as e:
-                    self.log_status(f"[WARNING] Could not close thumbnail dialog: {e}", "warning")
-                self.thumbnail_dialog = None
-            self.show_status_message("Ready", "orange")
+        self.farm_timer = QTimer(self)
+        self.farm_timer.timeout.connect(self.poll_thumbnail_farm)
+        self.farm_timer.start(500)
+        self.show_status_message(f"Rendering {len(jobs)} thumbnails in {self.render_farm.worker_count} worker(s)...", "orange")
+        return True
+
+    def poll_thumbnail_farm(self):
+        farm = self.render_farm
+        if farm is None:
+            return
+        for event in farm.poll():
+            item = event.get("item") or {}
+            if event["event"] == "done":
+                self.thumbnail_finished(item["mat_path"], item["mat_name"], event.get("output"))
+            elif event["event"] == "failed" and event.get("error") == "cancelled":
+                self.log_status(f"[QUEUE] Cancelled: {item.get('mat_name')}")
+            elif event["event"] == "failed":
+                self.log_status(f"[ERROR] Worker failed on {item.get('mat_name')}: {event.get('error')}", "error")
+                self.thumbnail_finished(item.get("mat_path"), item.get("mat_name"), None)
+
+        self.status_label.setText(f"Thumbnails: {farm.done + farm.failed} of {farm.total}"
+                                  + (f" ({farm.failed} failed)" if farm.failed else ""))
+        if farm.finished:
+            self.farm_timer.stop()
+            farm.cleanup()
+            self.render_farm = None
             self.process_next_thumbnail()
 
+    def cancel_thumbnail_farm(self):
+        if getattr(self, "render_farm", None) is not None:
+            self.render_farm.cancel()
+
+    def cancel_thumbnails_outside(self, folder):
+        """User left a folder: drop its auto-queued thumbnails, queued and not yet claimed by a worker."""
+        cancelled = self.thumbnail_queue.cancel_folders_except(folder)
+        farm = self.render_farm
+        if farm is not None:
+            folder = folder.replace("\\", "/").rstrip("/")
+            stale = [job_id for job_id in self.farm_auto_jobs
+                     if os.path.dirname(farm.jobs[job_id]["mat_path"]) != folder]
+            self.farm_auto_jobs.difference_update(stale)
+            cancelled.extend(farm.jobs[job_id]["mat_path"] for job_id in farm.cancel_jobs(stale))
+        if cancelled:
+            self.log_status(f"[QUEUE] Cancelled {len(cancelled)} thumbnail(s) outside {folder}")
+
+    def visible_cards_changed(self, first, page):
+        """From DraggableMaterialList: rows on screen; their thumbnails jump the queue."""
+        last = min(first + page, self.card_model.rowCount())
+        visible = set()
+        for row_number in range(first, last):
+            path = self.card_model.row(row_number)["path"]
+            if "::" in path:
+                visible.add(path.split("::")[0])
+        self.thumbnail_queue.set_visible(visible)
+
 # ==========================
 # Generate Matcaps From Images
 # ==========================
@@ -1402,24 +1468,11 @@ class AssetBrowserWidget(QWidget):
 # ==========================
     def is_materialx_folder(self, folder_path):
         """
-        Correctly checks if a folder contains any file with the .mtlx extension.
+        Checks if a folder contains any file with the .mtlx extension
+        (from the folder summary, re-listed only when the folder changed).
         """
-        if not os.path.isdir(folder_path):
-            return False
-        try:
-            # Check every file in the directory
-            for filename in os.listdir(folder_path):
-                # If any file, converted to lowercase, ends with ".mtlx"
-                if filename.lower().endswith(".mtlx"):
-                    # Immediately return True and stop searching.
-                    return True
-        except OSError as e:
-            # Handle potential errors like permission denied
-            print(f"Could not read directory {folder_path}: {e}")
-            return False
-            
-        # If the loop finishes without finding any .mtlx file
-        return False
+        summary = self.folder_summaries.get(folder_path)
+        return bool(summary and summary["has_mtlx"])
 # ==========================
 # Create MaterialX From .mtlx
 # ==========================
@@ -1502,32 +1555,53 @@ class AssetBrowserWidget(QWidget):
 # split material library 
 # ========================== 
     def split_material_library(self, mat_path):
+        """Split a multi-material library into one .mat per material. Returns the new paths."""
         import os
-        from pymxs import runtime as rt
 
-        if not os.path.exists(mat_path):
+        mat_path = mat_path.replace("\\", "/")
+        try:
+            mtime = os.stat(mat_path).st_mtime
+        except OSError:
             self.log_status(f"[WARNING] File not found: {mat_path}")
-            return
+            return []
+        if self.unsplit_libraries.get(mat_path) == mtime:
+            return []
+
+        # The header (cached in the index) knows the material count: one-material
+        # libraries, i.e. nearly every card, never reach pymxs.
+        header = get_mat_header(mat_path, self.material_index)
+        stem = os.path.splitext(os.path.basename(mat_path))[0]
+        if header and header.count is not None:
+            if header.count == 1:
+                self.unsplit_libraries[mat_path] = mtime
+                return []
+        elif header and header.name == stem:
+            # older header without a count: files named after their material were already split
+            self.unsplit_libraries[mat_path] = mtime
+            return []
 
         try:
-            lib = rt.loadTempMaterialLibrary(mat_path)
+            from pymxs import runtime as rt
+            materials = self.library_cache.library(mat_path)
+            if materials is None:
+                return []
             mat_dir = os.path.dirname(mat_path)
 
-            if lib.count == 0:
+            if len(materials) == 0:
                 self.log_status(f"[INFO] Empty library removed: {mat_path}")
                 os.remove(mat_path)
-                return
+                self.library_cache.invalidate(mat_path)
+                return []
 
-            if lib.count == 1:
+            if len(materials) == 1:
                 self.log_status(f"[INFO] Library has 1 material, skipping split: {mat_path}")
-                return
+                self.unsplit_libraries[mat_path] = mtime
+                return []
 
-            self.log_status(f"[SPLIT] Splitting {lib.count} materials from: {mat_path}")
+            self.log_status(f"[SPLIT] Splitting {len(materials)} materials from: {mat_path}")
 
-            split_count = 0
-            for i in range(lib.count):
-                mat = lib[i]
-                mat_name = mat.name
+            created = []
+            for mat_name, mat in materials.items():
                 mat_file = f"{mat_name}.mat"
                 mat_path_out = os.path.join(mat_dir, mat_file).replace("\\", "/")
 
@@ -1536,16 +1610,19 @@ class AssetBrowserWidget(QWidget):
                     rt.append(single_lib, mat)
                     rt.saveTempMaterialLibrary(single_lib, mat_path_out)
                     self.log_status(f"[SPLIT] ? Saved: {mat_path_out}")
-                    split_count += 1
+                    created.append(mat_path_out)
                 else:
                     self.log_status(f"[SKIP] Already exists: {mat_path_out}")
 
             os.remove(mat_path)
+            self.library_cache.invalidate(mat_path)
             self.log_status(f"[CLEANUP] Original multi-material file removed: {mat_path}")
-            self.log_status(f"[DONE] Total split: {split_count} materials")
+            self.log_status(f"[DONE] Total split: {len(created)} materials")
+            return created
 
         except Exception as e:
             self.log_status(f"[ERROR] Failed to split {mat_path} - {e}")
+            return []
 
         
 # ==========================  
@@ -1564,12 +1641,15 @@ class AssetBrowserWidget(QWidget):
 # ==========================  
 # enqueue_thumbnail 
 # ==========================   
-    def enqueue_thumbnail(self, mat_path, mat_name):
+    def enqueue_thumbnail(self, mat_path, mat_name, auto=False):
+        """auto=True: queued because a card has no thumbnail; cancelled when the user leaves its folder."""
         print(f"[QUEUE] Enqueuing thumbnail: {mat_name}")
-        self.thumbnail_queue.append((mat_path, mat_name))
+        if not auto:
+            self.thumbnail_failed.discard(mat_path)
+        self.thumbnail_queue.push(mat_path, mat_name, pinned=not auto)
 
-        #  thumbnail_dialog 
-        if not getattr(self, 'thumbnail_dialog', None):
+        #  thumbnail_dialog (modal; headless workers leave Max usable, progress goes to the status bar)
+        if not getattr(self, 'thumbnail_dialog', None) and not self.thumbnail_farm_workers():
             self.thumbnail_dialog = ThumbnailProgressDialog(self)
             self.thumbnail_dialog.show()
             print("[QUEUE] Thumbnail dialog shown")
@@ -1582,6 +1662,8 @@ class AssetBrowserWidget(QWidget):
 # ==========================  
 #process next thumbnail 
 # =========================            
+    THUMBNAIL_BATCH_LIMIT = 32
+
     def process_next_thumbnail(self):
         if not self.thumbnail_queue:
             self.thumbnail_running = False
@@ -1597,18 +1679,33 @@ class AssetBrowserWidget(QWidget):
             self.show_status_message("Thumbnails generated successfully.", "green")
             self.status_label.setText("Ready")
             
-            # ?? Refresh UI to show new thumbnails
-            self.load_folder(self.current_path)
+            # cards were patched in place by thumbnail_finished; just repaint
+            self.asset_list.viewport().update()
             return
 
         self.thumbnail_processing = True
 
-        mat_path, mat_name = self.thumbnail_queue.popleft()
-        self.log_status(f"[QUEUE] Processing: {mat_name}")
-        self.status_label.setText(f"Rendering thumbnail for: {mat_name}...")
+        if self.thumbnail_farm_workers():
+            # workers get everything, ordered by priority tier
+            batch = self.thumbnail_queue.take_all()
+            if self.start_thumbnail_farm(batch):
+                return      # poll_thumbnail_farm calls back here when the workers are done
+            for mat_path, mat_name, _tier, pinned in batch:
+                self.thumbnail_queue.push(mat_path, mat_name, pinned=pinned)
+
+        # Best priority tier only (on screen first), capped so a later scroll or
+        # folder change reorders the rest. One scene load per engine within the batch.
+        batch = self.thumbnail_queue.take_tier(limit=self.THUMBNAIL_BATCH_LIMIT)
+        self.log_status(f"[QUEUE] Processing batch of {len(batch)}")
+
+        def run_batch():
+            try:
+                self.render_thumbnail_batch(batch)
+            finally:
+                self.process_next_thumbnail()
 
         # Defer thumbnail rendering slightly to let UI update
-        QTimer.singleShot(100, lambda: self.generate_thumbnail(mat_path, mat_name))
+        QTimer.singleShot(100, run_batch)
         
     
      
@@ -1619,9 +1716,8 @@ class AssetBrowserWidget(QWidget):
 # ==========================
     def show_material_list_from_mat(self, mat_path):
         try:
-            from pymxs import runtime as rt
-            lib = rt.loadTempMaterialLibrary(mat_path)
-            if lib is None:
+            materials = self.library_cache.library(mat_path)
+            if materials is None:
                 QMessageBox.critical(self, "Error", "Cannot load material library.")
                 return
 
@@ -1630,9 +1726,8 @@ class AssetBrowserWidget(QWidget):
             layout = QVBoxLayout()
             list_widget = QListWidget()
 
-            for i in range(lib.count):
-                mat = lib[i]
-                list_widget.addItem(mat.name)
+            for name in materials:
+                list_widget.addItem(name)
 
             layout.addWidget(list_widget)
             dialog.setLayout(layout)
@@ -1658,38 +1753,58 @@ class AssetBrowserWidget(QWidget):
     def load_folder(self, path):
         import os
         from PySide6.QtCore import Qt, QSize
-        from PySide6.QtWidgets import QListWidgetItem, QLabel
 
         
-        self.asset_list.clear()
-        self.all_items_to_load = [] 
-        self.current_loaded_index = 0
+        self.card_model.clear()
         self.current_path = path
         self.path_display.setText(path.replace("\\", "/"))
+        self.thumbnail_queue.set_current_folder(path)
+        self.cancel_thumbnails_outside(path)
+        self.library_watcher.watch_folder(path)
 
         if not os.path.isdir(path): return
 
         
-        all_items = sorted(os.listdir(path))
-        for item in all_items:
+        # .mat cards go in as placeholders: the scrollbar spans the whole folder at
+        # once, real names / thumbnails are resolved by the model's fetchMore.
+        pending_rows = []
+        try:
+            with os.scandir(path) as it:
+                all_items = sorted(it, key=lambda entry: entry.name)
+        except OSError as e:
+            print(f"[ERROR] Could not read directory {path}: {e}")
+            return
+
+        # every subfolder card from one index read; the mtimes come with the listing
+        folder_mtimes = {}
+        for entry in all_items:
+            try:
+                if entry.is_dir():
+                    folder_mtimes[os.path.join(path, entry.name).replace("\\", "/")] = entry.stat().st_mtime
+            except OSError:
+                pass
+        summaries = self.folder_summaries.get_many(folder_mtimes)
+
+        for entry in all_items:
+            item = entry.name
             item_path = os.path.join(path, item).replace("\\", "/")
 
-            if os.path.isdir(item_path):
-                self.add_folder_item(item_path, item) 
+            if item_path in folder_mtimes:
+                self.add_folder_item(item_path, item, summaries.get(item_path, UNKNOWN_SUMMARY))
 
             elif item.lower().endswith(".mtlx"):
                 mtlx_name = os.path.splitext(item)[0]
-                icon = QIcon(os.path.join(self.icon_path, "MatX.png"))                
-                entry = QListWidgetItem(icon, mtlx_name + " (.mtlx)")
-                entry.setData(Qt.UserRole, item_path)
-                entry.setTextAlignment(Qt.AlignCenter)
-                self.asset_list.addItem(entry)
+                icon_file = os.path.join(self.icon_path, "MatX.png").replace("\\", "/")
+                self.card_model.append_rows([
+                    make_row("mtlx", item_path, mtlx_name, icon_file, display=mtlx_name + " (.mtlx)")
+                ])
 
             elif item.lower().endswith(".mat"):
-                self.all_items_to_load.append(item_path)
+                pending_rows.append(self.pending_material_row(item_path))
 
         
-        self.loader.setup(self.all_items_to_load)
+        self.card_model.append_rows(pending_rows)
+        self.asset_list.schedule_fetch()
 
         
         tree_index = self.file_model.index(self.current_path)
@@ -1697,51 +1812,209 @@ class AssetBrowserWidget(QWidget):
             self.tree_view.setCurrentIndex(tree_index)
             self.tree_view.scrollTo(tree_index)
     
-    def add_folder_item(self, item_path, item_name):
-        
-        custom_folder_icon = os.path.join(self.icon_path, "folder.ico").replace("\\", "/")
-        icon_file = os.path.join(item_path, "icon.png")
-        thumb_file = os.path.join(item_path, f"{item_name}.jpg")
+# ==========================
+# Live library changes (watcher deltas)
+# ==========================
+    def apply_library_changes(self, changes):
+        """
+        Deltas from library_watcher (already written to the SQLite index):
+        refresh the search index per .mat file and patch the open folder's
+        cards in place. Nothing is cleared or reloaded.
+        """
+        current = self.current_path.replace("\\", "/").rstrip("/")
+        touched = False
+        for change in changes:
+            self.library_cache.invalidate_paths(change["removed"] + change["modified"])
+            for folder in change["removed_dirs"]:
+                self.library_cache.invalidate_under(folder)
+            for path in change["removed"]:
+                self.search_index.remove_path(path)
+            for path in change["added"] + change["modified"]:
+                self.refresh_search_entry(path)
+            touched = touched or bool(change["added"] or change["removed"] or change["modified"])
+
+            if change["folder"] != current:
+                continue
+            if self.search_bar.text().strip():
+                continue        # grid shows search results, re-run below
+
+            # modified libraries are re-read through the resolver like new ones
+            stale = []
+            for path in change["removed"] + change["modified"]:
+                stale.extend(self.card_model.file_rows(path))
+                self.thumbnail_queue.discard(path)
+            self.card_model.remove_rows(stale)
+            fresh = [p for p in change["added"] + change["modified"] if not self.card_model.file_rows(p)]
+            self.card_model.append_rows(self.pending_material_row(p) for p in sorted(fresh))
+
+            gone = set(change["removed_dirs"])
+            if change["subdirs"] is not None:
+                on_disk = set(change["subdirs"])
+                gone |= {p for p in self.card_model.paths_of_kind("folder") if p not in on_disk}
+                for sub in sorted(on_disk - set(self.card_model.paths_of_kind("folder"))):
+                    self.add_folder_item(sub, os.path.basename(sub))
+            self.card_model.remove_rows(self.card_model.find_row(p) for p in gone if self.card_model.find_row(p) >= 0)
+            self.asset_list.schedule_fetch()
+
+        if touched and self.search_bar.text().strip():
+            self.filter_items(self.search_bar.text())
+        if not os.path.isdir(self.current_path):
+            self.load_folder(self.root_path)
 
-        if os.path.exists(icon_file): icon = QIcon(QPixmap(icon_file))
-        elif os.path.exists(thumb_file): icon = QIcon(QPixmap(thumb_file))
-        elif os.path.exists(custom_folder_icon): icon = QIcon(QPixmap(custom_folder_icon))
-        else:
-            dark_pix = QPixmap(128, 128)
-            dark_pix.fill(QColor("#252525"))
-            icon = QIcon(dark_pix)
+# ==========================
+# Library mutations (index + grid deltas)
+# ==========================
+    # Called after the browser itself changed files on disk: each one updates
+    # the SQLite index, the search index and the affected card only.
+
+    def search_active(self):
+        return bool(self.search_bar.text().strip())
+
+    def in_current_folder(self, path):
+        return os.path.dirname(path.replace("\\", "/")) == self.current_path.replace("\\", "/").rstrip("/")
+
+    def apply_material_removed(self, mat_path, mat_name):
+        """mat_name was deleted from its library (thumbnail already removed)."""
+        self.apply_materials_removed([(mat_path, mat_name)])
+
+    def apply_materials_removed(self, items):
+        items = [(mat_path.replace("\\", "/"), name) for mat_path, name in items]
+        paths = {mat_path for mat_path, _name in items}
+        self.library_cache.invalidate_paths(paths)
+        self.material_index.remove_materials(items)
+        self.material_index.sync_files(paths)
+        self.refresh_search_paths(paths)
+        self.card_model.remove_rows(
+            row for row in (self.card_model.find_row(f"{p}::{n}") for p, n in items) if row >= 0)
+        for mat_path in paths:
+            self.thumbnail_queue.discard(mat_path)
+
+    def apply_material_renamed(self, mat_path, old_name, new_mat_path, new_name, new_thumb=None):
+        """A material was renamed and / or moved into another library file."""
+        self.apply_materials_renamed([(mat_path, old_name, new_mat_path, new_name, new_thumb)])
+
+    def apply_materials_renamed(self, renames):
+        """Batch form: [(mat_path, old_name, new_mat_path, new_name, new_thumb or None)], one index transaction."""
+        renames = [(p.replace("\\", "/"), old, (np or p).replace("\\", "/"), new, thumb)
+                   for p, old, np, new, thumb in renames]
+        self.material_index.rename_materials(
+            [(p, old, new, np, thumb) for p, old, np, new, thumb in renames])
+        touched = {p for p, *_rest in renames} | {np for _p, _old, np, _new, _thumb in renames}
+        self.library_cache.invalidate_paths(touched)
+        self.material_index.sync_files(touched)
+        self.refresh_search_paths(touched)
+
+        appended = []
+        for mat_path, old_name, new_mat_path, new_name, new_thumb in renames:
+            if new_mat_path != mat_path:
+                self.thumbnail_queue.discard(mat_path)
+            old_key, new_key = f"{mat_path}::{old_name}", f"{new_mat_path}::{new_name}"
+            if self.search_active() or self.in_current_folder(new_mat_path):
+                changes = {"path": new_key, "name": new_name, "display": new_name}
+                if new_thumb and os.path.exists(new_thumb):
+                    changes["icon"] = new_thumb.replace("\\", "/")
+                if not self.card_model.update_row(old_key, **changes) and not self.search_active():
+                    if not self.card_model.file_rows(new_mat_path):
+                        appended.append(self.pending_material_row(new_mat_path))
+            else:
+                row = self.card_model.find_row(old_key)
+                if row >= 0:
+                    self.card_model.remove_row(row)
+        if appended:
+            self.card_model.append_rows(appended)
+            self.asset_list.schedule_fetch()
+
+    def refresh_search_paths(self, paths):
+        """Replace the search-index entries of these library files with what the SQLite index holds (one query)."""
+        for path in paths:
+            self.search_index.remove_path(path)
+        self.add_search_documents(self.material_index.search_documents(paths=paths))
+
+    def apply_folder_renamed(self, old_path, new_path):
+        """A folder was renamed / moved on disk: re-point its whole subtree."""
+        old_path = old_path.replace("\\", "/").rstrip("/")
+        new_path = new_path.replace("\\", "/").rstrip("/")
+        self.material_index.move_folder_tree(old_path, new_path)
+        self.library_cache.invalidate_under(old_path)
+        for path in self.search_index.paths_under(old_path):
+            self.search_index.remove_path(path)
+        self.add_search_documents(self.material_index.search_documents(under=new_path))
+        self.discard_thumbnails_under(old_path)
+
+        row = self.card_model.find_row(old_path)
+        if row < 0:
+            return
+        if not self.in_current_folder(new_path):
+            self.card_model.remove_row(row)
+            return
+        card = self.card_model.row(row)
+        name = os.path.basename(new_path)
+        icon = card["icon"]
+        if icon.startswith(old_path + "/"):
+            icon = new_path + icon[len(old_path):]
+        display = name + (" [PBR]" if card["display"].endswith(" [PBR]") else "")
+        self.card_model.update_row(old_path, path=new_path, name=name, display=display, icon=icon)
+
+    def apply_folder_removed(self, folder_path):
+        folder_path = folder_path.replace("\\", "/").rstrip("/")
+        self.material_index.remove_folder_tree(folder_path)
+        self.library_cache.invalidate_under(folder_path)
+        for path in self.search_index.paths_under(folder_path):
+            self.search_index.remove_path(path)
+        self.discard_thumbnails_under(folder_path)
+        row = self.card_model.find_row(folder_path)
+        if row >= 0:
+            self.card_model.remove_row(row)
+
+    def discard_thumbnails_under(self, folder_path):
+        prefix = folder_path.rstrip("/") + "/"
+        for mat_path, _name in list(self.thumbnail_queue):
+            if mat_path.replace("\\", "/").startswith(prefix):
+                self.thumbnail_queue.discard(mat_path)
+
+    def add_folder_item(self, item_path, item_name, summary=None):
+        # icon.png / <folder>.jpg and the PBR flag come from the folder summary;
+        # UNKNOWN_SUMMARY (unreadable folder) keeps the default icon without another probe
+        if summary is None:
+            summary = self.folder_summaries.get(item_path)
+
+        # pixmap is decoded by the model only when the card becomes visible
+        icon = (summary and summary["icon"]) or self.default_folder_icon
 
         display_name = item_name
-        if self.is_pbr_folder(item_path): display_name += " [PBR]"
-
-        entry = QListWidgetItem(self.asset_list)
-        entry.setSizeHint(QSize(160, 240))
-        entry.setData(Qt.UserRole, item_path)
-        entry.setIcon(icon)
-
-        folder_html = style.HTML_FOLDER_STYLE.format(name=display_name.upper())
-        label = QLabel(folder_html)
-        label.setAlignment(Qt.AlignCenter)
-        label.setStyleSheet("background: transparent; border: none; padding-bottom: 5px;")
-        
-        self.asset_list.addItem(entry)
-        self.asset_list.setItemWidget(entry, label)
+        if summary and summary["has_pbr"]: display_name += " [PBR]"
+
+        self.card_model.append_rows([make_row("folder", item_path, item_name, icon, display=display_name)])
+
+    def pending_material_row(self, mat_path):
+        stem = os.path.splitext(os.path.basename(mat_path))[0]
+        icon_file = os.path.join(self.icon_path, "matcap.ico").replace("\\", "/")
+        return make_row("material", f"{mat_path}::{stem}", stem, icon_file, pending=True)
+
+    def resolve_material_row(self, row):
+        """card_model resolver: split multi-material libraries, read the real name, queue thumbnails."""
+        mat_path = row["path"].split("::")[0]
+        created = self.split_material_library(mat_path)
+        if created:
+            self.card_model.append_rows(self.pending_material_row(p) for p in created)
+        return self.material_row(mat_path)
+
+    def report_rows_resolved(self, resolved, total):
+        if resolved >= total:
+            self.show_status_message("All materials loaded.", "green")
+        else:
+            self.show_status_message(f"Loading materials: {resolved} of {total}", "orange")
 
-    def add_material_item(self, mat_path):
+    def material_row(self, mat_path):
         try:
-            from pymxs import runtime as rt
             import os
 
-            lib = rt.loadTempMaterialLibrary(mat_path)
-            if not lib or lib.count == 0: return
+            # name comes from the .mat header (cached in the index), not from pymxs
+            header = get_mat_header(mat_path, self.material_index)
+            if header is None: return None
 
-            mat = lib[0] 
-            mat_name = mat.name
+            mat_name = header.name or os.path.splitext(os.path.basename(mat_path))[0]
             thumb_path = os.path.join(os.path.dirname(mat_path), f"{mat_name}.jpg").replace("\\", "/")
-
-            entry = QListWidgetItem(self.asset_list)
-            entry.setSizeHint(QSize(160, 240))
-            entry.setData(Qt.UserRole, f"{mat_path}::{mat_name}")
             
             # Check if thumbnail exists
             if os.path.exists(thumb_path):
@@ -1751,20 +2024,16 @@ class AssetBrowserWidget(QWidget):
                 
                 # --- AUTO-GENERATE TRIGGER ---
                 # Ensure it's not already in the queue to avoid duplicate renders
-                is_in_queue = any(q_path == mat_path for q_path, q_name in self.thumbnail_queue)
-                if not is_in_queue:
-                    self.enqueue_thumbnail(mat_path, mat_name)
+                is_in_queue = mat_path in self.thumbnail_queue
+                if not is_in_queue and mat_path not in self.thumbnail_failed:
+                    self.enqueue_thumbnail(mat_path, mat_name, auto=True)
                 # -----------------------------
 
-            entry.setIcon(QIcon(icon_file))
-
-            card_html = style.HTML_CARD_STYLE.format(name=mat_name.upper())
-            label = QLabel(card_html)
-            label.setAlignment(Qt.AlignCenter)
-            self.asset_list.setItemWidget(entry, label)
+            return make_row("material", f"{mat_path}::{mat_name}", mat_name, icon_file.replace("\\", "/"))
             
         except Exception as e:
             print(f"[ERROR] Failed to add item: {e}")
+            return None
 
 # ==========================
 # Rename And Delete Material
@@ -1792,7 +2061,7 @@ class AssetBrowserWidget(QWidget):
             
             thumb_path = os.path.join(os.path.dirname(mat_path), f"{mat_name}.jpg")
             if os.path.exists(thumb_path): os.remove(thumb_path)
-            self.load_folder(self.current_path)
+            self.apply_material_removed(mat_path, mat_name)
             self.show_status_message(f"Deleted material '{mat_name}'", "orange")
 
     def rename_material(self, mat_path, old_name):
@@ -1820,7 +2089,7 @@ class AssetBrowserWidget(QWidget):
             new_thumb = os.path.join(thumb_dir, f"{new_name}.jpg")
             if os.path.exists(old_thumb):
                 os.rename(old_thumb, new_thumb)
-            self.load_folder(self.current_path)
+            self.apply_material_renamed(mat_path, old_name, mat_path, new_name, new_thumb)
             self.show_status_message(f"Renamed '{old_name}' to '{new_name}'", "green")
 
 
@@ -1877,7 +2146,6 @@ class AssetBrowserWidget(QWidget):
 # debug_log_all_mat_files
 # ==========================
     def debug_log_all_mat_files(self, folder_path):
-        from pymxs import runtime as rt
         import os
 
         print(f"\n=== [DEBUG] Scanning .mat files in: {folder_path} ===")
@@ -1886,13 +2154,13 @@ class AssetBrowserWidget(QWidget):
                 full_path = os.path.join(folder_path, file).replace("\\", "/")
                 
                 try:
-                    lib = rt.loadTempMaterialLibrary(full_path)
-                    if lib and lib.count > 0:
-                        print(f"[?] {file} - Loaded ({lib.count} materials):")
-                        for i in range(lib.count):
-                            print(f"    +- {lib[i].name} ({rt.classOf(lib[i])})")
+                    header = get_mat_header(full_path, self.material_index)
+                    if header and header.names:
+                        print(f"[?] {file} - Header ({header.material_class}, {len(header.names)} names):")
+                        for name in header.names:
+                            print(f"    +- {name}")
                     else:
-                        print(f"[?] {file} - EMPTY or failed to load.")
+                        print(f"[?] {file} - EMPTY or failed to read header.")
                 except Exception as e:
                     print(f"[ERROR] {file} - Exception: {e}")
         print("=== [END] ===\n")
@@ -1901,18 +2169,65 @@ class AssetBrowserWidget(QWidget):
 # PBR Material
 # ==========================  
     def is_pbr_folder(self, folder_path):
-        if not os.path.isdir(folder_path):
-            return False
+        summary = self.folder_summaries.get(folder_path)
+        return bool(summary and summary["has_pbr"])
+        
+# ==========================
+# Batch PBR Materials (texture-set plan)
+# ==========================
+    def build_pbr_materials_under(self, folder):
+        """
+        Scan folder's whole tree for texture sets (pbr_sets), save the plan
+        for review, and after confirmation write every new OpenPBR .mat in
+        batched MaxScript runs.
+        """
+        from pbr_sets import scan_texture_sets, PLAN_FILE_NAME
+        from bulk_ops import build_pbr_materials
 
-        files = [f.lower() for f in os.listdir(folder_path)]
-        required_keywords = ["albedo", "basecolor", "diffuse", "roughness", "normal", "metal", "ao"]
+        def scanned(count):
+            self.status_label.setText(f"Scanning texture sets... {count} folders")
+            QApplication.processEvents()
+
+        plan = scan_texture_sets(folder, progress=scanned)
+        plan_path = os.path.join(folder, PLAN_FILE_NAME).replace("\\", "/")
+        try:
+            plan.save(plan_path)
+        except Exception as e:
+            print(f"[WARNING] Could not save PBR plan {plan_path}: {e}")
+            plan_path = None
+        print(f"[INFO] {plan.summary()}")
+
+        if not plan.buildable:
+            QMessageBox.information(self, "Build PBR Materials", plan.summary())
+            self.show_status_message(plan.summary(), "gray")
+            return
+
+        box = QMessageBox(self)
+        box.setWindowTitle("Build PBR Materials")
+        box.setText(plan.summary() + (f"\n\nFull plan: {plan_path}" if plan_path else ""))
+        box.setInformativeText(f"Create {len(plan.buildable)} OpenPBR material(s)?")
+        box.setDetailedText(plan.describe())
+        box.setStandardButtons(QMessageBox.Yes | QMessageBox.No)
+        if box.exec() != QMessageBox.Yes:
+            return
+
+        if not running_inside_3dsmax():
+            self.log_status("[ERROR] This must run inside 3ds Max.", "error")
+            return
+        from pymxs import runtime as rt
+
+        def built(done, total):
+            self.status_label.setText(f"Building PBR materials... {done}/{total}")
+            QApplication.processEvents()
+
+        result = build_pbr_materials(rt, plan.buildable, progress=built)
+        print(f"[SUCCESS] {result.summary()}")
+        for item in result.failed:
+            print(f"[ERROR] Build PBR '{item['name']}' ({item['mat_path']}): {item['error']}")
+        self.show_status_message(result.summary(), "orange" if result.failed else "green")
+        # the watcher indexes the new libraries and adds cards in the open folder
+        self.library_watcher.check_now()
 
-        for name in files:
-            for keyword in required_keywords:
-                if keyword in name:
-                    return True
-        return False    
-        
 # ==========================
 # Right Click Menu
 # ==========================    
@@ -1927,22 +2242,25 @@ class AssetBrowserWidget(QWidget):
         import re
         from PySide6.QtWidgets import QMessageBox
         
-        item = self.asset_list.itemAt(position)
-        print("[DEBUG] itemAt:", item)
-        if item:
+        item = self.asset_list.indexAt(position)
+        print("[DEBUG] indexAt:", item.row())
+        if item.isValid():
             # multi-select Move If Selected
-            if item not in self.asset_list.selectedItems():
-                self.asset_list.clearSelection()
-                item.setSelected(True)
+            selection = self.asset_list.selectionModel()
+            if not selection.isSelected(item):
+                selection.setCurrentIndex(item, QItemSelectionModel.ClearAndSelect)
         else:
+            # empty grid space: actions on the open folder
+            menu = QMenu()
+            build_action = menu.addAction("Build PBR Materials in This Folder Tree...")
+            if menu.exec(self.asset_list.mapToGlobal(position)) == build_action:
+                self.build_pbr_materials_under(self.current_path)
             return
             
-        selected = self.asset_list.selectedItems()
-        self.log_status(f"Selected items: {[i.text() for i in selected]}", level="DEBUG")
+        selected = self.asset_list.selectedIndexes()
+        self.log_status(f"Selected items: {[i.data(NameRole) for i in selected]}", level="DEBUG")
         
-        self.log_status(f"Item: {item.text() if item else 'None'}", level="DEBUG")
-        if item is None:
-            return
+        self.log_status(f"Item: {item.data(NameRole)}", level="DEBUG")
             
         data = item.data(Qt.UserRole)
         if not data:
@@ -1978,6 +2296,7 @@ class AssetBrowserWidget(QWidget):
             # Check for PBR folder
             if self.is_pbr_folder(path):
                 make_pbr_action = menu.addAction("Make PBR Material")
+            build_pbr_tree_action = menu.addAction("Build PBR Materials in Subfolders...")
             
                 
                 
@@ -1990,6 +2309,9 @@ class AssetBrowserWidget(QWidget):
             
         #Mat File 
         elif is_mat:
+            # several materials selected: tag / rename / delete act on all of them in one batch
+            bulk_count = len(self.selected_materials())
+            bulk = bulk_count > 1
             move_action = menu.addAction("Move to Another Folder...")
             mat_path, mat_name = path.split("::")
             print(f"[DEBUG] MAT path: {mat_path}, name: {mat_name}")
@@ -1997,44 +2319,23 @@ class AssetBrowserWidget(QWidget):
             generate_thumb_action = None  
 
             try:
-                from pymxs import runtime as rt
-                lib = rt.loadTempMaterialLibrary(mat_path)
-                print(f"[DEBUG] Library loaded. Count: {lib.count}")
-
-                mat = None
-                for i in range(lib.count):
-                    m = lib[i]
-                    print(f"[DEBUG] Checking material: {m.name}")
-                    if m.name == mat_name:
-                        mat = m
-                        break
-
-                if not mat:
-                    print(f"[ERROR] Material not found in library: {mat_name}")
-                    return
-
-                classof = rt.classOf(mat)
-                mat_class = str(classof.name).lower() if hasattr(classof, "name") else str(classof).lower()
-                print(f"[DEBUG] Material class: {mat_class}")
-
+                # engines come from the index (EngineLookup) — no loadTempMaterialLibrary here
+                engine_mask, thumb_engine = self.engine_info(mat_path)
                 engine_key = self.active_render_engine
-                allowed = self.allowed_classes.get(engine_key, [])
-                print(f"[DEBUG] Active engine: {engine_key}, Allowed classes: {allowed}")
+                print(f"[DEBUG] Active engine: {engine_key}, thumbnail scene: {thumb_engine or 'generic'}")
 
-                try:
-                    classof = rt.classOf(mat)
-                    mat_class = str(classof.name) if hasattr(classof, "name") else str(classof)
-                    mat_class_clean = mat_class.strip()
-
-                    if engine_key == "octane" and mat_class_clean in self.allowed_classes["octane"]:
-                        generate_thumb_action = menu.addAction("Generate Thumbnail")
-                except Exception as e:
-                    print(f"[ERROR] Failed to detect class: {e}")
+                if engine_key == "octane" and self.engine_lookup.allows(engine_mask, "octane"):
+                    generate_thumb_action = menu.addAction("Generate Thumbnail")
 
                 assign_action = menu.addAction("Assign to Selected Object(s)")
-                manage_tags_action = menu.addAction("Manage Tags...")
-                rename_mat_action = menu.addAction("Rename Material")
-                delete_mat_action = menu.addAction("Delete Material")            
+                if bulk:
+                    manage_tags_action = menu.addAction(f"Tag {bulk_count} Materials...")
+                    rename_mat_action = menu.addAction(f"Rename {bulk_count} Materials with Pattern...")
+                    delete_mat_action = menu.addAction(f"Delete {bulk_count} Materials")
+                else:
+                    manage_tags_action = menu.addAction("Manage Tags...")
+                    rename_mat_action = menu.addAction("Rename Material")
+                    delete_mat_action = menu.addAction("Delete Material")            
                 
                 
             except Exception as e:
@@ -2051,154 +2352,29 @@ class AssetBrowserWidget(QWidget):
         if is_folder and self.is_pbr_folder(path) and action == make_pbr_action:
             try:
                 from pymxs import runtime as rt
-                import os
-
-                folder_name = os.path.basename(path)
-                lib_path = os.path.join(path, f"{folder_name}.mat").replace("\\", "/")
-                files = {f.lower(): f for f in os.listdir(path)}
+                from pbr_sets import plan_folder
+                from bulk_ops import build_pbr_materials
 
-                def find_map(keywords):
-                    
-                    valid_files = [f for f in files if f.lower().endswith(('.jpg', '.png', '.jpeg', '.tif', '.exr'))]
-                    
-                    
-                    for name in valid_files:
-                        lower_name = name.lower()
-                        name_no_ext = os.path.splitext(lower_name)[0]
-                        
-                        
-                        for res in ['_8k', '-8k', '_4k', '-4k', '_2k', '-2k', '_1k', '-1k']:
-                            if name_no_ext.endswith(res):
-                                name_no_ext = name_no_ext[:-len(res)]
-                                
-                        for k in keywords:
-                            
-                            if name_no_ext.endswith(k):
-                                return os.path.join(path, files[name])
-                                
-                    
-                    for name in valid_files:
-                        lower_name = name.lower()
-                        name_no_ext = os.path.splitext(lower_name)[0]
-                        for k in keywords:
-                            if f"_{k}" in name_no_ext or f"-{k}" in name_no_ext or f"{k}_" in name_no_ext:
-                                return os.path.join(path, files[name])
-                                
-                    
-                    for name in valid_files:
-                        lower_name = name.lower()
-                        for k in keywords:
-                            if k in lower_name:
-                                return os.path.join(path, files[name])
-                                
-                    return None
-
-                # Find all supported maps
-                map_albedo   = find_map(["albedo", "basecolor", "diffuse", "color"])
-                map_rough    = find_map(["roughness", "rough"])
-                map_norm     = find_map(["normal", "nor", "nrm"])
-                map_metal    = find_map(["metalness", "metallic", "metal"]) # metalness اضافه شد
-                map_opacity  = find_map(["opacity", "transparency", "alpha"])
-                map_displace = find_map(["displace", "displacement", "height", "disp"])
-                map_emission = find_map(["emission", "emit", "glow"])
-
-                if not map_albedo:
-                    from PySide6.QtWidgets import QMessageBox
+                # one listing, classified once (pbr_sets); every texture set in the folder gets its .mat
+                plan = plan_folder(path)
+                if not plan.buildable:
                     QMessageBox.warning(self, "Missing Map", "No Albedo/BaseColor found in folder.")
                     return
 
-                def norm_path(p): return p.replace("\\", "/") if p else ""
-
-                # Normalize all paths
-                map_albedo   = norm_path(map_albedo)
-                map_rough    = norm_path(map_rough)
-                map_norm     = norm_path(map_norm)
-                map_metal    = norm_path(map_metal)
-                map_opacity  = norm_path(map_opacity)
-                map_displace = norm_path(map_displace)
-                map_emission = norm_path(map_emission)
-
-                lib_path = os.path.join(path, f"{folder_name}.mat").replace("\\", "/")
+                result = build_pbr_materials(rt, plan.buildable, to_medit=True)
+                if result.failed:
+                    raise Exception("; ".join(f"{i['name']}: {i['error']}" for i in result.failed))
 
-                def tex_block(tex_path, slot_name, is_normal=False, extra_props=None):
-                    if not tex_path:
-                        return ""                
-
-                    # Using standard Bitmaptexture for Universal Engine Compatibility
-                    lines = [f'if doesFileExist "{tex_path}" do (']
-                    
-                    if is_normal:
-                        lines.append(f'    local bmpTex = Bitmaptexture filename:"{tex_path}"')
-                        lines.append(f'    local normNode = Normal_Bump()')
-                        lines.append(f'    normNode.normal_map = bmpTex')
-                        lines.append(f'    mtl.{slot_name} = normNode')
-                    else:
-                        lines.append(f'    mtl.{slot_name} = Bitmaptexture filename:"{tex_path}"')
-
-                    # Enable the map slot
-                    lines.append(f'    mtl.{slot_name}_on = true')
-
-                    # Inject any extra properties (like base_weight, emission_weight)
-                    if extra_props:
-                        for prop, val in extra_props.items():
-                            lines.append(f'    mtl.{prop} = {val}')
-
-                    lines.append(')')
-                    return "\n                    ".join(lines)
-
-                # Assign OpenPBR slots based on the material dump
-                tex_blocks = [
-                    tex_block(map_albedo,   "base_color_map", extra_props={"base_weight": "1.0"}),
-                    tex_block(map_rough,    "specular_roughness_map"),
-                    tex_block(map_metal,    "base_metalness_map"),
-                    tex_block(map_norm,     "geometry_normal_map", is_normal=True),
-                    tex_block(map_opacity,  "geometry_opacity_map", extra_props={"geometry_thin_walled": "true"}),
-                    tex_block(map_displace, "displacement_map"),
-                    tex_block(map_emission, "emission_color_map", extra_props={"emission_weight": "1.0"})
-                ]
-
-                tex_code = "\n".join(tex_blocks)
-                
-                ms_code = f'''
-                try (
-                    local mtl = OpenPBR_Material name:"{folder_name}"
-
-                    -- Inject map assignments
-                    {tex_code}
-
-                    -- Next Slot Material Editor
-                    local slot_index = 1
-                    for i = 1 to meditMaterials.count do (
-                        if meditMaterials[i] == undefined do (
-                            slot_index = i
-                            exit
-                        )
-                    )
-                    if slot_index <= meditMaterials.count do meditMaterials[slot_index] = mtl
-
-                    -- Save to new dedicated .mat file
-                    local lib = MaterialLibrary()
-                    append lib mtl
-                    saveTempMaterialLibrary lib "{lib_path}"
-                    "OK"
-                ) catch (
-                    format "Failed to create OpenPBR_Material: %\\n" (getCurrentException())
-                    "ERROR"
-                )
-                '''
-
-                print("[DEBUG] MaxScript for OpenPBR_Material:\n", ms_code)
-                result = rt.execute(ms_code)
-
-                if result != "OK":
-                    raise Exception("MaxScript failed to create OpenPBR_Material.")
-
-                self.show_status_message(f"Created OpenPBR Material: '{folder_name}'", "green")
+                names = ", ".join(i["name"] for i in result.done)
+                self.show_status_message(f"Created OpenPBR Material: '{names}'", "green")
 
             except Exception as e:
                 from PySide6.QtWidgets import QMessageBox
                 QMessageBox.critical(self, "Error", f"Failed to create OpenPBR Material:\n{e}")
         
+        elif is_folder and action == build_pbr_tree_action:
+            self.build_pbr_materials_under(path)
+
         
         # IF FOLDER
         if is_folder:
@@ -2208,15 +2384,15 @@ class AssetBrowserWidget(QWidget):
                 input_dialog.setStyleSheet(style.MAIN_STYLE)
                 input_dialog.setWindowTitle("Rename")
                 input_dialog.setLabelText("New name:")
-                input_dialog.setTextValue(item.text())
+                input_dialog.setTextValue(item.data(NameRole))
                 
                 if input_dialog.exec():
                     new_name = input_dialog.textValue()
-                    if new_name and new_name != item.text():
+                    if new_name and new_name != item.data(NameRole):
                         new_path = os.path.join(os.path.dirname(path), new_name)
                         try:
                             os.rename(path, new_path)
-                            self.load_folder(self.current_path)
+                            self.apply_folder_renamed(path, new_path)
                         except Exception as e:
                             QMessageBox.critical(self, "Error", f"Rename failed: {e}")
                 
@@ -2224,14 +2400,14 @@ class AssetBrowserWidget(QWidget):
             elif action == delete_action:
                 confirm = QMessageBox.question(
                     self, "Delete",
-                    f"Are you sure you want to delete '{item.text()}'?",
+                    f"Are you sure you want to delete '{item.data(NameRole)}'?",
                     QMessageBox.Yes | QMessageBox.No
                 )
                 if confirm == QMessageBox.Yes:
                     import shutil
                     try:
                         shutil.rmtree(path)
-                        self.load_folder(self.current_path)
+                        self.apply_folder_removed(path)
                     except Exception as e:
                         QMessageBox.critical(self, "Error", f"Delete failed: {e}")
 
@@ -2242,6 +2418,7 @@ class AssetBrowserWidget(QWidget):
                         import shutil
                         dest_path = os.path.join(path, "icon.png")
                         shutil.copyfile(file_path, dest_path)
+                        self.folder_summaries.refresh(path)
                         self.load_folder(self.current_path)
                     except Exception as e:
                         QMessageBox.critical(self, "Error", f"Failed to set icon: {e}")
@@ -2256,6 +2433,14 @@ class AssetBrowserWidget(QWidget):
             except Exception as e:
                 QMessageBox.critical(self, "Error", f"Failed to assign material:\n{e}")
         
+        # Bulk (several materials selected)
+        elif is_mat and bulk and action == manage_tags_action:
+            self.retag_selected_materials()
+        elif is_mat and bulk and action == rename_mat_action:
+            self.rename_selected_materials()
+        elif is_mat and bulk and action == delete_mat_action:
+            self.delete_selected_materials()
+
         # ====================================================
         # Manage Tags 
         # ====================================================
@@ -2356,19 +2541,7 @@ class AssetBrowserWidget(QWidget):
                             break
 
                     
-                    for item in self.material_cache:
-                        if item["mat_path"] == mat_path and item["name"] == old_name:
-                            item["name"] = new_name
-                            item["lower_name"] = new_name.lower()
-                            item["mat_path"] = new_mat_path  
-                            if new_thumb:
-                                item["thumbnail_path"] = new_thumb
-                            break
-                    
-                    from logic import save_material_db
-                    save_material_db(self.root_path, self.material_cache)
-
-                    self.load_folder(self.current_path)
+                    self.apply_material_renamed(mat_path, old_name, new_mat_path, new_name, new_thumb)
                     self.show_status_message(f"Renamed '{old_name}' -> '{new_name}'", "green")
 
             except Exception as e:
@@ -2424,8 +2597,7 @@ class AssetBrowserWidget(QWidget):
                     except Exception as e:
                         print(f"[WARNING] Failed to delete thumbnail: {e}")
 
-                # Refresh
-                self.load_folder(self.current_path)
+                self.apply_material_removed(mat_path, mat_name)
                 self.show_status_message(f"Deleted '{mat_name}' and thumbnail.", "orange")
 
             except Exception as e:
@@ -2455,7 +2627,7 @@ class AssetBrowserWidget(QWidget):
             new_path = os.path.join(os.path.dirname(folder_path), new_name)
             try:
                 os.rename(folder_path, new_path)
-                self.load_folder(self.current_path) 
+                self.apply_folder_renamed(folder_path, new_path)
                 self.show_status_message(f"Folder renamed to '{new_name}'", "green")
             except Exception as e:
                 QMessageBox.critical(self, "Error", f"Rename failed: {e}")
@@ -2473,7 +2645,7 @@ class AssetBrowserWidget(QWidget):
         if confirm == QMessageBox.Yes:
             try:
                 shutil.rmtree(folder_path)
-                self.load_folder(self.current_path)
+                self.apply_folder_removed(folder_path)
                 self.show_status_message("Folder deleted.", "orange")
             except Exception as e:
                 QMessageBox.critical(self, "Error", f"Delete failed: {e}")
@@ -2481,50 +2653,41 @@ class AssetBrowserWidget(QWidget):
     
 
 # ==========================
-# Filter Items (Cached Version + Tags)
+# Filter Items (Indexed Version + Tags)
 # ==========================
     def filter_items(self, query):
         query = query.strip().lower()
-        self.asset_list.clear()
 
         if not query:
+            self.search_pipeline.cancel()
             self.load_folder(self.current_path)
             return
 
-        engine = self.active_render_engine
-        allowed_classes = [c.lower() for c in self.allowed_classes.get(engine, [])]
+        # unresolved engine mask (NULL) stays visible, as in MaterialIndex.search
+        engine_bit = self.engine_lookup.bits.get(self.active_render_engine, 0)
 
-        for item in self.material_cache:
-            
-            tags_string = " ".join(item.get("tags", []))
-            searchable_text = f'{item["lower_name"]} {tags_string}'
-            
-            # search
-            if query in searchable_text:
-                
-                mat_name = item["name"]
-                mat_path = item["mat_path"]
-                thumbnail_path = item["thumbnail_path"]
-
-                mat_class = self.material_class_cache.get(mat_path.lower(), "unknown")
-                if mat_class.lower() != "unknown" and mat_class.lower() not in allowed_classes:
-                    continue
+        def engine_allowed(doc):
+            mask = doc["payload"]["engine_mask"]
+            return bool((-1 if mask is None else mask) & engine_bit)
 
-                from PySide6.QtGui import QIcon
-                from PySide6.QtWidgets import QListWidgetItem
-                from PySide6.QtCore import Qt
-                import os
+        # runs on the search worker, page by page. The thumbnail path is taken from the
+        # index as is: only visible cards are decoded, and a missing file just paints no image.
+        def to_row(doc):
+            item = doc["payload"]
+            mat_name = item["name"]
+            mat_path = item["mat_path"]
+            return make_row("material", f"{mat_path}::{mat_name}", mat_name, item["thumbnail_path"],
+                            tags=list(doc["tags"]))
 
-                icon = QIcon(thumbnail_path) if os.path.exists(thumbnail_path) else QIcon()
-                
-                
-                display_name = mat_name
-                if item.get("tags"):
-                    display_name += f"\n[{', '.join(item['tags'])}]"
+        # token / trigram lookup in memory: red metal, oak OR walnut, -rust, wood*, tag:floor
+        # "name" (default): exact matches A-Z; "ranked" (Fuzzy button): relevance order, tolerates typos
+        ranked = self.config.get("search_mode", "name") == "ranked"
+        self.search_pipeline.request(query, accept=engine_allowed, to_row=to_row, ranked=ranked)
 
-                list_item = QListWidgetItem(icon, display_name)
-                list_item.setData(Qt.UserRole, f"{mat_path}::{mat_name}")
-                self.asset_list.addItem(list_item)
+    def report_search_results(self, total):
+        query = self.search_bar.text().strip()
+        if query:
+            self.show_status_message(f"{total} material(s) match '{query}'", "green" if total else "orange")
 
 
 
@@ -2532,7 +2695,7 @@ class AssetBrowserWidget(QWidget):
 # Manage Tags Logic
 # ==========================
     def manage_tags_for_material(self, mat_path, mat_name):
-        mat_item = next((item for item in self.material_cache if item["mat_path"] == mat_path and item["name"] == mat_name), None)
+        mat_item = self.material_index.get_material(mat_path, mat_name)
         
         if not mat_item:
             self.show_status_message("Material not found in database. Try refreshing.", "red")
@@ -2544,10 +2707,9 @@ class AssetBrowserWidget(QWidget):
         dialog = TagManagerDialog(self, current_tags)
         if dialog.exec():
             new_tags = dialog.get_tags()
-            mat_item["tags"] = new_tags 
             
-            from logic import save_material_db
-            if save_material_db(self.root_path, self.material_cache):
+            if self.material_index.set_tags(mat_path, mat_name, new_tags):
+                self.refresh_search_entry(mat_path, mat_name, mat_item["id"])
                 self.show_status_message(f"Tags updated for '{mat_name}'", "green")
                 
                 current_query = self.search_bar.text()
@@ -2559,35 +2721,23 @@ class AssetBrowserWidget(QWidget):
 # ==========================
     def get_mat_class(self, mat_path):
         try:
-            from pymxs import runtime as rt
-
-            if not os.path.exists(mat_path):
+            header = get_mat_header(mat_path, self.material_index)
+            if header is None:
                 print(f"[SKIP] File not found: {mat_path}")
                 return None
 
-            matlib = rt.loadTempMaterialLibrary(mat_path)
-
-            if not matlib or matlib.count == 0:
-                print(f"[WARN] No materials in: {mat_path}")
+            if not header.material_class:
+                print(f"[WARN] No material class found in: {mat_path}")
                 return None
 
-            mat = matlib[1]  # ?? max ?? 1 ???? ?????
-            mat_class = rt.classOf(mat).name
-            print(f"[DEBUG] Mat class from {mat_path}: {mat_class}")
-            return mat_class
+            print(f"[DEBUG] Mat class from {mat_path}: {header.material_class}")
+            return header.material_class
 
         except Exception as e:
             print(f"[ERROR] get_mat_class() failed for {mat_path}: {e}")
             return None
         
 # ==========================
-# handle_lazy_scroll
-# ==========================       
-    def handle_lazy_scroll(self, value):
-        scrollbar = self.asset_list.verticalScrollBar()
-        if value > scrollbar.maximum() * 0.8:
-            self.loader.load_next()         
-# ==========================
 # open_settings
 # ==========================
     def open_settings(self):
@@ -2605,6 +2755,15 @@ class AssetBrowserWidget(QWidget):
                 save_config(self.config)
                 
                 self.root_path = new_path                
+                # no watch pass may still be writing to the old index
+                self.library_watcher.stop()
+                self.material_index.close()
+                self.material_index = open_material_index(self.root_path)
+                self.material_index.set_engine_lookup(self.engine_lookup)
+                self.folder_summaries.set_index(self.material_index)
+                self.library_watcher.set_root(self.material_index, self.root_path)
+                self.library_cache.clear()
+                self.unsplit_libraries.clear()
                 self.build_cache() 
                 self.file_model.setRootPath(self.root_path)
                 self.tree_view.setRootIndex(self.file_model.index(self.root_path))